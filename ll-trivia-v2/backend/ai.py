@@ -0,0 +1,220 @@
+"""Anthropic API access for Learn More explanations and the Question Forge.
+
+One long-lived client (and so one HTTP connection pool) is shared by every
+request and job in the process, and ``complete`` holds one of
+``AI_MAX_CONCURRENCY`` slots for the duration of each call. Explanations
+are generated by ``learn_more`` jobs (see app.py): the job table coalesces
+concurrent requests for the same ``(question_id, mode)`` and caps how many
+run at once across workers. ``stream`` is the token-by-token variant; the
+jobs use it to checkpoint partial replies, which the Server-Sent Events
+endpoints relay, and ``JsonArrayReader`` picks complete questions out of a
+Question Forge reply while it is still arriving.
+
+Point ``ANTHROPIC_BASE_URL`` at scripts/ai_standin.py to exercise all
+of this without network access.
+"""
+
+import json
+import threading
+
+from sqlalchemy.exc import IntegrityError
+
+from config import (AI_MAX_CONCURRENCY, AI_MODEL, ANTHROPIC_API_KEY,
+                    ANTHROPIC_BASE_URL)
+from models import AIResponse, Question, db
+
+EXPLANATION_MODES = ('quick', 'deep_dive', 'quiz_bowl')
+EXPLANATION_MAX_TOKENS = 1500
+POOL = 'ai'
+
+_client = None
+_client_lock = threading.Lock()
+_slots = threading.BoundedSemaphore(AI_MAX_CONCURRENCY)
+
+
+def client():
+    """The process-wide Anthropic client, created on first use."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            import anthropic
+            _client = anthropic.Anthropic(api_key=ANTHROPIC_API_KEY,
+                                          base_url=ANTHROPIC_BASE_URL or None)
+        return _client
+
+
+def complete(prompt, max_tokens, on_usage=None):
+    """Send one user prompt and return the reply text.
+
+    ``on_usage``, if given, is called with the call's input and output
+    token counts.
+    """
+    with _slots:
+        message = client().messages.create(
+            model=AI_MODEL,
+            max_tokens=max_tokens,
+            messages=[{'role': 'user', 'content': prompt}],
+        )
+    if on_usage is not None:
+        on_usage(message.usage.input_tokens, message.usage.output_tokens)
+    return message.content[0].text
+
+
+def stream(prompt, max_tokens, on_usage=None):
+    """Send one user prompt and yield the reply text as it arrives.
+
+    The slot is held until the generator is exhausted or closed; closing
+    it early abandons the upstream request. ``on_usage`` is called as for
+    ``complete`` once the reply is complete.
+    """
+    with _slots:
+        with client().messages.stream(
+            model=AI_MODEL,
+            max_tokens=max_tokens,
+            messages=[{'role': 'user', 'content': prompt}],
+        ) as response:
+            yield from response.text_stream
+            usage = response.get_final_message().usage
+    if on_usage is not None:
+        on_usage(usage.input_tokens, usage.output_tokens)
+
+
+class JsonArrayReader:
+    """Pull complete objects out of a JSON array as its text streams in.
+
+    ``feed`` takes the next chunk and returns the objects it completed.
+    Anything before the opening bracket (such as a markdown code fence) is
+    skipped, and each character is scanned once, so feeding a reply token
+    by token costs no more than parsing it whole.
+    """
+
+    def __init__(self):
+        self._opened = False
+        self._closed = False
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._current = []
+
+    def feed(self, text):
+        items = []
+        for ch in text:
+            if self._closed:
+                break
+            if not self._opened:
+                self._opened = ch == '['
+                continue
+            if self._depth == 0:
+                # Between elements: commas, whitespace, the closing bracket
+                if ch == '{':
+                    self._depth = 1
+                    self._current = [ch]
+                elif ch == ']':
+                    self._closed = True
+                continue
+            self._current.append(ch)
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif ch == '\\':
+                    self._escaped = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"':
+                self._in_string = True
+            elif ch == '{':
+                self._depth += 1
+            elif ch == '}':
+                self._depth -= 1
+                if self._depth == 0:
+                    items.append(json.loads(''.join(self._current)))
+        return items
+
+    @property
+    def finished(self):
+        """True once the closing bracket has been read."""
+        return self._closed
+
+
+def explanation_key(question_id, mode):
+    """Job dedupe key for one explanation."""
+    return f'learn_more:{question_id}:{mode}'
+
+
+def explanation_prompt(question, mode):
+    if mode == 'quick':
+        return (
+            f"I'm studying trivia. Give me a brief, memorable explanation for "
+            f"why the answer to this question is what it is. Include a helpful "
+            f"mnemonic or memory trick if possible.\n\n"
+            f"Category: {question.category}\n"
+            f"Question: {question.question_text}\n"
+            f"Answer: {question.answer}\n\n"
+            f"Keep your response concise (2-3 paragraphs max)."
+        )
+    if mode == 'deep_dive':
+        return (
+            f"I'm studying trivia and want a deep dive on this topic. "
+            f"Provide comprehensive background information, historical context, "
+            f"related facts, and connections to other trivia topics.\n\n"
+            f"Category: {question.category}\n"
+            f"Question: {question.question_text}\n"
+            f"Answer: {question.answer}\n\n"
+            f"Be thorough and educational. Include interesting tangential facts "
+            f"that might help with other trivia questions."
+        )
+    if mode == 'quiz_bowl':
+        return (
+            f"Based on this trivia question and answer, generate 5 related "
+            f"trivia questions with answers that test related knowledge. "
+            f"Format each as 'Q: ... A: ...' on separate lines.\n\n"
+            f"Category: {question.category}\n"
+            f"Original Question: {question.question_text}\n"
+            f"Original Answer: {question.answer}\n\n"
+            f"Make the questions progressively harder and cover related topics."
+        )
+    raise ValueError(f'Unknown explanation mode: {mode}')
+
+
+def cached_explanation(question_id, mode):
+    return AIResponse.query.filter_by(question_id=question_id, mode=mode).first()
+
+
+def save_explanation(question_id, mode, response_text):
+    """Store a generated explanation and return its row. Commits.
+
+    If another worker stored one first, that row is returned instead.
+    """
+    ai_resp = AIResponse(question_id=question_id, mode=mode,
+                         response_text=response_text)
+    db.session.add(ai_resp)
+    try:
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        ai_resp = cached_explanation(question_id, mode)
+    return ai_resp
+
+
+def explain(question_id, mode, on_usage=None, on_text=None):
+    """The cached explanation, generating and storing it if needed.
+
+    With ``on_text`` the reply is streamed and ``on_text`` is called with
+    each chunk as it arrives.
+    """
+    cached = cached_explanation(question_id, mode)
+    if cached:
+        return cached
+    question = db.session.get(Question, question_id)
+    if question is None:
+        raise ValueError(f'Question {question_id} not found')
+    prompt = explanation_prompt(question, mode)
+    if on_text is None:
+        text = complete(prompt, EXPLANATION_MAX_TOKENS, on_usage=on_usage)
+    else:
+        parts = []
+        for chunk in stream(prompt, EXPLANATION_MAX_TOKENS, on_usage=on_usage):
+            parts.append(chunk)
+            on_text(chunk)
+        text = ''.join(parts)
+    return save_explanation(question_id, mode, text)
@@ -2,27 +2,39 @@ import csv
 import io
 import json
 import os
-import threading
-from datetime import datetime, timedelta
+import sys
+import time
+import zlib
+from datetime import datetime, timedelta, timezone
 
-from flask import Blueprint, Flask, Response, abort, jsonify, request, send_from_directory
+from flask import (Blueprint, Flask, Response, abort, current_app, g, jsonify,
+                   request, send_from_directory, stream_with_context)
 from flask_cors import CORS
-
-from config import (ANTHROPIC_API_KEY, LL_CATEGORIES, SECRET_KEY,
-                    SEED_FILE, SQLALCHEMY_DATABASE_URI)
-from models import (AIResponse, AppSettings, Bookmark, DailyActivity,
-                    Question, QuestionNote, QuestionTag, SessionAnswer,
-                    StudyProgress, StudySession, db)
-
-# ---------------------------------------------------------------------------
-# Scrape status (module-level, shared with background thread)
-# ---------------------------------------------------------------------------
-scrape_status_lock = threading.Lock()
-scrape_status = {
-    'running': False,
-    'messages': [],
-    'result': None,
-}
+from sqlalchemy.exc import IntegrityError
+
+from config import (AI_MAX_CONCURRENCY, ANTHROPIC_API_KEY, DATABASE_PATH, JOBS_WORKER_ENABLED,
+                    LL_CATEGORIES, PDF_EXPORT_PATH, READ_CACHE_SIZE,
+                    READ_CACHE_TTL, SCRAPE_ARCHIVE_DIR,
+                    SCRAPE_CONCURRENCY, SCRAPE_RATE, SCRIPTS_DIR, SECRET_KEY,
+                    SEED_FILE, SEED_SNAPSHOT_PATH, SQLALCHEMY_DATABASE_URI,
+                    SQLITE_PRAGMAS)
+from models import (AIResponse, AppSettings, Bookmark, CategoryStats,
+                    DailyActivity, Job, ProgressEvent, Question, QuestionNote,
+                    QuestionTag, SessionAnswer, StudyProgress, StudySession,
+                    UNSEEN_DUE_AT, db)
+import ai
+import bulk_load
+import http_cache
+import jobs
+import prewarm
+import read_cache
+import review_queue
+import rollups
+import sampling
+import search
+import seed_files
+import snapshot
+import sqlite_tuning
 
 # ---------------------------------------------------------------------------
 # Blueprint
@@ -30,21 +42,31 @@ scrape_status = {
 api = Blueprint('api', __name__)
 
 
+def _sqlite_settings():
+    return dict(db.session.query(AppSettings.key, AppSettings.value)
+                .filter(AppSettings.key.startswith(sqlite_tuning.SETTINGS_PREFIX)))
+
+
+@api.after_request
+def _sync_sqlite_settings(response):
+    """Pick up SQLite settings changed by another worker (see sqlite_tuning.py)."""
+    sqlite_tuning.sync_settings(db.engine, read_cache.generation, _sqlite_settings,
+                                g.get('data_generation'))
+    return response
+
+
+@api.after_request
+def _finish_response(response):
+    """ETags, 304s and compression for API responses (see http_cache.py)."""
+    return http_cache.finish(response)
+
+
 # ===========================================================================
 # QUESTIONS
 # ===========================================================================
 
-@api.route('/api/v1/questions', methods=['GET'])
-def list_questions():
-    category = request.args.get('category')
-    subcategory = request.args.get('subcategory')
-    difficulty = request.args.get('difficulty')
-    mode = request.args.get('mode', 'all')
-    limit = request.args.get('limit', 20, type=int)
-    offset = request.args.get('offset', 0, type=int)
-
-    query = Question.query
-
+def _filter_questions(query, category=None, subcategory=None, difficulty=None):
+    """Apply the shared category/subcategory/difficulty filters."""
     # Category filter
     if category:
         query = query.filter(Question.category == category)
@@ -62,43 +84,139 @@ def list_questions():
     elif difficulty == 'hard':
         query = query.filter(Question.percent_correct < 30)
 
-    # Mode filter
+    return query
+
+
+def _filter_mode(query, mode):
+    """Apply a study-mode filter (review, unseen or bookmarked)."""
     if mode == 'review':
         now = datetime.utcnow()
-        query = (query
-                 .outerjoin(StudyProgress)
-                 .filter(
-                     db.or_(
-                         StudyProgress.next_review_at <= now,
-                         StudyProgress.id.is_(None)
-                     )
-                 )
-                 .order_by(
-                     db.case(
-                         (StudyProgress.next_review_at.isnot(None), 0),
-                         else_=1
-                     ).asc(),
-                     StudyProgress.next_review_at.asc()
-                 ))
+        query = query.filter(db.or_(Question.due_at <= now,
+                                    Question.due_at == UNSEEN_DUE_AT))
     elif mode == 'unseen':
-        query = (query
-                 .outerjoin(StudyProgress)
-                 .filter(StudyProgress.id.is_(None)))
+        query = query.filter(Question.due_at == UNSEEN_DUE_AT)
     elif mode == 'bookmarked':
         query = query.join(Bookmark)
+    return query
+
+
+def _review_due_at(question):
+    """A question's review due date, or None if it was never studied."""
+    return None if question.due_at == UNSEEN_DUE_AT else question.due_at
+
+
+def _encode_review_cursor(next_review_at, question_id):
+    """Encode a review-mode keyset position as '<next_review_at>|<id>'."""
+    nra = next_review_at.isoformat() if next_review_at else ''
+    return f'{nra}|{question_id}'
+
+
+def _decode_review_cursor(cursor):
+    """Decode a review-mode cursor into (next_review_at or None, id)."""
+    nra_raw, _, id_raw = cursor.partition('|')
+    nra = datetime.fromisoformat(nra_raw) if nra_raw else None
+    return nra, int(id_raw)
+
+
+@api.route('/api/v1/questions', methods=['GET'])
+def list_questions():
+    """List questions with offset or keyset (cursor) pagination.
+
+    Passing ``cursor`` (the ``next_cursor`` of a previous page) switches to
+    keyset pagination so deep pages cost the same as the first one. In
+    review mode the cursor encodes ``(due_at, id)``; in every other
+    mode it is the last question id (``after_id`` is accepted as an alias).
+    ``include_total=false`` skips the COUNT query.
+    """
+    category = request.args.get('category')
+    subcategory = request.args.get('subcategory')
+    difficulty = request.args.get('difficulty')
+    mode = request.args.get('mode', 'all')
+    limit = request.args.get('limit', 20, type=int)
+    offset = request.args.get('offset', 0, type=int)
+    cursor = request.args.get('cursor') or request.args.get('after_id')
+    include_total = request.args.get('include_total', 'true').lower() != 'false'
+
+    # List responses only use to_dict(), so skip the joined relationships
+    query = Question.query.options(db.lazyload('*'))
+    query = _filter_questions(query, category, subcategory, difficulty)
+    query = _filter_mode(query, mode)
 
     # Get total before pagination
-    total = query.count()
+    total = query.count() if include_total else None
+
+    if mode == 'review':
+        # Seen-and-due cards first (oldest due date first), then unseen:
+        # UNSEEN_DUE_AT sorts last, so this is plain review-index order
+        query = query.order_by(Question.due_at.asc(), Question.id.asc())
+    else:
+        query = query.order_by(Question.id.asc())
+
+    if cursor:
+        try:
+            if mode == 'review':
+                after_nra, after_id = _decode_review_cursor(cursor)
+            else:
+                after_id = int(cursor)
+        except ValueError:
+            return jsonify({'error': 'Invalid cursor'}), 400
 
-    questions = query.offset(offset).limit(limit).all()
+        if mode != 'review':
+            query = query.filter(Question.id > after_id)
+        else:
+            after_due = after_nra or UNSEEN_DUE_AT
+            query = query.filter(db.or_(
+                Question.due_at > after_due,
+                db.and_(Question.due_at == after_due, Question.id > after_id),
+            ))
+    else:
+        query = query.offset(offset)
+
+    questions = query.limit(limit).all()
+
+    next_cursor = None
+    if questions and len(questions) == limit:
+        last = questions[-1]
+        if mode == 'review':
+            next_cursor = _encode_review_cursor(_review_due_at(last), last.id)
+        else:
+            next_cursor = str(last.id)
 
     return jsonify({
         'questions': [q.to_dict() for q in questions],
         'total': total,
+        'next_cursor': next_cursor,
+    })
+
+
+@api.route('/api/v1/questions/random', methods=['GET'])
+def random_questions():
+    """``k`` random questions matching the list filters, e.g. a quiz deck.
+
+    Pass ``seed`` to reproduce a deck; the response always includes the
+    seed that was used.
+    """
+    k = min(max(request.args.get('k', 10, type=int), 1), sampling.MAX_SAMPLE)
+    seed = request.args.get('seed', type=int)
+    if seed is None:
+        seed = sampling.new_seed()
+
+    query = _filter_questions(Question.query.options(db.lazyload('*')),
+                              request.args.get('category'),
+                              request.args.get('subcategory'),
+                              request.args.get('difficulty'))
+    query = _filter_mode(query, request.args.get('mode', 'all'))
+    questions = sampling.sample(query, k, seed,
+                                category=request.args.get('category'))
+
+    return jsonify({
+        'questions': [q.to_dict() for q in questions],
+        'seed': seed,
     })
 
 
 @api.route('/api/v1/questions/<int:question_id>', methods=['GET'])
+@http_cache.versioned()
 def get_question(question_id):
     question = Question.query.get_or_404(question_id)
 
@@ -111,11 +229,88 @@ def get_question(question_id):
     return jsonify(result)
 
 
+# ===========================================================================
+# SEARCH
+# ===========================================================================
+
+@api.route('/api/v1/search', methods=['GET'])
+@http_cache.versioned()
+def search_questions():
+    """Ranked full-text search over questions, answers, notes and AI text."""
+    match_expr = search.build_match_query(request.args.get('q', ''))
+    if not match_expr:
+        return jsonify({'error': 'q parameter required'}), 400
+
+    limit = min(request.args.get('limit', 20, type=int), 100)
+    offset = request.args.get('offset', 0, type=int)
+    include_total = request.args.get('include_total', 'true').lower() != 'false'
+
+    query = (Question.query
+             .options(db.lazyload('*'))
+             .join(search.search_index,
+                   search.search_index.c.rowid == Question.id)
+             .filter(search.match(match_expr)))
+    query = _filter_questions(query,
+                              request.args.get('category'),
+                              request.args.get('subcategory'),
+                              request.args.get('difficulty'))
+
+    # Count without computing snippets/ranks for every match
+    total = (query.with_entities(db.func.count(Question.id)).scalar()
+             if include_total else None)
+    rows = (query
+            .add_columns(search.snippet().label('snippet'),
+                         search.rank().label('rank'))
+            .order_by(db.text('rank'))
+            .offset(offset).limit(limit).all())
+
+    results = []
+    for q, snip, rank in rows:
+        d = q.to_dict()
+        d['snippet'] = search.highlight(snip)
+        d['rank'] = rank
+        results.append(d)
+
+    return jsonify({
+        'results': results,
+        'total': total,
+    })
+
+
+# ===========================================================================
+# REVIEW QUEUE
+# ===========================================================================
+
+@api.route('/api/v1/review/next', methods=['GET'])
+def review_next():
+    """The next ``n`` cards to review, in review-index order.
+
+    Due cards (oldest first), then unseen cards. Accepts the same
+    category/subcategory/difficulty filters as the question list.
+    """
+    n = min(max(request.args.get('n', 20, type=int), 1), review_queue.MAX_BATCH)
+    query = _filter_questions(Question.query.options(db.lazyload('*')),
+                              request.args.get('category'),
+                              request.args.get('subcategory'),
+                              request.args.get('difficulty'))
+
+    results = []
+    for q in review_queue.next_due(query, n):
+        d = q.to_dict()
+        due_at = _review_due_at(q)
+        d['due_at'] = due_at.isoformat() if due_at else None
+        results.append(d)
+
+    return jsonify({'questions': results})
+
+
 # ===========================================================================
 # SUBCATEGORIES
 # ===========================================================================
 
 @api.route('/api/v1/subcategories', methods=['GET'])
+@http_cache.versioned()
+@read_cache.cached()
 def list_subcategories():
     category = request.args.get('category')
     if not category:
@@ -162,14 +357,21 @@ def record_progress():
 
     # Get or create progress
     progress = StudyProgress.query.filter_by(question_id=question_id).first()
+    was_tracked = progress is not None
     if not progress:
         progress = StudyProgress(question_id=question_id)
         db.session.add(progress)
 
+    was_seen = progress.times_seen > 0
+    was_mastered = progress.is_mastered
     progress.record_attempt(confidence)
+    review_queue.sync([progress])
+    rollups.record_attempt_rollup(question.category, progress,
+                                  was_seen, was_mastered, confidence >= 3)
 
     # Update daily activity
-    today_str = datetime.utcnow().strftime('%Y-%m-%d')
+    today = datetime.utcnow().date()
+    today_str = today.isoformat()
     daily = DailyActivity.query.get(today_str)
     if not daily:
         daily = DailyActivity(date=today_str)
@@ -178,10 +380,191 @@ def record_progress():
     if confidence >= 3:
         daily.questions_correct += 1
 
+    rollups.record_attempt_summary(today, was_tracked, was_seen,
+                                   confidence >= 3)
+
     db.session.commit()
     return jsonify(progress.to_dict())
 
 
+MAX_PROGRESS_BATCH = 500
+
+
+def _parse_answered_at(raw, now):
+    """Parse an ISO-8601 answer time into naive UTC, clamped to ``now``."""
+    if raw is None:
+        return now
+    answered_at = datetime.fromisoformat(str(raw))
+    if answered_at.tzinfo is not None:
+        answered_at = (answered_at.astimezone(timezone.utc)
+                       .replace(tzinfo=None))
+    return min(answered_at, now)
+
+
+@api.route('/api/v1/progress/batch', methods=['POST'])
+def record_progress_batch():
+    """Apply many flashcard ratings in a single transaction.
+
+    Body: ``{"events": [{"question_id", "confidence", "answered_at"?,
+    "client_event_id"?}, ...]}``. Events are applied in ``answered_at``
+    order; an event whose ``client_event_id`` was already applied is
+    reported as a duplicate and skipped, so clients can safely retry.
+    """
+    data = request.get_json()
+    if not data or not isinstance(data.get('events'), list):
+        return jsonify({'error': 'events list required'}), 400
+
+    events = data['events']
+    if len(events) > MAX_PROGRESS_BATCH:
+        return jsonify({
+            'error': f'At most {MAX_PROGRESS_BATCH} events per batch'
+        }), 400
+
+    now = datetime.utcnow()
+    parsed = []
+    for i, ev in enumerate(events):
+        question_id = ev.get('question_id') if isinstance(ev, dict) else None
+        confidence = ev.get('confidence') if isinstance(ev, dict) else None
+        if question_id is None or confidence is None:
+            return jsonify({
+                'error': f'events[{i}]: question_id and confidence required'
+            }), 400
+        # bool is an int subclass; reject it so True is not question 1
+        if not isinstance(question_id, int) or isinstance(question_id, bool):
+            return jsonify({
+                'error': f'events[{i}]: question_id must be an integer'
+            }), 400
+        if (not isinstance(confidence, int) or isinstance(confidence, bool)
+                or confidence not in (1, 2, 3, 4)):
+            return jsonify({'error': f'events[{i}]: confidence must be 1-4'}), 400
+        try:
+            answered_at = _parse_answered_at(ev.get('answered_at'), now)
+        except ValueError:
+            return jsonify({
+                'error': f'events[{i}]: answered_at must be ISO-8601'
+            }), 400
+        client_event_id = ev.get('client_event_id')
+        parsed.append({
+            'index': i,
+            'question_id': question_id,
+            'confidence': confidence,
+            'answered_at': answered_at,
+            'client_event_id': str(client_event_id) if client_event_id else None,
+        })
+
+    if not parsed:
+        return jsonify({'applied': 0, 'duplicates': 0, 'not_found': 0,
+                        'results': [], 'progress': []})
+
+    # Bulk reads: one query per table instead of four per event
+    event_ids = {e['client_event_id'] for e in parsed if e['client_event_id']}
+    applied_ids = set()
+    if event_ids:
+        applied_ids = {row[0] for row in
+                       db.session.query(ProgressEvent.client_event_id)
+                       .filter(ProgressEvent.client_event_id.in_(event_ids))}
+
+    question_ids = {e['question_id'] for e in parsed}
+    categories = dict(db.session.query(Question.id, Question.category)
+                      .filter(Question.id.in_(question_ids)))
+    progress_by_qid = {p.question_id: p for p in
+                       StudyProgress.query
+                       .filter(StudyProgress.question_id.in_(question_ids))}
+    dates = {e['answered_at'].date().isoformat() for e in parsed}
+    daily_by_date = {d.date: d for d in
+                     DailyActivity.query.filter(DailyActivity.date.in_(dates))}
+
+    summary = rollups.get_study_summary()
+    # Offline events older than the last active day invalidate the running
+    # streak, so recompute the summary once at the end instead
+    backdated = bool(summary.last_active_date
+                     and min(dates) < summary.last_active_date)
+
+    results = [None] * len(parsed)
+    category_deltas = {}
+    touched = {}
+    for e in sorted(parsed, key=lambda e: e['answered_at']):
+        question_id = e['question_id']
+        client_event_id = e['client_event_id']
+        if client_event_id and client_event_id in applied_ids:
+            results[e['index']] = {'status': 'duplicate'}
+            continue
+        if question_id not in categories:
+            results[e['index']] = {'status': 'not_found'}
+            continue
+
+        progress = progress_by_qid.get(question_id)
+        was_tracked = progress is not None
+        if not progress:
+            progress = StudyProgress(question_id=question_id)
+            db.session.add(progress)
+            progress_by_qid[question_id] = progress
+
+        was_seen = progress.times_seen > 0
+        was_mastered = progress.is_mastered
+        confidence = e['confidence']
+        correct = confidence >= 3
+        progress.record_attempt(confidence, studied_at=e['answered_at'])
+
+        deltas = category_deltas.setdefault(categories[question_id], {
+            'studied': 0, 'times_seen': 0, 'times_correct': 0,
+            'mastery_count': 0,
+        })
+        deltas['studied'] += 0 if was_seen else 1
+        deltas['times_seen'] += 1
+        deltas['times_correct'] += 1 if correct else 0
+        deltas['mastery_count'] += int(progress.is_mastered) - int(was_mastered)
+
+        day = e['answered_at'].date()
+        daily = daily_by_date.get(day.isoformat())
+        if not daily:
+            daily = DailyActivity(date=day.isoformat())
+            db.session.add(daily)
+            daily_by_date[daily.date] = daily
+        daily.questions_studied += 1
+        if correct:
+            daily.questions_correct += 1
+
+        if not backdated:
+            rollups.record_attempt_summary(day, was_tracked, was_seen, correct)
+
+        if client_event_id:
+            db.session.add(ProgressEvent(
+                client_event_id=client_event_id,
+                question_id=question_id,
+                confidence=confidence,
+                answered_at=e['answered_at'],
+            ))
+            applied_ids.add(client_event_id)
+
+        touched[question_id] = progress
+        results[e['index']] = {'status': 'applied', 'question_id': question_id}
+
+    review_queue.sync(touched.values())
+    for category, deltas in category_deltas.items():
+        rollups.bump_category(category, **deltas)
+    if backdated:
+        db.session.flush()
+        rollups.rebuild_study_summary()
+
+    try:
+        db.session.commit()
+    except IntegrityError:
+        # A concurrent retry applied some of these events first
+        db.session.rollback()
+        return jsonify({'error': 'Batch conflicted with a concurrent '
+                                 'submission; retry it'}), 409
+
+    statuses = [r['status'] for r in results]
+    return jsonify({
+        'applied': statuses.count('applied'),
+        'duplicates': statuses.count('duplicate'),
+        'not_found': statuses.count('not_found'),
+        'results': results,
+        'progress': [p.to_dict() for p in touched.values()],
+    })
+
+
 # ===========================================================================
 # STUDY SESSIONS
 # ===========================================================================
@@ -233,6 +616,7 @@ def update_session(session_id):
 
 
 @api.route('/api/v1/sessions', methods=['GET'])
+@http_cache.versioned()
 def list_sessions():
     limit = request.args.get('limit', 20, type=int)
     offset = request.args.get('offset', 0, type=int)
@@ -248,16 +632,18 @@ def list_sessions():
 
 
 @api.route('/api/v1/sessions/<int:session_id>/answers', methods=['GET'])
+@http_cache.versioned()
 def session_answers(session_id):
     session = StudySession.query.get_or_404(session_id)
-    answers = (SessionAnswer.query
-               .filter_by(session_id=session_id)
-               .order_by(SessionAnswer.answered_at.asc())
-               .all())
+    rows = (db.session.query(SessionAnswer, Question)
+            .outerjoin(Question, Question.id == SessionAnswer.question_id)
+            .options(db.lazyload('*'))
+            .filter(SessionAnswer.session_id == session_id)
+            .order_by(SessionAnswer.answered_at.asc())
+            .all())
 
     result = []
-    for ans in answers:
-        q = Question.query.get(ans.question_id)
+    for ans, q in rows:
         d = ans.to_dict()
         if q:
             d['question'] = q.to_dict()
@@ -361,123 +747,59 @@ def delete_tag(question_id, tag):
 
 @api.route('/api/v1/stats/overview', methods=['GET'])
 def stats_overview():
-    total_questions = Question.query.count()
-    total_studied = StudyProgress.query.filter(
-        StudyProgress.times_seen > 0).count()
+    summary = rollups.get_study_summary()
+    total_questions = (db.session.query(db.func.sum(CategoryStats.total))
+                       .scalar() or 0)
 
+    # Due-ness depends on the clock, so it is the one live count here
     now = datetime.utcnow()
     total_due = StudyProgress.query.filter(
         StudyProgress.next_review_at <= now).count()
     # Also count unseen as due
-    unseen_count = total_questions - StudyProgress.query.count()
-    total_due += unseen_count
-
-    # Accuracy
-    result = db.session.query(
-        db.func.sum(StudyProgress.times_correct),
-        db.func.sum(StudyProgress.times_seen)
-    ).first()
-    total_correct = result[0] or 0
-    total_seen = result[1] or 0
+    total_due += total_questions - summary.total_tracked
+
+    total_correct = summary.total_correct
+    total_seen = summary.total_seen
     accuracy_pct = round((total_correct / total_seen * 100), 1) if total_seen > 0 else 0
 
     # Questions studied today
-    today_str = datetime.utcnow().strftime('%Y-%m-%d')
-    daily = DailyActivity.query.get(today_str)
+    today = now.date()
+    daily = DailyActivity.query.get(today.isoformat())
     questions_today = daily.questions_studied if daily else 0
 
-    # Streaks
-    current_streak = 0
-    longest_streak = 0
-    activities = (DailyActivity.query
-                  .filter(DailyActivity.questions_studied > 0)
-                  .order_by(DailyActivity.date.desc())
-                  .all())
-
-    if activities:
-        streak = 0
-        expected_date = datetime.utcnow().date()
-        # Allow today to not have activity yet (check yesterday too)
-        first_activity_date = datetime.strptime(activities[0].date, '%Y-%m-%d').date()
-        if first_activity_date == expected_date:
-            pass  # started today
-        elif first_activity_date == expected_date - timedelta(days=1):
-            expected_date = expected_date - timedelta(days=1)
-        else:
-            expected_date = None  # streak broken
-
-        if expected_date is not None:
-            for act in activities:
-                act_date = datetime.strptime(act.date, '%Y-%m-%d').date()
-                if act_date == expected_date:
-                    streak += 1
-                    expected_date -= timedelta(days=1)
-                else:
-                    break
-        current_streak = streak
-
-        # Longest streak: iterate all dates sorted ascending
-        sorted_acts = sorted(activities, key=lambda a: a.date)
-        temp_streak = 1
-        longest_streak = 1
-        for i in range(1, len(sorted_acts)):
-            prev = datetime.strptime(sorted_acts[i - 1].date, '%Y-%m-%d').date()
-            curr = datetime.strptime(sorted_acts[i].date, '%Y-%m-%d').date()
-            if (curr - prev).days == 1:
-                temp_streak += 1
-                longest_streak = max(longest_streak, temp_streak)
-            else:
-                temp_streak = 1
-        if not activities:
-            longest_streak = 0
-
     return jsonify({
         'total_questions': total_questions,
-        'total_studied': total_studied,
+        'total_studied': summary.total_studied,
         'total_due': total_due,
         'accuracy_pct': accuracy_pct,
-        'current_streak': current_streak,
-        'longest_streak': longest_streak,
+        'current_streak': rollups.current_streak(summary, today),
+        'longest_streak': summary.longest_streak,
         'questions_today': questions_today,
     })
 
 
 @api.route('/api/v1/stats/categories', methods=['GET'])
+@http_cache.versioned()
+@read_cache.cached()
 def stats_categories():
+    rollup = {row.category: row for row in CategoryStats.query.all()}
+
     results = []
     for cat in LL_CATEGORIES:
-        total = Question.query.filter_by(category=cat).count()
-
-        studied_q = (db.session.query(db.func.count(StudyProgress.id))
-                     .join(Question)
-                     .filter(Question.category == cat,
-                             StudyProgress.times_seen > 0)
-                     .scalar())
-
-        acc_data = (db.session.query(
-            db.func.sum(StudyProgress.times_correct),
-            db.func.sum(StudyProgress.times_seen)
-        ).join(Question)
-         .filter(Question.category == cat)
-         .first())
-
-        tc = acc_data[0] or 0
-        ts = acc_data[1] or 0
-        accuracy_pct = round((tc / ts * 100), 1) if ts > 0 else 0
+        row = rollup.get(cat)
+        total = row.total if row else 0
+        studied = row.studied if row else 0
+        ts = row.times_seen if row else 0
+        tc = row.times_correct if row else 0
+        mastery_count = row.mastery_count if row else 0
 
-        # Mastery: confidence >= 3 AND interval_days >= 7
-        mastery_count = (db.session.query(db.func.count(StudyProgress.id))
-                         .join(Question)
-                         .filter(Question.category == cat,
-                                 StudyProgress.confidence >= 3,
-                                 StudyProgress.interval_days >= 7)
-                         .scalar())
+        accuracy_pct = round((tc / ts * 100), 1) if ts > 0 else 0
         mastery_pct = round((mastery_count / total * 100), 1) if total > 0 else 0
 
         results.append({
             'category': cat,
             'total': total,
-            'studied': studied_q,
+            'studied': studied,
             'accuracy_pct': accuracy_pct,
             'mastery_pct': mastery_pct,
         })
@@ -486,6 +808,8 @@ def stats_categories():
 
 
 @api.route('/api/v1/stats/trends', methods=['GET'])
+@http_cache.versioned(per_day=True)
+@read_cache.cached(per_day=True)
 def stats_trends():
     days = request.args.get('days', 30, type=int)
     end_date = datetime.utcnow().date()
@@ -525,6 +849,8 @@ def stats_trends():
 
 
 @api.route('/api/v1/stats/heatmap', methods=['GET'])
+@http_cache.versioned(per_day=True)
+@read_cache.cached(per_day=True)
 def stats_heatmap():
     end_date = datetime.utcnow().date()
     start_date = end_date - timedelta(days=364)
@@ -550,28 +876,23 @@ def stats_heatmap():
 
 
 @api.route('/api/v1/stats/weakest', methods=['GET'])
+@http_cache.versioned()
 def stats_weakest():
-    progress_list = (StudyProgress.query
-                     .filter(StudyProgress.times_seen > 0)
-                     .all())
-
-    # Calculate accuracy and sort
-    scored = []
-    for p in progress_list:
-        acc = p.times_correct / p.times_seen if p.times_seen > 0 else 0
-        scored.append((p, acc))
-
-    scored.sort(key=lambda x: x[1])
-    top_20 = scored[:20]
+    # Ranked in SQL off the indexed accuracy column (NULL until first seen)
+    rows = (db.session.query(StudyProgress, Question)
+            .join(Question, Question.id == StudyProgress.question_id)
+            .options(db.lazyload('*'))
+            .filter(StudyProgress.accuracy.isnot(None))
+            .order_by(StudyProgress.accuracy.asc(), StudyProgress.id.asc())
+            .limit(20)
+            .all())
 
     results = []
-    for p, acc in top_20:
-        q = Question.query.get(p.question_id)
-        if q:
-            d = q.to_dict()
-            d['progress'] = p.to_dict()
-            d['accuracy'] = round(acc * 100, 1)
-            results.append(d)
+    for p, q in rows:
+        d = q.to_dict()
+        d['progress'] = p.to_dict()
+        d['accuracy'] = round(p.accuracy * 100, 1)
+        results.append(d)
 
     return jsonify(results)
 
@@ -580,119 +901,271 @@ def stats_weakest():
 # AI / LEARN MORE
 # ===========================================================================
 
-@api.route('/api/v1/learn-more', methods=['POST'])
-def learn_more():
+jobs.set_pool_limit(ai.POOL, AI_MAX_CONCURRENCY)
+
+
+# Streams get partial replies through jobs.watch as they are published;
+# the checkpoint, only needed to resume or to stream from another worker,
+# is saved at most this often
+CHECKPOINT_INTERVAL = 1.0
+SSE_KEEPALIVE = 15
+
+
+def _throttled(fn, interval=CHECKPOINT_INTERVAL):
+    """Call ``fn()`` at most every ``interval`` seconds; returns the caller."""
+    last = [0.0]
+
+    def call():
+        now = time.monotonic()
+        if now - last[0] >= interval:
+            last[0] = now
+            fn()
+    return call
+
+
+@jobs.handler('learn_more', pool=ai.POOL)
+def _learn_more_job(ctx, params):
+    """Generate one explanation, publishing the text written so far.
+
+    The result's ``cached`` is true if the explanation already existed and
+    ``usage`` holds the tokens the call used.
+    """
+    question_id, mode = params['question_id'], params['mode']
+    cached = ai.cached_explanation(question_id, mode)
+    if cached:
+        return {'ai_response': cached.to_dict(), 'cached': True}
+
+    parts = []
+    usage = {}
+    save_text = _throttled(lambda: ctx.checkpoint(text=''.join(parts)))
+    if ctx.checkpoint_state.get('text'):
+        ctx.checkpoint(text='')    # resumed: the reply starts over
+
+    def on_text(chunk):
+        parts.append(chunk)
+        ctx.publish(text=''.join(parts))
+        save_text()
+
+    def on_usage(input_tokens, output_tokens):
+        usage.update(input_tokens=input_tokens, output_tokens=output_tokens)
+
+    ai_resp = ai.explain(question_id, mode, on_usage=on_usage, on_text=on_text)
+    return {'ai_response': ai_resp.to_dict(), 'cached': False, 'usage': usage}
+
+
+def _learn_more_args():
+    """Validated (question, mode) from a Learn More body, or an error response."""
     data = request.get_json()
     if not data:
-        return jsonify({'error': 'Request body required'}), 400
+        return None, (jsonify({'error': 'Request body required'}), 400)
 
     question_id = data.get('question_id')
     mode = data.get('mode')
 
-    if not question_id or mode not in ('quick', 'deep_dive', 'quiz_bowl'):
-        return jsonify({'error': 'question_id and valid mode required'}), 400
+    if not question_id or mode not in ai.EXPLANATION_MODES:
+        return None, (jsonify({'error': 'question_id and valid mode required'}), 400)
 
     question = Question.query.get(question_id)
     if not question:
-        return jsonify({'error': 'Question not found'}), 404
+        return None, (jsonify({'error': 'Question not found'}), 404)
+    return (question, mode), None
+
+
+def _sse(event, data):
+    """One Server-Sent Events message with a JSON payload."""
+    return f'event: {event}\ndata: {json.dumps(data)}\n\n'
 
-    # Check cache
-    cached = AIResponse.query.filter_by(
-        question_id=question_id, mode=mode).first()
+
+def _ended_job(job_id):
+    """A fresh copy of a job once ``jobs.watch`` has seen it end."""
+    db.session.remove()
+    return db.session.get(Job, job_id)
+
+
+def _sse_response(events):
+    """Stream SSE messages, unbuffered by proxies."""
+    return Response(
+        stream_with_context(events),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'},
+    )
+
+
+@api.route('/api/v1/learn-more', methods=['POST'])
+def learn_more():
+    """Explanation for a question, generated in the background.
+
+    A cached explanation is returned directly. Otherwise the response is
+    202 with a ``learn_more`` job to poll (``/api/v1/jobs/<id>``); its
+    result holds ``ai_response``. Concurrent requests for the same
+    question and mode share one job.
+    """
+    args, error = _learn_more_args()
+    if error:
+        return error
+    question, mode = args
+
+    cached = ai.cached_explanation(question.id, mode)
     if cached:
         return jsonify(cached.to_dict())
 
-    # Build prompt
-    if mode == 'quick':
-        prompt = (
-            f"I'm studying trivia. Give me a brief, memorable explanation for "
-            f"why the answer to this question is what it is. Include a helpful "
-            f"mnemonic or memory trick if possible.\n\n"
-            f"Category: {question.category}\n"
-            f"Question: {question.question_text}\n"
-            f"Answer: {question.answer}\n\n"
-            f"Keep your response concise (2-3 paragraphs max)."
-        )
-    elif mode == 'deep_dive':
-        prompt = (
-            f"I'm studying trivia and want a deep dive on this topic. "
-            f"Provide comprehensive background information, historical context, "
-            f"related facts, and connections to other trivia topics.\n\n"
-            f"Category: {question.category}\n"
-            f"Question: {question.question_text}\n"
-            f"Answer: {question.answer}\n\n"
-            f"Be thorough and educational. Include interesting tangential facts "
-            f"that might help with other trivia questions."
-        )
-    elif mode == 'quiz_bowl':
-        prompt = (
-            f"Based on this trivia question and answer, generate 5 related "
-            f"trivia questions with answers that test related knowledge. "
-            f"Format each as 'Q: ... A: ...' on separate lines.\n\n"
-            f"Category: {question.category}\n"
-            f"Original Question: {question.question_text}\n"
-            f"Original Answer: {question.answer}\n\n"
-            f"Make the questions progressively harder and cover related topics."
-        )
+    if not ANTHROPIC_API_KEY:
+        return jsonify({'error': 'ANTHROPIC_API_KEY not configured'}), 500
+
+    job = jobs.enqueue('learn_more', {'question_id': question.id, 'mode': mode},
+                       dedupe_key=ai.explanation_key(question.id, mode))
+    jobs.run_soon(current_app._get_current_object(), job)
+    return jsonify({'job': job.to_dict(include_log=False)}), 202
+
+
+@api.route('/api/v1/learn-more/stream', methods=['POST'])
+def learn_more_stream():
+    """Learn More as Server-Sent Events, text streamed as it is generated.
+
+    Events: ``text`` ({"text": ...}) for each chunk, then ``done`` with the
+    stored ai_response, or ``error`` ({"error": ...}). A cached
+    explanation is replayed at once as a single ``text`` event. Otherwise
+    the stream joins (or queues) the ``learn_more`` job for the question
+    and mode, the same one ``/learn-more`` uses, and relays the text it
+    publishes, so concurrent requests share one generation and the
+    ``ai`` pool limit holds across workers.
+    """
+    args, error = _learn_more_args()
+    if error:
+        return error
+    question, mode = args
+
+    cached = ai.cached_explanation(question.id, mode)
+    if cached:
+        return _sse_response(iter([_sse('text', {'text': cached.response_text}),
+                                   _sse('done', cached.to_dict())]))
 
     if not ANTHROPIC_API_KEY:
         return jsonify({'error': 'ANTHROPIC_API_KEY not configured'}), 500
 
+    job = jobs.enqueue('learn_more', {'question_id': question.id, 'mode': mode},
+                       dedupe_key=ai.explanation_key(question.id, mode))
+    jobs.run_soon(current_app._get_current_object(), job)
+    job_id = job.id
+
+    def generate():
+        sent = ''
+        last_sent = time.monotonic()
+        for state in jobs.watch(job_id):
+            text = state.get('text', '')
+            # A resumed job starts over; ``done`` carries the full text
+            if len(text) > len(sent) and text.startswith(sent):
+                yield _sse('text', {'text': text[len(sent):]})
+                sent = text
+                last_sent = time.monotonic()
+            elif time.monotonic() - last_sent >= SSE_KEEPALIVE:
+                yield ': waiting\n\n'
+                last_sent = time.monotonic()
+        job = _ended_job(job_id)
+        if job.status == 'succeeded':
+            text = job.result['ai_response']['response_text']
+            if len(text) > len(sent) and text.startswith(sent):
+                yield _sse('text', {'text': text[len(sent):]})
+            yield _sse('done', job.result['ai_response'])
+        else:
+            yield _sse('error', {'error': f'AI generation failed: {job.error or job.status}'})
+
+    return _sse_response(generate())
+
+
+def _prewarm_question_ids(params):
+    """Ids of the questions a prewarm job covers."""
+    query = _filter_questions(Question.query.options(db.lazyload('*')),
+                              params.get('category'),
+                              params.get('subcategory'),
+                              params.get('difficulty'))
+    if params.get('mode') == 'review':
+        # The review queue, in the order the cards come due
+        return [q.id for q in review_queue.next_due(query, params['limit'])]
+    query = _filter_mode(query, params.get('mode'))
+    return [qid for (qid,) in query.with_entities(Question.id)
+            .order_by(Question.id.asc()).limit(params['limit'])]
+
+
+@jobs.handler('prewarm_explanations')
+def _prewarm_job(ctx, params):
+    # The question set is fixed on the first run so a resumed job finishes
+    # the same set even if the review queue has moved on
+    question_ids = ctx.checkpoint_state.get('question_ids')
+    if question_ids is None:
+        question_ids = _prewarm_question_ids(params)
+        ctx.checkpoint(question_ids=question_ids)
+    return prewarm.run(ctx, current_app._get_current_object(), question_ids,
+                       params['modes'], params['concurrency'],
+                       max_tokens=params.get('max_tokens'),
+                       max_cost=params.get('max_cost_usd'))
+
+
+@api.route('/api/v1/ai/prewarm', methods=['POST'])
+def prewarm_explanations():
+    """Generate Learn More explanations ahead of time, as a job.
+
+    Body: the question list's ``category``/``subcategory``/``difficulty``/
+    ``mode`` filters (``mode=review`` takes the review queue in due
+    order), ``limit`` questions (default 200), the explanation ``modes``
+    (default all), ``concurrency`` (at most ``prewarm.MAX_CONCURRENCY``,
+    one less than the ai pool, so interactive requests keep a slot) and
+    optional ``max_tokens`` / ``max_cost_usd`` budgets. Cached
+    explanations are skipped. Responds 202 with the job to poll.
+    """
+    if jobs.active_job('prewarm_explanations'):
+        return jsonify({'error': 'Prewarm already in progress'}), 409
+
+    data = request.get_json() or {}
+    modes = data.get('modes') or list(ai.EXPLANATION_MODES)
+    if (not isinstance(modes, list)
+            or not set(modes) <= set(ai.EXPLANATION_MODES)):
+        return jsonify({'error': f'modes must be a list of {", ".join(ai.EXPLANATION_MODES)}'}), 400
+    if data.get('mode') not in (None, 'review', 'unseen', 'bookmarked'):
+        return jsonify({'error': f"Unknown mode: {data['mode']}"}), 400
+
     try:
-        import anthropic
-        client = anthropic.Anthropic(api_key=ANTHROPIC_API_KEY)
-        message = client.messages.create(
-            model='claude-sonnet-4-5-20250929',
-            max_tokens=1500,
-            messages=[{'role': 'user', 'content': prompt}],
-        )
-        response_text = message.content[0].text
+        limit = min(max(int(data.get('limit', 200)), 1), prewarm.MAX_QUESTIONS)
+        concurrency = min(max(int(data.get('concurrency', prewarm.MAX_CONCURRENCY)), 1),
+                          prewarm.MAX_CONCURRENCY)
+        max_tokens = data.get('max_tokens')
+        max_tokens = int(max_tokens) if max_tokens is not None else None
+        max_cost = data.get('max_cost_usd')
+        max_cost = float(max_cost) if max_cost is not None else None
+    except (TypeError, ValueError):
+        return jsonify({'error': 'limit, concurrency and budgets must be numbers'}), 400
 
-        ai_resp = AIResponse(
-            question_id=question_id,
-            mode=mode,
-            response_text=response_text,
-        )
-        db.session.add(ai_resp)
-        db.session.commit()
-        return jsonify(ai_resp.to_dict())
+    if not ANTHROPIC_API_KEY:
+        return jsonify({'error': 'ANTHROPIC_API_KEY not configured'}), 500
 
-    except Exception as e:
-        return jsonify({'error': f'AI request failed: {str(e)}'}), 500
+    job = jobs.enqueue('prewarm_explanations', {
+        'category': data.get('category'),
+        'subcategory': data.get('subcategory'),
+        'difficulty': data.get('difficulty'),
+        'mode': data.get('mode'),
+        'limit': limit,
+        'modes': list(dict.fromkeys(modes)),
+        'concurrency': concurrency,
+        'max_tokens': max_tokens,
+        'max_cost_usd': max_cost,
+    })
+    return jsonify({'job': job.to_dict()}), 202
 
 
 # ===========================================================================
 # AI QUESTION FORGE
 # ===========================================================================
 
-@api.route('/api/v1/ai/generate-questions', methods=['POST'])
-def generate_questions():
-    """Generate practice questions using Claude AI."""
-    data = request.get_json()
-    if not data:
-        return jsonify({'error': 'Request body required'}), 400
-
-    category = data.get('category')
-    count = data.get('count', 5)
-    difficulty_hint = data.get('difficulty_hint', 'mixed')
-
-    if not category:
-        return jsonify({'error': 'category is required'}), 400
+FORGE_MAX_TOKENS = 3000
 
-    if category not in LL_CATEGORIES:
-        return jsonify({'error': f'Unknown category: {category}'}), 400
-
-    count = min(max(int(count), 1), 10)
-
-    if not ANTHROPIC_API_KEY:
-        return jsonify({'error': 'ANTHROPIC_API_KEY not configured'}), 500
 
+def _forge_prompt(category, count, difficulty_hint):
+    """Prompt asking Claude for ``count`` new questions in ``category``."""
     # Gather some real questions from this category for context
-    sample_questions = (Question.query
-                        .filter_by(category=category, is_ai_generated=False)
-                        .order_by(db.func.random())
-                        .limit(5)
-                        .all())
+    sample_questions = sampling.sample(
+        Question.query.options(db.lazyload('*'))
+        .filter_by(category=category, is_ai_generated=False),
+        5, category=category)
 
     examples_text = ''
     if sample_questions:
@@ -707,7 +1180,7 @@ def generate_questions():
         'mixed': 'Vary the difficulty — include some easy, some moderate, and some challenging questions.',
     }.get(difficulty_hint, 'Vary the difficulty.')
 
-    prompt = (
+    return (
         f"Generate exactly {count} trivia questions in the category '{category}' "
         f"suitable for a LearnedLeague-style trivia competition.\n\n"
         f"{difficulty_instruction}\n\n"
@@ -723,69 +1196,315 @@ def generate_questions():
         f"Return ONLY the JSON array, no other text."
     )
 
-    try:
-        import anthropic
-        client = anthropic.Anthropic(api_key=ANTHROPIC_API_KEY)
-        message = client.messages.create(
-            model='claude-sonnet-4-5-20250929',
-            max_tokens=3000,
-            messages=[{'role': 'user', 'content': prompt}],
-        )
-        response_text = message.content[0].text.strip()
-
-        # Parse JSON from response (handle possible markdown code fences)
-        if response_text.startswith('```'):
-            lines = response_text.split('\n')
-            # Remove first and last lines (``` markers)
-            lines = [l for l in lines if not l.strip().startswith('```')]
-            response_text = '\n'.join(lines)
-
-        generated = json.loads(response_text)
-
-        if not isinstance(generated, list):
-            return jsonify({'error': 'AI returned unexpected format'}), 500
-
-        # Save to DB
-        saved_questions = []
-        for i, item in enumerate(generated):
-            q = Question(
-                season=0,
-                match_day=0,
-                question_number=i + 1,
-                question_text=item.get('question_text', ''),
-                answer=item.get('answer', ''),
-                category=category,
-                percent_correct=item.get('difficulty_estimate'),
-                is_ai_generated=True,
-            )
-            db.session.add(q)
-            db.session.flush()  # get the ID
-            saved_questions.append(q.to_dict())
 
-        db.session.commit()
-        return jsonify({
-            'questions': saved_questions,
-            'count': len(saved_questions),
-        })
+def _forged_question(category, number, item):
+    """Unsaved Question for one generated item."""
+    return Question(
+        season=0,
+        match_day=0,
+        question_number=number,
+        question_text=item.get('question_text', ''),
+        answer=item.get('answer', ''),
+        category=category,
+        percent_correct=item.get('difficulty_estimate'),
+        is_ai_generated=True,
+    )
+
+
+def _save_forged(category, generated):
+    """Save generated items as questions and return them as dicts. Commits."""
+    saved_questions = []
+    for i, item in enumerate(generated):
+        q = _forged_question(category, i + 1, item)
+        db.session.add(q)
+        db.session.flush()  # get the ID
+        saved_questions.append(q.to_dict())
 
+    rollups.bump_category(category, total=len(saved_questions))
+    sampling.assign_ranks()
+    db.session.commit()
+    return saved_questions
+
+
+def _forged_preview(category, index, item):
+    """A generated question as shown before it is saved (no id yet)."""
+    q = _forged_question(category, index + 1, item)
+    return {
+        'index': index,
+        'question_text': q.question_text,
+        'answer': q.answer,
+        'category': q.category,
+        'percent_correct': q.percent_correct,
+        'is_ai_generated': True,
+    }
+
+
+def _stream_forge(category, count, difficulty_hint, on_item):
+    """Ask Claude for ``count`` new questions in ``category`` and save them.
+
+    The reply is streamed and ``on_item(item)`` is called with each
+    generated item as soon as its JSON object is complete. Returns the
+    saved questions as dicts; raises ValueError when the reply cannot be
+    used.
+    """
+    prompt = _forge_prompt(category, count, difficulty_hint)
+    reader = ai.JsonArrayReader()
+    generated = []
+    try:
+        for text in ai.stream(prompt, FORGE_MAX_TOKENS):
+            for item in reader.feed(text):
+                if isinstance(item, dict):
+                    generated.append(item)
+                    on_item(item)
     except json.JSONDecodeError as e:
-        return jsonify({'error': f'Failed to parse AI response: {str(e)}'}), 500
-    except Exception as e:
-        return jsonify({'error': f'AI generation failed: {str(e)}'}), 500
+        raise ValueError(f'Failed to parse AI response: {e}') from e
+    if not reader.finished:
+        raise ValueError('AI reply ended before the question list did')
+    return _save_forged(category, generated)
+
+
+@jobs.handler('generate_questions', pool=ai.POOL)
+def _generate_questions_job(ctx, params):
+    """Generate and save questions, publishing each one as it arrives."""
+    category = params['category']
+    ctx.log(f"Generating {params['count']} {category} questions...")
+    previews = []
+    save_previews = _throttled(lambda: ctx.checkpoint(questions=previews))
+    if ctx.checkpoint_state.get('questions'):
+        ctx.checkpoint(questions=[])    # resumed: the reply starts over
+
+    def on_item(item):
+        previews.append(_forged_preview(category, len(previews), item))
+        ctx.publish(questions=list(previews))
+        save_previews()
+
+    saved = _stream_forge(category, params['count'],
+                          params.get('difficulty_hint', 'mixed'), on_item)
+    ctx.log(f'Saved {len(saved)} questions')
+    return {'questions': saved, 'count': len(saved)}
+
+
+def _forge_args():
+    """Validated (category, count, difficulty_hint), or an error response."""
+    data = request.get_json()
+    if not data:
+        return None, (jsonify({'error': 'Request body required'}), 400)
+
+    category = data.get('category')
+    count = data.get('count', 5)
+    difficulty_hint = data.get('difficulty_hint', 'mixed')
+
+    if not category:
+        return None, (jsonify({'error': 'category is required'}), 400)
+
+    if category not in LL_CATEGORIES:
+        return None, (jsonify({'error': f'Unknown category: {category}'}), 400)
+
+    count = min(max(int(count), 1), 10)
+
+    if not ANTHROPIC_API_KEY:
+        return None, (jsonify({'error': 'ANTHROPIC_API_KEY not configured'}), 500)
+    return (category, count, difficulty_hint), None
+
+
+def _enqueue_forge(category, count, difficulty_hint):
+    """Queue a generate_questions job and start it on this worker."""
+    job = jobs.enqueue('generate_questions', {
+        'category': category,
+        'count': count,
+        'difficulty_hint': difficulty_hint,
+    })
+    jobs.run_soon(current_app._get_current_object(), job)
+    return job
+
+
+@api.route('/api/v1/ai/generate-questions', methods=['POST'])
+def generate_questions():
+    """Generate practice questions using Claude AI, as a job.
+
+    Responds 202 with the ``generate_questions`` job to poll
+    (``/api/v1/jobs/<id>``); its result holds ``questions`` and
+    ``count``. Use the ``/stream`` variant to see questions as they are
+    written.
+    """
+    args, error = _forge_args()
+    if error:
+        return error
+    job = _enqueue_forge(*args)
+    return jsonify({'job': job.to_dict()}), 202
+
+
+@api.route('/api/v1/ai/generate-questions/stream', methods=['POST'])
+def generate_questions_stream():
+    """Question Forge as Server-Sent Events.
+
+    Runs a ``generate_questions`` job (so it counts against the ``ai``
+    pool limit) and relays each question it parses as a ``question``
+    event (question fields plus ``index``, no id yet). When the reply
+    ends the questions are saved and ``done`` carries the stored
+    questions, as the non-streaming endpoint returns them; failures end
+    the stream with ``error``.
+    """
+    args, error = _forge_args()
+    if error:
+        return error
+    job_id = _enqueue_forge(*args).id
+
+    def generate():
+        sent = 0
+        last_sent = time.monotonic()
+        for state in jobs.watch(job_id):
+            previews = state.get('questions', [])
+            for preview in previews[sent:]:
+                yield _sse('question', preview)
+            if len(previews) > sent:
+                sent = len(previews)
+                last_sent = time.monotonic()
+            elif time.monotonic() - last_sent >= SSE_KEEPALIVE:
+                yield ': waiting\n\n'
+                last_sent = time.monotonic()
+        job = _ended_job(job_id)
+        if job.status == 'succeeded':
+            yield _sse('done', job.result)
+        else:
+            yield _sse('error', {'error': f'AI generation failed: {job.error or job.status}'})
+
+    return _sse_response(generate())
 
 
 # ===========================================================================
 # IMPORT / SCRAPER
 # ===========================================================================
 
+QUESTIONS_PER_MATCH_DAY = frozenset(range(1, 7))
+
+
+class _ScrapedQuestionSaver:
+    """Persists scraped match days for one scrape job.
+
+    The existing ``(season, match_day, question_number)`` keys for the
+    season range are loaded once up front, so duplicate checks are set
+    lookups; new rows go through ``bulk_load.upsert_rows`` (one INSERT ...
+    ON CONFLICT DO NOTHING executemany per match day). Runs inside the job
+    worker's app context.
+    """
+
+    def __init__(self, start_season, end_season):
+        self.known_keys = set(
+            db.session.query(Question.season, Question.match_day,
+                             Question.question_number)
+            .filter(Question.season.between(start_season, end_season))
+            .all())
+
+    def complete_match_days(self):
+        """(season, match_day) pairs that already have all 6 questions."""
+        numbers = {}
+        for season, match_day, qnum in self.known_keys:
+            numbers.setdefault((season, match_day), set()).add(qnum)
+        return {pair for pair, qnums in numbers.items()
+                if qnums >= QUESTIONS_PER_MATCH_DAY}
+
+    def __call__(self, questions_list):
+        rows = []
+        skipped = 0
+        for q_data in questions_list:
+            row = bulk_load.question_row(q_data)
+            key = (row['season'], row['match_day'], row['question_number'])
+            if key in self.known_keys:
+                skipped += 1
+                continue
+            self.known_keys.add(key)
+            rows.append(row)
+
+        if not rows:
+            return 0, skipped
+
+        saved = bulk_load.upsert_rows(rows, update_columns=())
+        if saved == len(rows):
+            saved_by_category = {}
+            for row in rows:
+                saved_by_category[row['category']] = (
+                    saved_by_category.get(row['category'], 0) + 1)
+            for cat, n in saved_by_category.items():
+                rollups.bump_category(cat, total=n)
+        else:
+            # Someone else inserted some of these meanwhile
+            rollups.rebuild_category_stats()
+        db.session.commit()
+        return saved, skipped + len(rows) - saved
+
+
+@jobs.handler('scrape', secrets=True)
+def _scrape_job(ctx, params):
+    """Scrape a season range, checkpointing after every match day."""
+    from page_archive import PageArchive
+    from scraper import scrape_season_range
+
+    state = ctx.checkpoint_state
+    totals = {
+        'total_saved': state.get('total_saved', 0),
+        'total_skipped': state.get('total_skipped', 0),
+    }
+    resume_after = state.get('last_completed')
+    if resume_after:
+        ctx.log(f'Resuming after LL{resume_after[0]} MD{resume_after[1]}')
+
+    password = ctx.secrets.get('password')
+    if not password:
+        raise ValueError('LearnedLeague password not available; '
+                         'start the scrape again to resume it')
+
+    save_questions = _ScrapedQuestionSaver(int(params['start_season']),
+                                           int(params['end_season']))
+    # Only fetch match days that are missing questions
+    complete = save_questions.complete_match_days()
+
+    def save(questions_list):
+        saved, skipped = save_questions(questions_list)
+        totals['total_saved'] += saved
+        totals['total_skipped'] += skipped
+        return saved, skipped
+
+    def on_match_day(season, match_day, completed, total):
+        ctx.checkpoint(last_completed=[season, match_day], **totals)
+        ctx.progress(completed, total)
+
+    result = scrape_season_range(
+        start_season=int(params['start_season']),
+        end_season=int(params['end_season']),
+        username=params['username'],
+        password=password,
+        progress_callback=ctx.log,
+        save_callback=save,
+        resume_after=resume_after,
+        match_day_callback=on_match_day,
+        should_cancel=ctx.cancelled,
+        concurrency=SCRAPE_CONCURRENCY,
+        rate=SCRAPE_RATE,
+        archive=PageArchive(SCRAPE_ARCHIVE_DIR) if SCRAPE_ARCHIVE_DIR else None,
+        skip=complete,
+    )
+    if result.get('cancelled'):
+        raise jobs.JobCancelled()
+
+    ctx.log(f"Done! Saved {totals['total_saved']}, "
+            f"skipped {totals['total_skipped']}.")
+    return {
+        'total_saved': totals['total_saved'],
+        'total_skipped': totals['total_skipped'],
+        'errors': result.get('errors', []),
+    }
+
+
 @api.route('/api/v1/import/scrape', methods=['POST'])
 def start_scrape():
-    global scrape_status
-
-    with scrape_status_lock:
-        if scrape_status['running']:
-            return jsonify({'error': 'Scrape already in progress'}), 409
+    """Start a scrape job, or resume one whose worker died.
 
+    The password is only held in this worker's memory, never in the jobs
+    table, so a scrape interrupted by a restart waits for it to be
+    entered again (``awaiting_credentials`` in /import/status); posting
+    the credentials then resumes it from its checkpoint.
+    """
     data = request.get_json()
     if not data:
         return jsonify({'error': 'Request body required'}), 400
@@ -795,156 +1514,241 @@ def start_scrape():
     start_season = data.get('start_season')
     end_season = data.get('end_season')
 
+    active = jobs.active_job('scrape')
+    if active and not jobs.awaiting_secrets(active):
+        return jsonify({'error': 'Scrape already in progress'}), 409
+
+    if active:
+        if not password or username != active.params['username']:
+            return jsonify({
+                'error': 'username and password of the interrupted scrape required'
+            }), 400
+        jobs.provide_secrets(active, {'password': password})
+        jobs.run_soon(current_app._get_current_object(), active)
+        return jsonify({'status': 'resumed', 'job_id': active.id})
+
     if not all([username, password, start_season, end_season]):
         return jsonify({
             'error': 'username, password, start_season, end_season required'
         }), 400
 
-    with scrape_status_lock:
-        scrape_status = {
-            'running': True,
-            'messages': ['Starting scrape...'],
-            'result': None,
-        }
+    job = jobs.enqueue('scrape', {
+        'username': username,
+        'start_season': int(start_season),
+        'end_season': int(end_season),
+    }, secrets={'password': password})
+    jobs.run_soon(current_app._get_current_object(), job)
+    return jsonify({'status': 'started', 'job_id': job.id})
 
-    def _save_callback(questions_list):
-        """Persist a batch of scraped questions to the DB."""
-        saved = 0
-        skipped = 0
-        app_inner = create_app()
-        with app_inner.app_context():
-            for q_data in questions_list:
-                # Parse season from string like "LL102" to int 102
-                season_raw = q_data.get('season', 0)
-                if isinstance(season_raw, str):
-                    season_val = int(season_raw.replace('LL', ''))
-                else:
-                    season_val = int(season_raw)
-
-                existing = Question.query.filter_by(
-                    season=season_val,
-                    match_day=q_data['match_day'],
-                    question_number=q_data['question_number'],
-                ).first()
-                if existing:
-                    skipped += 1
-                    continue
-
-                q = Question(
-                    season=season_val,
-                    match_day=q_data['match_day'],
-                    question_number=q_data['question_number'],
-                    question_text=q_data.get('question_text', ''),
-                    answer=q_data.get('answer', ''),
-                    category=q_data.get('category', ''),
-                    percent_correct=q_data.get('percent_correct'),
-                )
-                db.session.add(q)
-                saved += 1
-            db.session.commit()
-        return saved, skipped
 
-    def run_scrape():
-        global scrape_status
-        try:
-            from scraper import scrape_season_range
-            result = scrape_season_range(
-                start_season=int(start_season),
-                end_season=int(end_season),
-                username=username,
-                password=password,
-                progress_callback=_scrape_callback,
-                save_callback=_save_callback,
-            )
-
-            with scrape_status_lock:
-                scrape_status['running'] = False
-                scrape_status['result'] = {
-                    'total_saved': result.get('total_saved', 0),
-                    'total_skipped': result.get('total_skipped', 0),
-                    'errors': result.get('errors', []),
-                }
-                scrape_status['messages'].append(
-                    f"Done! Saved {result.get('total_saved', 0)}, "
-                    f"skipped {result.get('total_skipped', 0)}.")
+@api.route('/api/v1/import/status', methods=['GET'])
+def scrape_status_endpoint():
+    """Status of the latest scrape job, in the original polling format."""
+    job = (Job.query.filter_by(kind='scrape')
+           .order_by(Job.id.desc()).first())
+    if not job:
+        return jsonify({'running': False, 'messages': [], 'result': None})
+
+    result = job.result
+    if result is None and job.error:
+        result = {'error': job.error}
+    awaiting = jobs.awaiting_secrets(job)
+    return jsonify({
+        'running': job.is_active and not awaiting,
+        'awaiting_credentials': awaiting,
+        'messages': job.log or ['Starting scrape...'],
+        'result': result,
+        'job': job.to_dict(include_log=False),
+    })
 
-        except Exception as e:
-            with scrape_status_lock:
-                scrape_status['running'] = False
-                scrape_status['result'] = {'error': str(e)}
-                scrape_status['messages'].append(f'Error: {str(e)}')
 
-    thread = threading.Thread(target=run_scrape, daemon=True)
-    thread.start()
-    return jsonify({'status': 'started'})
+# ===========================================================================
+# JOBS
+# ===========================================================================
+
+@api.route('/api/v1/jobs', methods=['GET'])
+def list_jobs():
+    kind = request.args.get('kind')
+    limit = min(request.args.get('limit', 20, type=int), 100)
 
+    query = Job.query.order_by(Job.id.desc())
+    if kind:
+        query = query.filter(Job.kind == kind)
+    return jsonify([j.to_dict(include_log=False) for j in query.limit(limit)])
 
-def _scrape_callback(message):
-    global scrape_status
-    with scrape_status_lock:
-        scrape_status['messages'].append(message)
 
+@api.route('/api/v1/jobs/<int:job_id>', methods=['GET'])
+def get_job(job_id):
+    return jsonify(Job.query.get_or_404(job_id).to_dict())
 
-@api.route('/api/v1/import/status', methods=['GET'])
-def scrape_status_endpoint():
-    with scrape_status_lock:
-        return jsonify(scrape_status)
+
+@api.route('/api/v1/jobs/<int:job_id>/cancel', methods=['POST'])
+def cancel_job(job_id):
+    job = Job.query.get_or_404(job_id)
+    if not job.is_active:
+        return jsonify({'error': f'Job is already {job.status}'}), 409
+    jobs.request_cancel(job)
+    return jsonify(job.to_dict(include_log=False))
 
 
 # ===========================================================================
 # EXPORT
 # ===========================================================================
 
-@api.route('/api/v1/export/json', methods=['GET'])
-def export_json():
-    questions = Question.query.all()
-    data = [q.to_dict() for q in questions]
-    output = json.dumps(data, indent=2)
+EXPORT_YIELD_PER = 500
+EXPORT_CHUNK_BYTES = 64 * 1024
+
+
+def _export_query(*entities):
+    """Question export query honoring the category/season/studied filters."""
+    query = (db.session.query(*entities)
+             .options(db.lazyload('*'))
+             .order_by(Question.id.asc()))
+    if StudyProgress in entities:
+        query = query.outerjoin(StudyProgress,
+                                StudyProgress.question_id == Question.id)
+
+    category = request.args.get('category')
+    season_min = request.args.get('season_min', type=int)
+    season_max = request.args.get('season_max', type=int)
+    studied_only = request.args.get('studied_only', 'false').lower() == 'true'
+
+    if category:
+        query = query.filter(Question.category == category)
+    if season_min is not None:
+        query = query.filter(Question.season >= season_min)
+    if season_max is not None:
+        query = query.filter(Question.season <= season_max)
+    if studied_only:
+        if StudyProgress not in entities:
+            query = query.join(StudyProgress,
+                               StudyProgress.question_id == Question.id)
+        query = query.filter(StudyProgress.times_seen > 0)
+
+    # Server-side cursor: rows are fetched and converted in small batches
+    return query.yield_per(EXPORT_YIELD_PER)
+
+
+def _chunked(pieces, compress):
+    """Coalesce string pieces into ~64KB byte chunks, optionally gzipped."""
+    gz = zlib.compressobj(6, zlib.DEFLATED, 31) if compress else None
+    buf = []
+    size = 0
+    for piece in pieces:
+        buf.append(piece)
+        size += len(piece)
+        if size >= EXPORT_CHUNK_BYTES:
+            data = ''.join(buf).encode('utf-8')
+            buf, size = [], 0
+            data = gz.compress(data) if gz else data
+            if data:
+                yield data
+    data = ''.join(buf).encode('utf-8')
+    if gz:
+        data = gz.compress(data) + gz.flush()
+    if data:
+        yield data
+
+
+def _export_response(pieces, mimetype, filename):
+    """Stream an export as an attachment; ``gzip=true`` sends a .gz file."""
+    compress = request.args.get('gzip', 'false').lower() == 'true'
+    if compress:
+        mimetype = 'application/gzip'
+        filename += '.gz'
     return Response(
-        output,
-        mimetype='application/json',
+        stream_with_context(_chunked(pieces, compress)),
+        mimetype=mimetype,
         headers={
-            'Content-Disposition': 'attachment; filename=questions_export.json'
+            'Content-Disposition': f'attachment; filename={filename}'
         },
     )
 
 
+@api.route('/api/v1/export/json', methods=['GET'])
+def export_json():
+    """Stream questions as a JSON array, or NDJSON with ``format=ndjson``."""
+    ndjson = request.args.get('format') == 'ndjson'
+    questions = _export_query(Question)
+
+    def generate():
+        if ndjson:
+            for q in questions:
+                yield json.dumps(q.to_dict()) + '\n'
+            return
+        yield '['
+        sep = '\n'
+        for q in questions:
+            yield sep + json.dumps(q.to_dict())
+            sep = ',\n'
+        yield '\n]\n'
+
+    if ndjson:
+        return _export_response(generate(), 'application/x-ndjson',
+                                'questions_export.ndjson')
+    return _export_response(generate(), 'application/json',
+                            'questions_export.json')
+
+
 @api.route('/api/v1/export/csv', methods=['GET'])
 def export_csv():
-    results = (db.session.query(Question, StudyProgress)
-               .outerjoin(StudyProgress)
-               .all())
-
-    output = io.StringIO()
-    writer = csv.writer(output)
-    writer.writerow([
-        'question_id', 'season', 'match_day', 'question_number',
-        'question_text', 'answer', 'category', 'percent_correct',
-        'times_seen', 'times_correct', 'confidence', 'easiness_factor',
-        'interval_days', 'last_studied_at', 'next_review_at',
-    ])
+    results = _export_query(Question, StudyProgress)
 
-    for q, p in results:
+    def generate():
+        output = io.StringIO()
+        writer = csv.writer(output)
         writer.writerow([
-            q.id, q.season, q.match_day, q.question_number,
-            q.question_text, q.answer, q.category, q.percent_correct,
-            p.times_seen if p else 0,
-            p.times_correct if p else 0,
-            p.confidence if p else 0,
-            p.easiness_factor if p else 2.5,
-            p.interval_days if p else 1,
-            p.last_studied_at.isoformat() if p and p.last_studied_at else '',
-            p.next_review_at.isoformat() if p and p.next_review_at else '',
+            'question_id', 'season', 'match_day', 'question_number',
+            'question_text', 'answer', 'category', 'percent_correct',
+            'times_seen', 'times_correct', 'confidence', 'easiness_factor',
+            'interval_days', 'last_studied_at', 'next_review_at',
         ])
 
-    csv_bytes = output.getvalue().encode('utf-8')
-    return Response(
-        csv_bytes,
-        mimetype='text/csv',
-        headers={
-            'Content-Disposition': 'attachment; filename=progress_export.csv'
-        },
-    )
+        for q, p in results:
+            writer.writerow([
+                q.id, q.season, q.match_day, q.question_number,
+                q.question_text, q.answer, q.category, q.percent_correct,
+                p.times_seen if p else 0,
+                p.times_correct if p else 0,
+                p.confidence if p else 0,
+                p.easiness_factor if p else 2.5,
+                p.interval_days if p else 1,
+                p.last_studied_at.isoformat() if p and p.last_studied_at else '',
+                p.next_review_at.isoformat() if p and p.next_review_at else '',
+            ])
+            yield output.getvalue()
+            output.seek(0)
+            output.truncate(0)
+
+        yield output.getvalue()
+
+    return _export_response(generate(), 'text/csv', 'progress_export.csv')
+
+
+@jobs.handler('build_pdf')
+def _build_pdf_job(ctx, params):
+    if SCRIPTS_DIR not in sys.path:
+        sys.path.insert(0, SCRIPTS_DIR)
+    from generate_pdf import build_pdf
+
+    pages = build_pdf(DATABASE_PATH, PDF_EXPORT_PATH, log=ctx.log)
+    return {'filename': os.path.basename(PDF_EXPORT_PATH), 'pages': pages}
+
+
+@api.route('/api/v1/export/pdf', methods=['POST'])
+def start_pdf_export():
+    """Queue a rebuild of the printable question PDF."""
+    job = jobs.active_job('build_pdf') or jobs.enqueue('build_pdf')
+    return jsonify({'job': job.to_dict(include_log=False)}), 202
+
+
+@api.route('/api/v1/export/pdf', methods=['GET'])
+def download_pdf_export():
+    if not os.path.exists(PDF_EXPORT_PATH):
+        return jsonify({'error': 'PDF has not been built yet'}), 404
+    return send_from_directory(os.path.dirname(PDF_EXPORT_PATH),
+                               os.path.basename(PDF_EXPORT_PATH),
+                               as_attachment=True)
 
 
 # ===========================================================================
@@ -952,6 +1756,8 @@ def export_csv():
 # ===========================================================================
 
 @api.route('/api/v1/settings', methods=['GET'])
+@http_cache.versioned()
+@read_cache.cached()
 def get_settings():
     settings = AppSettings.query.all()
     return jsonify({s.key: s.value for s in settings})
@@ -963,6 +1769,14 @@ def update_settings():
     if not data:
         return jsonify({'error': 'Request body required'}), 400
 
+    prefix = sqlite_tuning.SETTINGS_PREFIX
+    try:
+        for key, value in data.items():
+            if key.startswith(prefix):
+                sqlite_tuning.validate(key[len(prefix):], value, runtime=True)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
     for key, value in data.items():
         setting = AppSettings.query.get(key)
         if setting:
@@ -972,22 +1786,38 @@ def update_settings():
             db.session.add(setting)
 
     db.session.commit()
+    # New SQLite pragmas apply from the next pooled connection on
+    sqlite_tuning.apply_settings(db.engine, data)
 
     settings = AppSettings.query.all()
     return jsonify({s.key: s.value for s in settings})
 
 
+@api.route('/api/v1/cache/stats', methods=['GET'])
+def cache_stats():
+    """Hit/miss counters of this worker's read cache."""
+    return jsonify(read_cache.stats())
+
+
 # ===========================================================================
 # DATA MANAGEMENT
 # ===========================================================================
 
 @api.route('/api/v1/data/reset-progress', methods=['POST'])
 def reset_progress():
-    """Delete all study progress, sessions, and daily activity."""
+    """Delete all study progress, sessions, and daily activity.
+
+    Applied batch event ids go too, so a client replaying a batch after
+    the reset has it recorded again rather than skipped as a duplicate.
+    """
+    ProgressEvent.query.delete()
     SessionAnswer.query.delete()
     StudySession.query.delete()
     StudyProgress.query.delete()
     DailyActivity.query.delete()
+    review_queue.reset()
+    rollups.reset_category_progress()
+    rollups.reset_study_summary()
     db.session.commit()
     return jsonify({'status': 'ok', 'message': 'All progress has been reset.'})
 
@@ -1026,6 +1856,8 @@ def add_question():
         percent_correct=data.get('percent_correct'),
     )
     db.session.add(q)
+    rollups.bump_category(q.category, total=1)
+    sampling.assign_ranks()
     db.session.commit()
     return jsonify(q.to_dict()), 201
 
@@ -1034,41 +1866,14 @@ def add_question():
 # APP FACTORY
 # ===========================================================================
 
-def _parse_season(raw):
-    """Parse season value to int, handling 'LL60' string format."""
-    if isinstance(raw, str):
-        return int(raw.replace('LL', ''))
-    return int(raw)
-
-
 def seed_from_file(app):
-    """Background seed: load questions from seed JSON if table is empty."""
+    """Load questions from the seed JSON (used when there is no snapshot)."""
     with app.app_context():
         if not os.path.exists(SEED_FILE):
             return
         try:
-            with open(SEED_FILE, 'r', encoding='utf-8') as f:
-                questions_data = json.load(f)
-
-            batch_size = 1000
-            for i in range(0, len(questions_data), batch_size):
-                batch = questions_data[i:i + batch_size]
-                for q_data in batch:
-                    q = Question(
-                        season=_parse_season(q_data.get('season', 0)),
-                        match_day=q_data.get('match_day', 0),
-                        question_number=q_data.get('question_number', 0),
-                        question_text=q_data.get('question_text', ''),
-                        answer=q_data.get('answer', ''),
-                        category=q_data.get('category', ''),
-                        percent_correct=q_data.get('percent_correct'),
-                    )
-                    db.session.add(q)
-                db.session.commit()
-                print(f'Seeded batch {i // batch_size + 1} '
-                      f'({min(i + batch_size, len(questions_data))}/{len(questions_data)})')
-
-            print(f'Seeded {len(questions_data)} questions from {SEED_FILE}')
+            bulk_load.load_questions(seed_files.iter_seed(SEED_FILE))
+            print(f'Seeded questions from {SEED_FILE}')
         except Exception as e:
             print(f'Seed error: {e}')
             db.session.rollback()
@@ -1082,9 +1887,17 @@ def create_app():
 
     db.init_app(app)
     CORS(app)
+    read_cache.configure(READ_CACHE_SIZE, READ_CACHE_TTL)
+    read_cache.track_writes()
 
     app.register_blueprint(api)
 
+    if JOBS_WORKER_ENABLED:
+        # Started lazily so scripts that only import the app never run jobs
+        @app.before_request
+        def _ensure_job_worker():
+            jobs.start_worker(app)
+
     @app.route('/', defaults={'path': ''})
     @app.route('/<path:path>')
     def serve_react(path):
@@ -1096,11 +1909,32 @@ def create_app():
         return send_from_directory(app.static_folder, 'index.html')
 
     with app.app_context():
-        db.create_all()
+        sqlite_tuning.configure_engine(db.engine, SQLITE_PRAGMAS)
+        db_path = db.engine.url.database
+        # Workers booting together take turns; only the first one finds an
+        # empty database and installs the snapshot (or seeds)
+        with snapshot.startup_lock(db_path):
+            if snapshot.install_snapshot(db_path, SEED_SNAPSHOT_PATH):
+                print(f'Installed seed snapshot {SEED_SNAPSHOT_PATH}')
+
+            db.create_all()
+            search.ensure_search_index(db)
+            read_cache.ensure_generation_row()
+
+            # Check if questions table is empty and seed if needed
+            if Question.query.count() == 0:
+                seed_from_file(app)
+            elif CategoryStats.query.first() is None:
+                # Database predates the rollup table
+                rollups.rebuild_category_stats()
+                db.session.commit()
+
+            rollups.get_study_summary()
 
-        # Check if questions table is empty and seed if needed
-        if Question.query.count() == 0:
-            seed_from_file(app)
+            try:
+                sqlite_tuning.apply_settings(db.engine, _sqlite_settings())
+            except ValueError as e:
+                print(f'Ignoring invalid SQLite setting: {e}')
 
     return app
 
@@ -0,0 +1,149 @@
+"""Bulk loader for question records.
+
+Every path that loads questions in bulk (first-boot seeding, the snapshot
+build, ``scripts/seed_db.py``, archive re-parses and the scrape job's
+per-match-day saves) goes through ``upsert_rows``. It normalises each record
+once (``question_row``) and writes batches with one Core executemany of
+``INSERT ... ON CONFLICT(season, match_day, question_number)``. Conflicts
+either refresh the given columns or are skipped.
+
+``load_questions`` streams records from any iterable (see
+``seed_files.iter_seed``) into one transaction under tuned pragmas, rebuilds
+the category rollup, and reports rows/sec.
+"""
+
+import time
+from contextlib import contextmanager
+
+from sqlalchemy import func, text
+from sqlalchemy.dialects.sqlite import insert
+
+import rollups
+import sampling
+from models import Question, db
+from seed_files import normalize_question
+
+BATCH_SIZE = 1000
+KEY_COLUMNS = ('season', 'match_day', 'question_number')
+
+# Refreshed when a seed/import row already exists: newer percent-correct
+# figures and subcategory assignments
+SEED_UPDATE_COLUMNS = ('percent_correct', 'subcategory', 'subcategory_secondary')
+
+# Pragmas for the duration of a load; restored afterwards
+LOAD_PRAGMAS = {
+    'cache_size': -65536,   # 64 MiB page cache
+    'temp_store': 2,        # MEMORY
+    'synchronous': 1,       # NORMAL
+}
+
+
+def question_row(q):
+    """Column values for one seed/scraped question record."""
+    q = normalize_question(q)
+    return {
+        'season': q['season'],
+        'match_day': q.get('match_day', 0),
+        'question_number': q.get('question_number', 0),
+        'question_text': q.get('question_text', ''),
+        'answer': q.get('answer', ''),
+        'category': q.get('category') or 'UNKNOWN',
+        'subcategory': q.get('subcategory'),
+        'subcategory_secondary': q.get('subcategory_secondary'),
+        'percent_correct': q.get('percent_correct'),
+        'is_ai_generated': False,
+    }
+
+
+def upsert_statement(update_columns=SEED_UPDATE_COLUMNS):
+    """INSERT ... ON CONFLICT for question rows.
+
+    Conflicting rows get ``update_columns`` refreshed, keeping the stored
+    value where the incoming one is NULL; with no ``update_columns`` they
+    are left alone.
+    """
+    stmt = insert(Question.__table__)
+    if not update_columns:
+        return stmt.on_conflict_do_nothing(index_elements=list(KEY_COLUMNS))
+    table = Question.__table__
+    return stmt.on_conflict_do_update(
+        index_elements=list(KEY_COLUMNS),
+        set_={c: func.coalesce(stmt.excluded[c], table.c[c])
+              for c in update_columns},
+    )
+
+
+def upsert_rows(rows, update_columns=SEED_UPDATE_COLUMNS):
+    """Write ``question_row`` dicts in one executemany. Caller commits.
+
+    New rows are given their sampling ranks. Returns the affected row count
+    (inserted + updated).
+    """
+    if not rows:
+        return 0
+    affected = db.session.execute(upsert_statement(update_columns), rows).rowcount
+    sampling.assign_ranks()
+    return affected
+
+
+@contextmanager
+def _tuned_pragmas():
+    conn = db.session.connection()
+    previous = {name: conn.execute(text(f'PRAGMA {name}')).scalar()
+                for name in LOAD_PRAGMAS}
+    for name, value in LOAD_PRAGMAS.items():
+        conn.execute(text(f'PRAGMA {name} = {int(value)}'))
+    try:
+        yield
+    finally:
+        conn = db.session.connection()
+        for name, value in previous.items():
+            conn.execute(text(f'PRAGMA {name} = {int(value)}'))
+
+
+def load_questions(records, update_columns=SEED_UPDATE_COLUMNS,
+                   batch_size=BATCH_SIZE, log=print):
+    """Load question records in one transaction. Commits.
+
+    ``records`` is any iterable of question dicts (seed JSON entries, NDJSON
+    lines, scraped questions); it is consumed in ``batch_size`` chunks, so
+    NDJSON sources are never fully in memory. Returns a dict with rows,
+    inserted, updated, seconds and rows_per_sec.
+    """
+    start = time.time()
+    before = db.session.query(func.count(Question.id)).scalar()
+    rows_seen = 0
+    affected = 0
+
+    with _tuned_pragmas():
+        try:
+            batch = []
+            for record in records:
+                batch.append(question_row(record))
+                if len(batch) >= batch_size:
+                    affected += upsert_rows(batch, update_columns)
+                    rows_seen += len(batch)
+                    batch = []
+            affected += upsert_rows(batch, update_columns)
+            rows_seen += len(batch)
+
+            rollups.rebuild_category_stats()
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+    inserted = db.session.query(func.count(Question.id)).scalar() - before
+    elapsed = time.time() - start
+    stats = {
+        'rows': rows_seen,
+        'inserted': inserted,
+        'updated': affected - inserted,
+        'seconds': round(elapsed, 3),
+        'rows_per_sec': round(rows_seen / elapsed) if elapsed > 0 else rows_seen,
+    }
+    if log:
+        log(f"Loaded {stats['rows']} questions ({stats['inserted']} new, "
+            f"{stats['updated']} updated) in {elapsed:.2f}s "
+            f"({stats['rows_per_sec']} rows/sec)")
+    return stats
@@ -16,3 +16,65 @@ LL_CATEGORIES = [
 ]
 
 SEED_FILE = os.path.join(BASE_DIR, 'data', 'questions_seed.json')
+SCRIPTS_DIR = os.path.join(os.path.dirname(BASE_DIR), 'scripts')
+PDF_EXPORT_PATH = os.path.join(os.path.dirname(BASE_DIR), 'll_trivia_questions.pdf')
+
+# Run background jobs in a thread of each web worker (set to 0 when running
+# scripts/run_jobs.py as a dedicated worker instead)
+JOBS_WORKER_ENABLED = os.environ.get('JOBS_WORKER', '1') != '0'
+
+# Scraper politeness: match days fetched in parallel, and the hard cap on
+# requests/sec shared by all of them
+SCRAPE_CONCURRENCY = int(os.environ.get('SCRAPE_CONCURRENCY', '4'))
+SCRAPE_RATE = float(os.environ.get('SCRAPE_RATE', '2.0'))
+
+# Raw match-day pages fetched by the scraper (gzip, content-addressed);
+# re-parse them offline with scripts/reparse_archive.py
+SCRAPE_ARCHIVE_DIR = os.environ.get('SCRAPE_ARCHIVE_DIR',
+                                    os.path.join(BASE_DIR, 'data', 'archive'))
+
+# Per-season NDJSON shards written by scripts/scrape_seasons.py; merged into
+# SEED_FILE by scripts/merge_shards.py
+SCRAPE_SHARDS_DIR = os.environ.get('SCRAPE_SHARDS_DIR',
+                                   os.path.join(BASE_DIR, 'data', 'shards'))
+
+# Database prebuilt from SEED_FILE by scripts/build_snapshot.py; copied into
+# place on first boot instead of seeding row by row
+SEED_SNAPSHOT_PATH = os.environ.get('SEED_SNAPSHOT_PATH',
+                                    os.path.join(BASE_DIR, 'data', 'seed_snapshot.db'))
+
+# PRAGMAs applied to every SQLite connection (see sqlite_tuning.py). Override
+# one with SQLITE_<NAME>, e.g. SQLITE_BUSY_TIMEOUT=10000, or at runtime with a
+# "sqlite.<name>" app setting (crash-safe values only; journal_mode=off/memory
+# and synchronous=off are env-only)
+SQLITE_PRAGMAS = {
+    name: os.environ.get(f'SQLITE_{name.upper()}', default)
+    for name, default in (
+        ('journal_mode', 'wal'),
+        ('synchronous', 'normal'),
+        ('busy_timeout', '5000'),
+        ('cache_size', '-20000'),        # KiB when negative: ~20 MB
+        ('mmap_size', '268435456'),      # 256 MB
+        ('temp_store', 'memory'),
+    )
+}
+
+# Anthropic API: model, a base URL override (e.g. scripts/ai_standin.py
+# for local testing) and the most generations running at once across all
+# workers
+AI_MODEL = os.environ.get('AI_MODEL', 'claude-sonnet-4-5-20250929')
+ANTHROPIC_BASE_URL = os.environ.get('ANTHROPIC_BASE_URL', '')
+AI_MAX_CONCURRENCY = int(os.environ.get('AI_MAX_CONCURRENCY', '4'))
+
+# Dollars per million input/output tokens, for prewarm cost budgets
+AI_INPUT_COST_PER_MTOK = float(os.environ.get('AI_INPUT_COST_PER_MTOK', '3.0'))
+AI_OUTPUT_COST_PER_MTOK = float(os.environ.get('AI_OUTPUT_COST_PER_MTOK', '15.0'))
+
+# In-process read cache for hot GET endpoints (see read_cache.py): most
+# entries kept per worker, and seconds an entry may be served for
+READ_CACHE_SIZE = int(os.environ.get('READ_CACHE_SIZE', '256'))
+READ_CACHE_TTL = float(os.environ.get('READ_CACHE_TTL', '300'))
+
+# API responses at least this large are gzip/brotli compressed when the
+# client accepts it (see http_cache.py)
+COMPRESS_MIN_BYTES = int(os.environ.get('COMPRESS_MIN_BYTES', '1024'))
@@ -0,0 +1,107 @@
+"""Conditional GETs and response compression for the JSON API.
+
+``finish`` runs after every API request. A buffered JSON response to a GET
+gets a weak ETag (a hash of the body, unless the view already set one)
+and ``Cache-Control: no-cache``, so browsers revalidate with
+``If-None-Match`` and get a bodiless 304 when nothing changed. Bodies of
+at least ``COMPRESS_MIN_BYTES`` are then compressed with brotli or gzip,
+whichever the client prefers (brotli only if the module is installed).
+
+Views that read nothing but app data can be tagged ``@versioned()``:
+their ETag is the data generation (see read_cache.py), checked before the
+view runs, so a poll that matches costs one primary-key read. Views that
+also depend on the clock or the jobs table are left to the body hash.
+Streamed responses (exports, SSE) are never buffered or touched.
+"""
+
+import functools
+import gzip
+from datetime import datetime
+
+from flask import current_app, request
+
+from config import COMPRESS_MIN_BYTES
+import read_cache
+
+try:
+    import brotli
+except ImportError:  # gzip only
+    brotli = None
+
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+
+def _generation_etag(per_day):
+    tag = f'gen-{read_cache.generation()}'
+    if per_day:
+        tag += f'-{datetime.utcnow().date().isoformat()}'
+    return tag
+
+
+def versioned(per_day=False):
+    """ETag a GET view by the data generation; 304 without running it.
+
+    ``per_day`` views depend on today's date as well as the data.
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return view(*args, **kwargs)
+            etag = _generation_etag(per_day)
+            if request.if_none_match.contains_weak(etag):
+                response = current_app.response_class(
+                    status=304, mimetype='application/json')
+            else:
+                response = current_app.make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+            response.set_etag(etag, weak=True)
+            return response
+        return wrapper
+    return decorator
+
+
+def _encoding():
+    """The compression the client accepts that we prefer, or None."""
+    accepted = request.accept_encodings
+    options = []
+    if brotli is not None and accepted['br']:
+        options.append((accepted['br'], 1, 'br'))
+    if accepted['gzip']:
+        options.append((accepted['gzip'], 0, 'gzip'))
+    return max(options)[2] if options else None
+
+
+def _compress(data, encoding):
+    if encoding == 'br':
+        return brotli.compress(data, quality=BROTLI_QUALITY)
+    return gzip.compress(data, compresslevel=GZIP_LEVEL)
+
+
+def finish(response):
+    """ETag, revalidate and compress a buffered JSON response."""
+    if (response.is_streamed or response.mimetype != 'application/json'
+            or 'Content-Encoding' in response.headers):
+        return response
+
+    if request.method in ('GET', 'HEAD') and response.status_code in (200, 304):
+        response.headers['Cache-Control'] = 'no-cache'
+        if response.status_code == 200:
+            if 'ETag' not in response.headers:
+                response.add_etag(weak=True)
+            response.make_conditional(request)
+
+    response.vary.add('Accept-Encoding')
+    if response.status_code != 200:
+        return response
+    data = response.get_data()
+    if len(data) < COMPRESS_MIN_BYTES:
+        return response
+    encoding = _encoding()
+    if encoding is None:
+        return response
+    response.set_data(_compress(data, encoding))
+    response.headers['Content-Encoding'] = encoding
+    return response
@@ -0,0 +1,578 @@
+"""Persistent background jobs.
+
+Jobs live in the ``jobs`` table, so every gunicorn worker reports the same
+status and a restarted worker can pick up where a dead one stopped. Each
+process runs at most one worker thread (``start_worker``). It claims queued
+jobs with a compare-and-swap UPDATE, so only one process ever runs a job.
+A running job whose heartbeat goes stale is claimed again and resumes from
+its last checkpoint.
+
+Handlers are registered per job kind with ``@handler('kind')`` and receive
+a ``JobContext`` for logging, progress, checkpoints and cancellation.
+
+Short interactive jobs (AI generation) belong to a named pool: at most
+``set_pool_limit`` of a pool's jobs run at once across all processes (the
+claim counts running jobs in the same UPDATE), and ``run_soon`` starts one
+on this process's pool executor right away instead of waiting for the
+worker thread. A job is only handed to the executor once it is claimed;
+if the pool is full it waits in this process's queue and is claimed when
+one of this process's pool jobs finishes, or by the worker thread's next
+poll when the slot freed up in another process. Background batches can
+use their own executor (``run_soon(..., executor=name)``, sized with
+``set_executor_size``); jobs waiting on the pool's own executor are
+claimed first. ``enqueue(..., dedupe_key=...)``
+returns the active job with the same key instead of queueing a duplicate.
+
+Credentials (``enqueue(..., secrets=...)``) never touch the table: they
+are held in the memory of the process that queued the job, and only that
+process claims it (``run_soon`` starts it there). If that process dies,
+the job waits (``awaiting_secrets``) until they are given again with
+``provide_secrets`` and then resumes from its checkpoint.
+
+While a handler runs, a heartbeat thread keeps ``heartbeat_at`` fresh, so
+a call that stays quiet for longer than ``STALE_AFTER`` is not mistaken
+for a dead worker and run a second time.
+
+Partial output is relayed with ``ctx.publish``: ``watch`` wakes as soon
+as a handler running in this process publishes, without touching the
+table. For a job running in another process, ``watch`` falls back to
+polling its checkpoint every ``WATCH_INTERVAL``.
+"""
+
+import json
+import logging
+import os
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy.exc import IntegrityError
+
+from models import Job, db
+
+logger = logging.getLogger(__name__)
+
+LOG_CAP = 200
+POLL_INTERVAL = 2.0
+STALE_AFTER = timedelta(minutes=5)
+HEARTBEAT_INTERVAL = STALE_AFTER.total_seconds() / 10
+WATCH_INTERVAL = 1.0
+
+_handlers = {}
+_pools = {}          # kind -> pool name
+_pool_limits = {}    # pool name -> max running jobs
+_pool_executors = {}  # executor name (pool name by default) -> executor
+_executor_sizes = {}
+_executor_pools = {}  # executor name -> pool its jobs count against
+_waiting = {}        # executor name -> job ids run_soon could not claim yet
+_waiting_lock = threading.Lock()
+_secret_kinds = set()
+_secrets = {}        # job id -> credentials, this process only
+_secrets_lock = threading.Lock()
+_worker_lock = threading.Lock()
+_worker_thread = None
+_channels = {}       # job id -> _Channel, while watched or running here
+_channels_lock = threading.Lock()
+
+
+class JobCancelled(Exception):
+    """Raised inside a handler to stop a job that was cancelled."""
+
+
+class _Channel:
+    """What a job running in this process has published, for ``watch``."""
+
+    def __init__(self):
+        self.cond = threading.Condition()
+        self.state = {}
+        self.version = 0
+        self.running = False
+        self.done = False
+        self.watchers = 0
+
+
+def _open_channel(job_id, watcher):
+    with _channels_lock:
+        channel = _channels.get(job_id)
+        if channel is None:
+            channel = _channels[job_id] = _Channel()
+        if watcher:
+            channel.watchers += 1
+        else:
+            channel.running = True
+    return channel
+
+
+def _close_channel(job_id, channel, watcher):
+    with channel.cond:
+        if watcher:
+            channel.watchers -= 1
+        else:
+            channel.running = False
+            channel.done = True
+            channel.cond.notify_all()
+    with _channels_lock:
+        if (_channels.get(job_id) is channel and not channel.running
+                and (channel.done or not channel.watchers)):
+            del _channels[job_id]
+
+
+def handler(kind, pool=None, secrets=False):
+    """Register ``fn(ctx, params)`` as the handler for ``kind`` jobs.
+
+    ``secrets=True`` kinds need credentials (``ctx.secrets``) that only
+    the queueing process holds.
+    """
+    def decorator(fn):
+        _handlers[kind] = fn
+        if pool is not None:
+            _pools[kind] = pool
+        if secrets:
+            _secret_kinds.add(kind)
+        return fn
+    return decorator
+
+
+def set_pool_limit(pool, limit):
+    """Allow at most ``limit`` running jobs of ``pool`` across all workers."""
+    _pool_limits[pool] = max(1, int(limit))
+
+
+def set_executor_size(name, size):
+    """Give ``run_soon(..., executor=name)`` its own ``size`` threads."""
+    _executor_sizes[name] = max(1, int(size))
+
+
+def enqueue(kind, params=None, dedupe_key=None, secrets=None):
+    """Queue a new job and return it. Commits.
+
+    With ``dedupe_key``, an active (queued or running) job with the same
+    key is returned instead; the check is a unique index, so it holds
+    across processes. ``secrets`` are kept in this process's memory, not
+    in ``params_json``; start the job here with ``run_soon``.
+    """
+    if kind not in _handlers:
+        raise ValueError(f'Unknown job kind: {kind}')
+    while True:
+        if dedupe_key is not None:
+            existing = (Job.query
+                        .filter(Job.dedupe_key == dedupe_key,
+                                Job.status.in_(('queued', 'running')))
+                        .first())
+            if existing is not None:
+                return existing
+        job = Job(kind=kind, status='queued',
+                  params_json=json.dumps(params or {}),
+                  dedupe_key=dedupe_key,
+                  progress_done=0, attempts=0, cancel_requested=False)
+        db.session.add(job)
+        try:
+            db.session.commit()
+            if secrets is not None:
+                provide_secrets(job, secrets)
+            return job
+        except IntegrityError:
+            # Another process queued the same key first; return that one
+            db.session.rollback()
+
+
+def active_job(kind, dedupe_key=None):
+    """Return the queued/running job of ``kind`` (with ``dedupe_key``), if any."""
+    query = Job.query.filter(Job.kind == kind,
+                             Job.status.in_(('queued', 'running')))
+    if dedupe_key is not None:
+        query = query.filter(Job.dedupe_key == dedupe_key)
+    return query.order_by(Job.id.desc()).first()
+
+
+def provide_secrets(job, secrets):
+    """Hold ``job``'s credentials in this process so it can run here."""
+    with _secrets_lock:
+        _secrets[job.id] = dict(secrets)
+
+
+def _has_secrets(job_id):
+    with _secrets_lock:
+        return job_id in _secrets
+
+
+def awaiting_secrets(job, now=None):
+    """True if ``job`` is stuck until its credentials are given again.
+
+    That is an active job of a ``secrets`` kind that this process holds
+    no credentials for and whose owner looks gone: running with a stale
+    heartbeat, or still queued ``STALE_AFTER`` after it was created.
+    """
+    if job.kind not in _secret_kinds or not job.is_active or _has_secrets(job.id):
+        return False
+    cutoff = (now or datetime.utcnow()) - STALE_AFTER
+    if job.status == 'running':
+        return job.heartbeat_at < cutoff
+    return job.created_at < cutoff
+
+
+def request_cancel(job):
+    """Ask a job to stop. Queued jobs are cancelled immediately. Commits."""
+    if job.status == 'queued':
+        _finish(job, 'cancelled')
+    elif job.status == 'running':
+        job.cancel_requested = True
+        db.session.commit()
+    return job
+
+
+class JobContext:
+    """Handle passed to job handlers; every call also refreshes the heartbeat."""
+
+    def __init__(self, job):
+        self.job_id = job.id
+        self.params = job.params
+
+    @property
+    def secrets(self):
+        """Credentials given to ``enqueue``/``provide_secrets``, or {}."""
+        with _secrets_lock:
+            return dict(_secrets.get(self.job_id, {}))
+
+    def _job(self):
+        return db.session.get(Job, self.job_id)
+
+    @property
+    def checkpoint_state(self):
+        """Checkpoint saved by a previous (interrupted) run, or {}."""
+        return self._job().checkpoint
+
+    def log(self, message):
+        logger.info('[job %s] %s', self.job_id, message)
+        job = self._job()
+        lines = job.log
+        lines.append(message)
+        job.log_json = json.dumps(lines[-LOG_CAP:])
+        job.heartbeat_at = datetime.utcnow()
+        db.session.commit()
+
+    def progress(self, done, total=None):
+        job = self._job()
+        job.progress_done = done
+        if total is not None:
+            job.progress_total = total
+        job.heartbeat_at = datetime.utcnow()
+        db.session.commit()
+
+    def publish(self, **state):
+        """Merge ``state`` into what ``watch`` relays; not saved."""
+        with _channels_lock:
+            channel = _channels.get(self.job_id)
+        if channel is None:
+            return
+        with channel.cond:
+            channel.state.update(state)
+            channel.version += 1
+            channel.cond.notify_all()
+
+    def checkpoint(self, **state):
+        """Merge ``state`` into the saved checkpoint."""
+        job = self._job()
+        merged = job.checkpoint
+        merged.update(state)
+        job.checkpoint_json = json.dumps(merged)
+        job.heartbeat_at = datetime.utcnow()
+        db.session.commit()
+
+    def cancelled(self):
+        """True once someone has asked this job to stop."""
+        return bool(db.session.query(Job.cancel_requested)
+                    .filter(Job.id == self.job_id).scalar())
+
+    def raise_if_cancelled(self):
+        if self.cancelled():
+            raise JobCancelled()
+
+
+def _finish(job, status, result=None, error=None):
+    with _secrets_lock:
+        _secrets.pop(job.id, None)
+    params = job.params
+    if any(k in params for k in Job.SECRET_PARAMS):
+        # Rows queued before credentials moved out of the table
+        job.params_json = json.dumps(
+            {k: v for k, v in params.items() if k not in Job.SECRET_PARAMS})
+    job.status = status
+    job.result_json = json.dumps(result) if result is not None else None
+    job.error = error
+    job.finished_at = datetime.utcnow()
+    db.session.commit()
+
+
+def _runnable(job, now):
+    return job.status == 'queued' or (
+        job.status == 'running' and job.heartbeat_at < now - STALE_AFTER)
+
+
+def _try_claim(job, worker_id, now):
+    """Compare-and-swap ``job`` to running for ``worker_id``. Commits."""
+    # Compare-and-swap on the state we just read; another process that
+    # claimed the job first will have changed status or heartbeat_at
+    stmt = db.update(Job).where(Job.id == job.id,
+                                Job.status == job.status)
+    if job.status == 'running':
+        stmt = stmt.where(Job.heartbeat_at == job.heartbeat_at)
+    pool = _pools.get(job.kind)
+    if pool in _pool_limits:
+        # Counted in the same statement, so the limit holds across processes
+        other = db.aliased(Job)
+        running = (db.select(db.func.count(other.id))
+                   .where(other.kind.in_([k for k, p in _pools.items() if p == pool]),
+                          other.status == 'running',
+                          other.heartbeat_at >= now - STALE_AFTER)
+                   .scalar_subquery())
+        stmt = stmt.where(running < _pool_limits[pool])
+    claimed = db.session.execute(stmt.values(
+        status='running',
+        worker_id=worker_id,
+        heartbeat_at=now,
+        started_at=db.func.coalesce(Job.started_at, now),
+        attempts=Job.attempts + 1,
+    )).rowcount
+    db.session.commit()
+    return bool(claimed)
+
+
+def claim_next(worker_id):
+    """Atomically claim the oldest runnable job. Returns its id or None."""
+    now = datetime.utcnow()
+    query = Job.query.filter(db.or_(
+        Job.status == 'queued',
+        db.and_(Job.status == 'running',
+                Job.heartbeat_at < now - STALE_AFTER)))
+    if _secret_kinds:
+        # Jobs needing credentials only run where they are held
+        with _secrets_lock:
+            local = list(_secrets)
+        query = query.filter(db.or_(Job.kind.notin_(_secret_kinds),
+                                    Job.id.in_(local)))
+    candidates = (query
+                  .order_by(Job.id.asc())
+                  .limit(5)
+                  .all())
+
+    for job in candidates:
+        if _try_claim(job, worker_id, now):
+            return job.id
+    return None
+
+
+def _heartbeat(app, job_id, worker_id, stop):
+    """Refresh a running job's heartbeat until ``stop`` is set."""
+    while not stop.wait(HEARTBEAT_INTERVAL):
+        with app.app_context():
+            try:
+                db.session.execute(
+                    db.update(Job)
+                    .where(Job.id == job_id, Job.status == 'running',
+                           Job.worker_id == worker_id)
+                    .values(heartbeat_at=datetime.utcnow()))
+                db.session.commit()
+            except Exception:
+                logger.exception('Heartbeat for job %s failed', job_id)
+            finally:
+                db.session.remove()
+
+
+def run_job(job_id):
+    """Run a claimed job to completion, recording its outcome."""
+    job = db.session.get(Job, job_id)
+    fn = _handlers.get(job.kind)
+    if fn is None:
+        _finish(job, 'failed', error=f'No handler for job kind {job.kind!r}')
+        return
+
+    ctx = JobContext(job)
+    if job.attempts > 1:
+        ctx.log(f'Resuming (attempt {job.attempts})')
+    channel = _open_channel(job_id, watcher=False)
+    # Long silent stretches (a slow fetch or AI call) must not look stale
+    stop = threading.Event()
+    threading.Thread(target=_heartbeat,
+                     args=(current_app._get_current_object(), job_id,
+                           job.worker_id, stop),
+                     name=f'job-{job_id}-heartbeat', daemon=True).start()
+    try:
+        ctx.raise_if_cancelled()
+        result = fn(ctx, ctx.params)
+    except JobCancelled:
+        db.session.rollback()
+        job = db.session.get(Job, job_id)
+        ctx.log('Cancelled')
+        _finish(job, 'cancelled')
+    except Exception as e:
+        logger.exception('Job %s (%s) failed', job_id, job.kind)
+        db.session.rollback()
+        job = db.session.get(Job, job_id)
+        ctx.log(f'Error: {e}')
+        _finish(job, 'failed', error=str(e))
+    else:
+        _finish(db.session.get(Job, job_id), 'succeeded', result=result)
+    finally:
+        stop.set()
+        _close_channel(job_id, channel, watcher=False)
+
+
+def watch(job_id, interval=WATCH_INTERVAL):
+    """Yield ``job_id``'s latest published state until the job ends.
+
+    While the job runs in this process each ``ctx.publish`` is yielded as
+    soon as it happens; otherwise (queued, or running in another process)
+    the saved checkpoint is read every ``interval`` seconds. Something is
+    yielded at least every ``interval`` even when nothing changed, so
+    callers can send keepalives. Load the job afterwards for its outcome.
+    """
+    channel = _open_channel(job_id, watcher=True)
+    seen = None
+    try:
+        while True:
+            with channel.cond:
+                if channel.version == seen and not channel.done:
+                    channel.cond.wait(interval)
+                if channel.done:
+                    return
+                running = channel.running
+                seen = channel.version
+                if running:
+                    state = dict(channel.state)
+            if not running:
+                db.session.remove()
+                job = db.session.get(Job, job_id)
+                if job is None or not job.is_active:
+                    return
+                state = job.checkpoint
+            yield state
+    finally:
+        _close_channel(job_id, channel, watcher=True)
+
+
+def run_pending(worker_id):
+    """Claim and run one job. Returns True if a job was run."""
+    job_id = claim_next(worker_id)
+    if job_id is None:
+        return False
+    run_job(job_id)
+    return True
+
+
+def _worker_id(name=None):
+    return f'{socket.gethostname()}:{os.getpid()}:{name or threading.get_ident()}'
+
+
+def _executor(name):
+    with _worker_lock:
+        executor = _pool_executors.get(name)
+        if executor is None:
+            size = _executor_sizes.get(name, _pool_limits.get(name, 1))
+            executor = _pool_executors[name] = ThreadPoolExecutor(
+                max_workers=size, thread_name_prefix=f'jobs-{name}')
+    return executor
+
+
+def _run_claimed(app, job_id, pool):
+    """Run a job claimed for ``pool``, then claim the next waiting one."""
+    with app.app_context():
+        try:
+            run_job(job_id)
+        except Exception:
+            logger.exception('Running job %s failed', job_id)
+        finally:
+            db.session.remove()
+        try:
+            _claim_waiting(app, pool)
+        except Exception:
+            logger.exception('Claiming waiting %s jobs failed', pool)
+        finally:
+            db.session.remove()
+
+
+def _claim_waiting(app, pool):
+    """Claim this process's waiting ``pool`` jobs while there is room.
+
+    Jobs started on the pool's own executor go first, then those started
+    on other executors; each oldest first.
+    """
+    with _waiting_lock:
+        names = sorted((name for name, p in _executor_pools.items() if p == pool),
+                       key=lambda name: name != pool)
+    for name in names:
+        while True:
+            with _waiting_lock:
+                if not _waiting.get(name):
+                    break
+                job_id = _waiting[name][0]
+            job = db.session.get(Job, job_id, populate_existing=True)
+            now = datetime.utcnow()
+            if job is not None and _runnable(job, now):
+                if not _try_claim(job, _worker_id(pool), now):
+                    # Pool full (or another worker won the job); the next
+                    # finishing job retries
+                    return
+                _executor(name).submit(_run_claimed, app, job_id, pool)
+            with _waiting_lock:
+                if job_id in _waiting.get(name, ()):
+                    _waiting[name].remove(job_id)
+
+
+def run_soon(app, job, executor=None):
+    """Start a pool job, or one whose secrets this process holds, here.
+
+    Claims the job (behind this process's earlier waiting jobs of the same
+    pool) and runs it on the pool's executor, or on ``executor`` if given;
+    if the pool is full it is claimed when a slot frees up. The job worker
+    thread would also pick it up; this just avoids waiting behind whatever
+    it is running, and works when the worker is disabled.
+    """
+    pool = _pools.get(job.kind)
+    if pool is None and _has_secrets(job.id):
+        pool = job.kind
+    if pool is None or not job.is_active:
+        return
+    name = executor or pool
+    with _waiting_lock:
+        _executor_pools[name] = pool
+        waiting = _waiting.setdefault(name, [])
+        if job.id not in waiting:
+            waiting.append(job.id)
+    _claim_waiting(app, pool)
+
+
+def worker_loop(app, poll_interval=POLL_INTERVAL, stop_event=None):
+    """Run jobs forever (or until ``stop_event`` is set)."""
+    worker_id = _worker_id()
+    logger.info('Job worker %s started', worker_id)
+    while stop_event is None or not stop_event.is_set():
+        try:
+            with app.app_context():
+                with _waiting_lock:
+                    pools = {_executor_pools[name]
+                             for name, ids in _waiting.items() if ids}
+                for pool in pools:
+                    # A slot freed in another process wakes no one here
+                    _claim_waiting(app, pool)
+                ran = run_pending(worker_id)
+                db.session.remove()
+        except Exception:
+            logger.exception('Job worker iteration failed')
+            ran = False
+        if not ran:
+            time.sleep(poll_interval)
+
+
+def start_worker(app):
+    """Start this process's worker thread once; safe to call repeatedly."""
+    global _worker_thread
+    with _worker_lock:
+        if _worker_thread is not None and _worker_thread.is_alive():
+            return
+        _worker_thread = threading.Thread(target=worker_loop, args=(app,),
+                                          name='job-worker', daemon=True)
+        _worker_thread.start()
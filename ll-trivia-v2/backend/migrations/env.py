@@ -10,6 +10,7 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from models import db
 from config import SQLALCHEMY_DATABASE_URI
+from search import SEARCH_TABLE
 
 config = context.config
 
@@ -23,12 +24,21 @@ if config.config_file_name is not None:
 target_metadata = db.metadata
 
 
+def include_object(object, name, type_, reflected, compare_to):
+    """Keep autogenerate away from the FTS5 search index and its shadow tables,
+    which are managed by search.ensure_search_index rather than the models."""
+    if type_ == 'table' and name.startswith(SEARCH_TABLE):
+        return False
+    return True
+
+
 def run_migrations_offline() -> None:
     url = config.get_main_option("sqlalchemy.url")
     context.configure(
         url=url,
         target_metadata=target_metadata,
         literal_binds=True,
+        include_object=include_object,
         dialect_opts={"paramstyle": "named"},
     )
 
@@ -45,7 +55,8 @@ def run_migrations_online() -> None:
 
     with connectable.connect() as connection:
         context.configure(
-            connection=connection, target_metadata=target_metadata
+            connection=connection, target_metadata=target_metadata,
+            include_object=include_object,
         )
 
         with context.begin_transaction():
@@ -1,15 +1,32 @@
+import json
 from datetime import datetime, timedelta
 
 from flask_sqlalchemy import SQLAlchemy
 
 db = SQLAlchemy()
 
+# Question.due_at for questions never studied: sorts after every real due
+# date, so unseen cards form one contiguous tail of the review index
+UNSEEN_DUE_AT = datetime(9999, 12, 31)
+
 
 class Question(db.Model):
     __tablename__ = 'questions'
     __table_args__ = (
         db.UniqueConstraint('season', 'match_day', 'question_number',
                             name='uq_season_matchday_qnum'),
+        # Category filter, alone or with a difficulty range
+        db.Index('ix_questions_category_percent_correct',
+                 'category', 'percent_correct'),
+        db.Index('ix_questions_category_subcategory', 'category', 'subcategory'),
+        db.Index('ix_questions_category_ai', 'category', 'is_ai_generated'),
+        # Review queue (see review_queue.py)
+        db.Index('ix_questions_category_due_at', 'category', 'due_at'),
+        db.Index('ix_questions_due_at', 'due_at'),
+        # Per-category shuffled ordering (see sampling.py)
+        db.Index('ix_questions_category_shuffle_rank', 'category', 'shuffle_rank'),
+        db.Index('ix_questions_unranked', 'category',
+                 sqlite_where=db.text('shuffle_rank IS NULL')),
     )
 
     id = db.Column(db.Integer, primary_key=True)
@@ -24,6 +41,12 @@ class Question(db.Model):
     percent_correct = db.Column(db.Float, nullable=True)
     is_ai_generated = db.Column(db.Boolean, default=False, nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    # Copy of StudyProgress.next_review_at, or UNSEEN_DUE_AT
+    due_at = db.Column(db.DateTime, nullable=False, default=UNSEEN_DUE_AT,
+                       server_default='9999-12-31 00:00:00.000000')
+    # Position in a random permutation of the category, 0..n-1; assigned by
+    # sampling.assign_ranks right after insert
+    shuffle_rank = db.Column(db.Integer, nullable=True)
 
     # Relationships
     progress = db.relationship('StudyProgress', backref='question',
@@ -55,12 +78,19 @@ class Question(db.Model):
 
 class StudyProgress(db.Model):
     __tablename__ = 'study_progress'
+    __table_args__ = (
+        db.Index('ix_study_progress_accuracy', 'accuracy'),
+        db.Index('ix_study_progress_next_review_at', 'next_review_at'),
+        db.Index('ix_study_progress_times_seen', 'times_seen'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     question_id = db.Column(db.Integer, db.ForeignKey('questions.id'),
                             unique=True, nullable=False)
     times_seen = db.Column(db.Integer, default=0)
     times_correct = db.Column(db.Integer, default=0)
+    # times_correct / times_seen, stored so weakest-first ranking is indexed
+    accuracy = db.Column(db.Float, nullable=True)
     confidence = db.Column(db.Integer, default=0)
     easiness_factor = db.Column(db.Float, default=2.5)
     interval_days = db.Column(db.Integer, default=1)
@@ -68,11 +98,33 @@ class StudyProgress(db.Model):
     last_studied_at = db.Column(db.DateTime, nullable=True)
     next_review_at = db.Column(db.DateTime, nullable=True)
 
-    def record_attempt(self, confidence_rating):
-        """Implement the SM-2 spaced repetition algorithm."""
+    def __init__(self, **kwargs):
+        # Column defaults only apply on flush; record_attempt needs them now
+        kwargs.setdefault('times_seen', 0)
+        kwargs.setdefault('times_correct', 0)
+        kwargs.setdefault('confidence', 0)
+        kwargs.setdefault('easiness_factor', 2.5)
+        kwargs.setdefault('interval_days', 1)
+        kwargs.setdefault('repetition_count', 0)
+        super().__init__(**kwargs)
+
+    @property
+    def is_mastered(self):
+        """Mastery: confidence >= 3 AND interval_days >= 7."""
+        return (self.confidence or 0) >= 3 and (self.interval_days or 0) >= 7
+
+    def record_attempt(self, confidence_rating, studied_at=None):
+        """Implement the SM-2 spaced repetition algorithm.
+
+        ``studied_at`` defaults to now; batch clients pass the time the
+        card was actually answered.
+        """
+        if studied_at is None:
+            studied_at = datetime.utcnow()
         self.times_seen += 1
         if confidence_rating >= 3:
             self.times_correct += 1
+        self.accuracy = self.times_correct / self.times_seen
 
         if confidence_rating == 1:
             # Again: reset
@@ -110,8 +162,8 @@ class StudyProgress(db.Model):
             self.easiness_factor = min(3.0, self.easiness_factor + 0.15)
 
         self.confidence = confidence_rating
-        self.last_studied_at = datetime.utcnow()
-        self.next_review_at = datetime.utcnow() + timedelta(days=self.interval_days)
+        self.last_studied_at = studied_at
+        self.next_review_at = studied_at + timedelta(days=self.interval_days)
 
     def to_dict(self):
         return {
@@ -119,6 +171,7 @@ class StudyProgress(db.Model):
             'question_id': self.question_id,
             'times_seen': self.times_seen,
             'times_correct': self.times_correct,
+            'accuracy': self.accuracy,
             'confidence': self.confidence,
             'easiness_factor': self.easiness_factor,
             'interval_days': self.interval_days,
@@ -130,8 +183,26 @@ class StudyProgress(db.Model):
         }
 
 
+class ProgressEvent(db.Model):
+    """A client-generated progress event already applied by the batch API.
+
+    Lets clients retry or flush offline queues without double-counting.
+    """
+    __tablename__ = 'progress_events'
+
+    client_event_id = db.Column(db.String(64), primary_key=True)
+    question_id = db.Column(db.Integer, db.ForeignKey('questions.id'),
+                            nullable=False)
+    confidence = db.Column(db.Integer, nullable=False)
+    answered_at = db.Column(db.DateTime, nullable=False)
+    received_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+
 class StudySession(db.Model):
     __tablename__ = 'study_sessions'
+    __table_args__ = (
+        db.Index('ix_study_sessions_started_at', 'started_at'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     started_at = db.Column(db.DateTime, default=datetime.utcnow)
@@ -159,6 +230,10 @@ class StudySession(db.Model):
 
 class SessionAnswer(db.Model):
     __tablename__ = 'session_answers'
+    __table_args__ = (
+        db.Index('ix_session_answers_session_answered',
+                 'session_id', 'answered_at'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     session_id = db.Column(db.Integer, db.ForeignKey('study_sessions.id'),
@@ -242,6 +317,80 @@ class DailyActivity(db.Model):
     questions_studied = db.Column(db.Integer, default=0)
     questions_correct = db.Column(db.Integer, default=0)
 
+    def __init__(self, **kwargs):
+        kwargs.setdefault('questions_studied', 0)
+        kwargs.setdefault('questions_correct', 0)
+        super().__init__(**kwargs)
+
+
+class CategoryStats(db.Model):
+    """Per-category rollup of question and progress counters.
+
+    Maintained incrementally by the progress and import paths (see
+    rollups.py) so the Stats page never has to aggregate study_progress.
+    """
+    __tablename__ = 'category_stats'
+
+    category = db.Column(db.String(50), primary_key=True)
+    total = db.Column(db.Integer, default=0, nullable=False)
+    studied = db.Column(db.Integer, default=0, nullable=False)
+    times_seen = db.Column(db.Integer, default=0, nullable=False)
+    times_correct = db.Column(db.Integer, default=0, nullable=False)
+    mastery_count = db.Column(db.Integer, default=0, nullable=False)
+
+    def to_dict(self):
+        return {
+            'category': self.category,
+            'total': self.total,
+            'studied': self.studied,
+            'times_seen': self.times_seen,
+            'times_correct': self.times_correct,
+            'mastery_count': self.mastery_count,
+        }
+
+
+class DataGeneration(db.Model):
+    """Single-row counter bumped by every commit that changes app data.
+
+    Read caches (read_cache.py) tag entries with the generation they were
+    built at, so a write in any worker process invalidates them all.
+    ``id`` is always 1.
+    """
+    __tablename__ = 'data_generation'
+
+    id = db.Column(db.Integer, primary_key=True)
+    generation = db.Column(db.Integer, default=0, nullable=False)
+
+
+class StudySummary(db.Model):
+    """Single-row running totals and streaks for the dashboard.
+
+    Updated alongside each progress write (see rollups.py); ``id`` is
+    always 1. ``current_streak`` is the run of consecutive study days
+    ending on ``last_active_date``.
+    """
+    __tablename__ = 'study_summary'
+
+    id = db.Column(db.Integer, primary_key=True)
+    current_streak = db.Column(db.Integer, default=0, nullable=False)
+    longest_streak = db.Column(db.Integer, default=0, nullable=False)
+    last_active_date = db.Column(db.String(10), nullable=True)  # 'YYYY-MM-DD'
+    total_seen = db.Column(db.Integer, default=0, nullable=False)
+    total_correct = db.Column(db.Integer, default=0, nullable=False)
+    total_studied = db.Column(db.Integer, default=0, nullable=False)
+    total_tracked = db.Column(db.Integer, default=0, nullable=False)
+
+    def to_dict(self):
+        return {
+            'current_streak': self.current_streak,
+            'longest_streak': self.longest_streak,
+            'last_active_date': self.last_active_date,
+            'total_seen': self.total_seen,
+            'total_correct': self.total_correct,
+            'total_studied': self.total_studied,
+            'total_tracked': self.total_tracked,
+        }
+
 
 class AIResponse(db.Model):
     __tablename__ = 'ai_responses'
@@ -267,6 +416,87 @@ class AIResponse(db.Model):
         }
 
 
+class Job(db.Model):
+    """A persistent background job (scrape, AI generation, PDF build).
+
+    Managed by jobs.py; any process can read its status, and a job whose
+    worker died is resumed from ``checkpoint_json``.
+    """
+    __tablename__ = 'jobs'
+    __table_args__ = (
+        db.Index('ix_jobs_status_id', 'status', 'id'),
+        # At most one active job per dedupe key (see jobs.enqueue)
+        db.Index('uq_jobs_active_dedupe_key', 'dedupe_key', unique=True,
+                 sqlite_where=db.text("status IN ('queued', 'running')")),
+    )
+
+    SECRET_PARAMS = ('password',)
+
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(50), nullable=False)
+    status = db.Column(db.String(20), nullable=False, default='queued')
+    params_json = db.Column(db.Text, nullable=True)
+    checkpoint_json = db.Column(db.Text, nullable=True)
+    result_json = db.Column(db.Text, nullable=True)
+    error = db.Column(db.Text, nullable=True)
+    log_json = db.Column(db.Text, nullable=True)
+    progress_done = db.Column(db.Integer, default=0)
+    progress_total = db.Column(db.Integer, nullable=True)
+    cancel_requested = db.Column(db.Boolean, default=False, nullable=False)
+    attempts = db.Column(db.Integer, default=0)
+    worker_id = db.Column(db.String(100), nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime, nullable=True)
+    finished_at = db.Column(db.DateTime, nullable=True)
+    heartbeat_at = db.Column(db.DateTime, nullable=True)
+    dedupe_key = db.Column(db.String(100), nullable=True)
+
+    @property
+    def params(self):
+        return json.loads(self.params_json) if self.params_json else {}
+
+    @property
+    def checkpoint(self):
+        return json.loads(self.checkpoint_json) if self.checkpoint_json else {}
+
+    @property
+    def result(self):
+        return json.loads(self.result_json) if self.result_json else None
+
+    @property
+    def log(self):
+        return json.loads(self.log_json) if self.log_json else []
+
+    @property
+    def is_active(self):
+        return self.status in ('queued', 'running')
+
+    def to_dict(self, include_log=True):
+        params = {k: ('***' if k in self.SECRET_PARAMS else v)
+                  for k, v in self.params.items()}
+        d = {
+            'id': self.id,
+            'kind': self.kind,
+            'status': self.status,
+            'params': params,
+            'progress_done': self.progress_done,
+            'progress_total': self.progress_total,
+            'result': self.result,
+            'error': self.error,
+            'cancel_requested': self.cancel_requested,
+            'attempts': self.attempts,
+            'created_at': (self.created_at.isoformat()
+                           if self.created_at else None),
+            'started_at': (self.started_at.isoformat()
+                           if self.started_at else None),
+            'finished_at': (self.finished_at.isoformat()
+                            if self.finished_at else None),
+        }
+        if include_log:
+            d['log'] = self.log
+        return d
+
+
 class AppSettings(db.Model):
     __tablename__ = 'app_settings'
 
@@ -0,0 +1,137 @@
+"""Compressed on-disk archive of fetched match-day pages.
+
+Page bodies are stored gzip-compressed under their SHA-256
+(``blobs/ab/abcd....html.gz``), so an unchanged page fetched again costs no
+extra space. ``index.ndjson`` is an append-only log with one line per fetch
+(season, match day, URL, fetch time, ETag, Last-Modified, blob hash); the
+latest line for a match day wins. The scraper uses the stored validators
+for conditional GETs, and ``scripts/reparse_archive.py`` re-parses archived
+pages without touching the network.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime
+
+INDEX_FILE = 'index.ndjson'
+
+
+class PageArchive:
+    """Archive rooted at ``root``; safe to share between scraping threads."""
+
+    def __init__(self, root):
+        self.root = root
+        self._lock = threading.Lock()
+        self._index = None
+
+    def _index_path(self):
+        return os.path.join(self.root, INDEX_FILE)
+
+    def _blob_path(self, sha256):
+        return os.path.join(self.root, 'blobs', sha256[:2], f'{sha256}.html.gz')
+
+    def _load(self):
+        # Caller holds the lock
+        if self._index is not None:
+            return self._index
+        index = {}
+        if os.path.exists(self._index_path()):
+            with open(self._index_path(), encoding='utf-8') as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        # Torn final line from an interrupted write
+                        continue
+                    index[(entry['season'], entry['match_day'])] = entry
+        self._index = index
+        return index
+
+    def _ensure_root(self):
+        ignore_path = os.path.join(self.root, '.gitignore')
+        if not os.path.exists(ignore_path):
+            os.makedirs(self.root, exist_ok=True)
+            # Keep archived pages out of version control
+            with open(ignore_path, 'w') as f:
+                f.write('*\n')
+
+    def get(self, season, match_day):
+        """Latest index entry for a match day, or None."""
+        with self._lock:
+            return self._load().get((season, match_day))
+
+    def entries(self, start_season=None, end_season=None):
+        """Index entries in (season, match_day) order, optionally filtered."""
+        with self._lock:
+            entries = list(self._load().values())
+        return sorted(
+            (e for e in entries
+             if (start_season is None or e['season'] >= start_season)
+             and (end_season is None or e['season'] <= end_season)),
+            key=lambda e: (e['season'], e['match_day']))
+
+    def read(self, season, match_day):
+        """Archived page body (bytes) for a match day, or None."""
+        entry = self.get(season, match_day)
+        if entry is None:
+            return None
+        return self.read_blob(entry['sha256'])
+
+    def read_blob(self, sha256):
+        try:
+            with gzip.open(self._blob_path(sha256), 'rb') as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def conditional_headers(self, season, match_day):
+        """If-None-Match / If-Modified-Since headers for a re-fetch.
+
+        Empty when the page has not been archived (or its blob is missing),
+        so a 304 can always be answered from the archive.
+        """
+        entry = self.get(season, match_day)
+        if entry is None or not os.path.exists(self._blob_path(entry['sha256'])):
+            return {}
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def put(self, season, match_day, body, url=None, etag=None,
+            last_modified=None):
+        """Store a fetched page body (bytes) and record it in the index."""
+        self._ensure_root()
+        sha256 = hashlib.sha256(body).hexdigest()
+        blob_path = self._blob_path(sha256)
+        if not os.path.exists(blob_path):
+            os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+            tmp_path = f'{blob_path}.{threading.get_ident()}.tmp'
+            with gzip.open(tmp_path, 'wb', compresslevel=6) as f:
+                f.write(body)
+            os.replace(tmp_path, blob_path)
+
+        entry = {
+            'season': season,
+            'match_day': match_day,
+            'url': url,
+            'fetched_at': datetime.utcnow().isoformat(timespec='seconds'),
+            'etag': etag,
+            'last_modified': last_modified,
+            'sha256': sha256,
+            'size': len(body),
+        }
+        with self._lock:
+            index = self._load()
+            with open(self._index_path(), 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry) + '\n')
+            index[(season, match_day)] = entry
+        return entry
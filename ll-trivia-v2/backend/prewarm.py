@@ -0,0 +1,215 @@
+"""Bulk generation of Learn More explanations ahead of a study block.
+
+``run`` takes the question ids picked by the caller's filter and the modes
+to cover, skips ``(question_id, mode)`` pairs already in ``ai_responses``
+and generates the rest as ordinary ``learn_more`` jobs, at most
+``concurrency`` at a time. Going through the job table means a pair that
+is already being generated for someone is joined rather than paid for
+twice, and prewarm calls count against the ``ai`` pool limit in every
+worker. ``MAX_CONCURRENCY`` keeps at least one pool slot free for
+interactive Learn More. The calls run on their own ``prewarm`` executor,
+and interactive jobs waiting for the pool are claimed before them.
+
+Spending is capped by an optional token and/or dollar budget. A call is
+only started if the budget still covers it at its worst case (estimated
+prompt tokens plus the full ``max_tokens`` reply), so the cap holds with
+calls in flight; when they finish their reservation is replaced by what
+they actually used, or kept in full if the call failed (it may still
+have been billed). Explanations someone else stored in the meantime are
+counted as ``cached`` and cost nothing. Totals are checkpointed after
+every call, so a resumed job skips what is already cached and keeps
+counting against the same budget.
+"""
+
+import json
+import time
+
+from config import (AI_INPUT_COST_PER_MTOK, AI_MAX_CONCURRENCY,
+                    AI_OUTPUT_COST_PER_MTOK)
+from models import AIResponse, Job, Question, db
+import ai
+import jobs
+
+MAX_QUESTIONS = 2000
+# Leave a slot of the ai pool for interactive requests
+MAX_CONCURRENCY = max(1, AI_MAX_CONCURRENCY - 1)
+POLL_INTERVAL = 0.1
+EXECUTOR = 'prewarm'
+# Conservative prompt size estimate for budget reservations
+CHARS_PER_TOKEN = 3
+
+
+jobs.set_executor_size(EXECUTOR, MAX_CONCURRENCY)
+
+
+def cost(input_tokens, output_tokens):
+    """Dollar cost of a number of tokens."""
+    return (input_tokens * AI_INPUT_COST_PER_MTOK
+            + output_tokens * AI_OUTPUT_COST_PER_MTOK) / 1_000_000
+
+
+class Budget:
+    """Tokens spent and reserved for in-flight calls, against optional caps."""
+
+    def __init__(self, max_tokens=None, max_cost=None,
+                 input_tokens=0, output_tokens=0):
+        self.max_tokens = max_tokens
+        self.max_cost = max_cost
+        self.input_tokens = input_tokens
+        self.output_tokens = output_tokens
+        self._reserved_in = 0
+        self._reserved_out = 0
+
+    @property
+    def spent_cost(self):
+        return cost(self.input_tokens, self.output_tokens)
+
+    def reserve(self, input_tokens, output_tokens):
+        """Set aside a call's worst case; False if that would break a cap."""
+        total_in = self.input_tokens + self._reserved_in + input_tokens
+        total_out = self.output_tokens + self._reserved_out + output_tokens
+        if self.max_tokens is not None and total_in + total_out > self.max_tokens:
+            return False
+        if self.max_cost is not None and cost(total_in, total_out) > self.max_cost:
+            return False
+        self._reserved_in += input_tokens
+        self._reserved_out += output_tokens
+        return True
+
+    def settle(self, reserved, used):
+        """Replace a finished call's reservation with what it used."""
+        self._reserved_in -= reserved[0]
+        self._reserved_out -= reserved[1]
+        self.input_tokens += used[0]
+        self.output_tokens += used[1]
+
+
+def missing_pairs(question_ids, modes):
+    """(question_id, mode) pairs with no cached explanation, in id order."""
+    cached = set()
+    for i in range(0, len(question_ids), 500):
+        chunk = question_ids[i:i + 500]
+        cached.update(db.session.query(AIResponse.question_id, AIResponse.mode)
+                      .filter(AIResponse.question_id.in_(chunk),
+                              AIResponse.mode.in_(modes)))
+    return [(qid, mode) for qid in sorted(question_ids) for mode in modes
+            if (qid, mode) not in cached]
+
+
+def _reservation(question_id, mode):
+    """Worst-case (input, output) tokens for one explanation."""
+    question = db.session.get(Question, question_id)
+    prompt = ai.explanation_prompt(question, mode)
+    return len(prompt) // CHARS_PER_TOKEN + 1, ai.EXPLANATION_MAX_TOKENS
+
+
+def _start(app, question_id, mode):
+    """Queue (or join) the learn_more job for one explanation; its id."""
+    job = jobs.enqueue('learn_more', {'question_id': question_id, 'mode': mode},
+                       dedupe_key=ai.explanation_key(question_id, mode))
+    jobs.run_soon(app, job, executor=EXECUTOR)
+    return job.id
+
+
+def _finished(job_ids):
+    """{job id: (status, result, error)} for the jobs that have ended."""
+    rows = (db.session.query(Job.id, Job.status, Job.result_json, Job.error)
+            .filter(Job.id.in_(job_ids),
+                    Job.status.notin_(('queued', 'running'))))
+    return {job_id: (status, json.loads(result) if result else None, error)
+            for job_id, status, result, error in rows}
+
+
+def run(ctx, app, question_ids, modes, concurrency,
+        max_tokens=None, max_cost=None):
+    """Generate missing explanations for ``question_ids`` x ``modes``.
+
+    Returns the totals and throughput. Raises ``jobs.JobCancelled`` (after
+    the calls in flight finish and are checkpointed) if the job is
+    cancelled.
+    """
+    concurrency = min(max(concurrency, 1), MAX_CONCURRENCY)
+    state = ctx.checkpoint_state
+    budget = Budget(max_tokens, max_cost,
+                    state.get('input_tokens', 0), state.get('output_tokens', 0))
+    totals = {'generated': state.get('generated', 0),
+              'cached': state.get('cached', 0),
+              'failed': state.get('failed', 0)}
+    elapsed_before = state.get('elapsed', 0.0)
+
+    pending = missing_pairs(question_ids, modes)
+    skipped = len(question_ids) * len(modes) - len(pending)
+    done_before = sum(totals.values())
+    ctx.log(f'{len(pending)} explanations to generate, {skipped} already cached')
+    ctx.progress(done_before, done_before + len(pending))
+
+    start = time.time()
+    stopped = None
+    todo = iter(pending)
+    item = next(todo, None)
+    running = {}     # learn_more job id -> (item, reserved)
+    while True:
+        while stopped is None and item is not None and len(running) < concurrency:
+            if ctx.cancelled():
+                stopped = 'cancelled'
+                break
+            reserved = _reservation(*item)
+            if not budget.reserve(*reserved):
+                # Calls in flight usually use far less than they
+                # reserved; only give up once none are left to settle
+                if not running:
+                    stopped = 'budget'
+                    ctx.log('Budget reached; not starting more explanations')
+                break
+            running[_start(app, *item)] = (item, reserved)
+            item = next(todo, None)
+        if not running:
+            break
+
+        finished = _finished(list(running))
+        if not finished:
+            time.sleep(POLL_INTERVAL)
+            continue
+        for job_id, (status, result, error) in finished.items():
+            (question_id, mode), reserved = running.pop(job_id)
+            if status == 'succeeded' and result.get('cached'):
+                used = (0, 0)
+                totals['cached'] += 1
+            elif status == 'succeeded':
+                usage = result.get('usage') or {}
+                used = (usage.get('input_tokens', 0), usage.get('output_tokens', 0))
+                totals['generated'] += 1
+            else:
+                # A failed call may still have been billed; charge its estimate
+                ctx.log(f'Question {question_id} ({mode}) failed: {error or status}')
+                used = reserved
+                totals['failed'] += 1
+            budget.settle(reserved, used)
+        ctx.checkpoint(input_tokens=budget.input_tokens,
+                       output_tokens=budget.output_tokens,
+                       elapsed=elapsed_before + time.time() - start,
+                       **totals)
+        ctx.progress(sum(totals.values()))
+
+    if stopped == 'cancelled':
+        raise jobs.JobCancelled()
+
+    elapsed = elapsed_before + time.time() - start
+    per_second = totals['generated'] / elapsed if elapsed else 0.0
+    ctx.log(f"Generated {totals['generated']} explanations in {elapsed:.1f}s "
+            f"({per_second:.2f}/s), {totals['cached']} cached meanwhile, "
+            f"{budget.input_tokens + budget.output_tokens} tokens, "
+            f"${budget.spent_cost:.4f}")
+    return {
+        'generated': totals['generated'],
+        'cached': totals['cached'],
+        'failed': totals['failed'],
+        'skipped': skipped,
+        'remaining': len(pending) - (sum(totals.values()) - done_before),
+        'stopped': stopped,
+        'input_tokens': budget.input_tokens,
+        'output_tokens': budget.output_tokens,
+        'cost_usd': round(budget.spent_cost, 6),
+        'elapsed': round(elapsed, 3),
+        'per_second': round(per_second, 3),
+    }
@@ -0,0 +1,218 @@
+"""In-process read-through cache for hot GET endpoints.
+
+Views decorated with ``@cached()`` keep their JSON responses in a per-process
+LRU keyed by endpoint and normalized query arguments, each entry tagged
+with the data generation it was built at. ``DataGeneration`` is a single
+row bumped in the same transaction as every commit that changes app data
+(``track_writes`` hooks the session; job bookkeeping does not count), so
+one primary-key read per request tells every gunicorn worker whether its
+entries are still current. The TTL bounds how long an entry lives anyway,
+and ``per_day`` views also key on today's date.
+
+Hit/miss counters are reported by ``stats`` (``/api/v1/cache/stats``) and
+every cached response carries ``X-Cache: HIT`` or ``MISS``.
+"""
+
+import functools
+import itertools
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+
+from flask import current_app, g, request
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from models import DataGeneration, db
+
+GENERATION_ID = 1
+# Writes to these tables do not change anything a cached view returns
+UNTRACKED_TABLES = frozenset({'jobs', 'data_generation'})
+
+
+class LRUCache:
+    """Thread-safe LRU of ``key -> value`` entries with a TTL and generation."""
+
+    def __init__(self, max_size, ttl):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.stale = self.expired = self.evictions = 0
+        self.by_endpoint = {}
+
+    def _count(self, endpoint, outcome):
+        counts = self.by_endpoint.setdefault(endpoint, {'hits': 0, 'misses': 0})
+        counts[outcome] += 1
+
+    def get(self, key, generation):
+        """The value for ``key`` if it was stored at ``generation`` and is
+        within its TTL, else None."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry_generation, expires_at, value = entry
+                if entry_generation != generation:
+                    self.stale += 1
+                    del self._entries[key]
+                elif expires_at <= now:
+                    self.expired += 1
+                    del self._entries[key]
+                else:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    self._count(key[0], 'hits')
+                    return value
+            self.misses += 1
+            self._count(key[0], 'misses')
+            return None
+
+    def put(self, key, generation, value):
+        with self._lock:
+            self._entries[key] = (generation, time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+_cache = None
+
+
+def configure(max_size, ttl):
+    """Create this process's cache; called once from create_app."""
+    global _cache
+    _cache = LRUCache(max_size, ttl)
+
+
+# ---------------------------------------------------------------------------
+# Data generation
+# ---------------------------------------------------------------------------
+
+def ensure_generation_row():
+    """Create the counter row if missing. Commits."""
+    if db.session.get(DataGeneration, GENERATION_ID) is None:
+        db.session.add(DataGeneration(id=GENERATION_ID, generation=0))
+        db.session.commit()
+
+
+def generation():
+    """The current data generation, read once per request."""
+    if 'data_generation' not in g:
+        g.data_generation = (db.session.query(DataGeneration.generation)
+                             .filter(DataGeneration.id == GENERATION_ID)
+                             .scalar()) or 0
+    return g.data_generation
+
+
+def _tracked(table_name):
+    return table_name not in UNTRACKED_TABLES
+
+
+def _has_tracked_changes(session):
+    return any(_tracked(obj.__table__.name) for obj in
+               itertools.chain(session.new, session.dirty, session.deleted))
+
+
+def _after_flush(session, flush_context):
+    if _has_tracked_changes(session):
+        session.info['data_changed'] = True
+
+
+def _do_orm_execute(state):
+    if state.is_insert or state.is_update or state.is_delete:
+        if _tracked(state.statement.table.name):
+            state.session.info['data_changed'] = True
+
+
+def _before_commit(session):
+    # Runs before commit's own flush, so also look at what it will write
+    changed = session.info.pop('data_changed', False)
+    if changed or _has_tracked_changes(session):
+        session.execute(db.update(DataGeneration)
+                        .where(DataGeneration.id == GENERATION_ID)
+                        .values(generation=DataGeneration.generation + 1))
+
+
+def _after_rollback(session):
+    session.info.pop('data_changed', None)
+
+
+def track_writes():
+    """Bump the data generation in every commit that wrote app data."""
+    if event.contains(Session, 'before_commit', _before_commit):
+        return
+    event.listen(Session, 'after_flush', _after_flush)
+    event.listen(Session, 'do_orm_execute', _do_orm_execute)
+    event.listen(Session, 'before_commit', _before_commit)
+    event.listen(Session, 'after_rollback', _after_rollback)
+
+
+# ---------------------------------------------------------------------------
+# View decorator
+# ---------------------------------------------------------------------------
+
+def _normalized_args():
+    """Query arguments as a sorted tuple, ignoring empty values."""
+    return tuple(sorted((k, v) for k, v in request.args.items(multi=True) if v != ''))
+
+
+def cached(per_day=False):
+    """Serve a GET view's successful JSON responses from the read cache.
+
+    ``per_day`` views depend on today's date as well as the data.
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            if _cache is None or request.method != 'GET':
+                return view(*args, **kwargs)
+            key = (request.endpoint, tuple(sorted(kwargs.items())), _normalized_args())
+            if per_day:
+                key += (datetime.utcnow().date().isoformat(),)
+            current = generation()
+            entry = _cache.get(key, current)
+            if entry is not None:
+                body, mimetype = entry
+                response = current_app.response_class(body, mimetype=mimetype)
+                response.headers['X-Cache'] = 'HIT'
+                return response
+            response = current_app.make_response(view(*args, **kwargs))
+            if response.status_code == 200 and not response.is_streamed:
+                _cache.put(key, current, (response.get_data(), response.mimetype))
+            response.headers['X-Cache'] = 'MISS'
+            return response
+        return wrapper
+    return decorator
+
+
+def stats():
+    """Counters and size of this process's cache."""
+    cache = _cache
+    if cache is None:
+        return {'enabled': False}
+    looked_up = cache.hits + cache.misses
+    return {
+        'enabled': True,
+        'generation': generation(),
+        'size': len(cache),
+        'max_size': cache.max_size,
+        'ttl': cache.ttl,
+        'hits': cache.hits,
+        'misses': cache.misses,
+        'hit_rate': round(cache.hits / looked_up, 3) if looked_up else 0.0,
+        'stale': cache.stale,
+        'expired': cache.expired,
+        'evictions': cache.evictions,
+        'endpoints': {name: dict(counts)
+                      for name, counts in sorted(cache.by_endpoint.items())},
+    }
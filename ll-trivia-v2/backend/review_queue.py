@@ -0,0 +1,55 @@
+"""Review queue: the order in which flashcards come due.
+
+``Question.due_at`` mirrors ``StudyProgress.next_review_at`` and holds
+``UNSEEN_DUE_AT`` for questions never studied. Indexed as
+``(category, due_at)`` and ``(due_at)``, the next due cards are a range
+read off the index instead of a sort over the whole question bank.
+``sync`` is called alongside every ``StudyProgress.record_attempt``;
+``reset`` when progress is wiped.
+"""
+
+from datetime import datetime
+
+from models import UNSEEN_DUE_AT, Question, db
+
+MAX_BATCH = 100
+
+
+def sync(progress_rows):
+    """Copy next_review_at of the given StudyProgress rows to their
+    questions in one executemany. Caller commits."""
+    params = [{'qid': p.question_id,
+               'next_due': p.next_review_at or UNSEEN_DUE_AT}
+              for p in progress_rows]
+    if not params:
+        return
+    stmt = (db.update(Question.__table__)
+            .where(Question.__table__.c.id == db.bindparam('qid'))
+            .values(due_at=db.bindparam('next_due')))
+    db.session.execute(stmt, params)
+
+
+def reset():
+    """Mark every question unseen. Caller commits."""
+    db.session.execute(db.update(Question.__table__)
+                       .where(Question.__table__.c.due_at != UNSEEN_DUE_AT)
+                       .values(due_at=UNSEEN_DUE_AT))
+
+
+def next_due(query, n, now=None):
+    """The next ``n`` questions of ``query`` to review.
+
+    Cards already due come first, oldest due date first, then unseen cards
+    in id order. Each part is one index range scan; cards scheduled for
+    later are never visited.
+    """
+    if now is None:
+        now = datetime.utcnow()
+    due = (query.filter(Question.due_at <= now)
+           .order_by(Question.due_at.asc(), Question.id.asc())
+           .limit(n).all())
+    if len(due) < n:
+        due += (query.filter(Question.due_at == UNSEEN_DUE_AT)
+                .order_by(Question.due_at.asc(), Question.id.asc())
+                .limit(n - len(due)).all())
+    return due
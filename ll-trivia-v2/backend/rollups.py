@@ -0,0 +1,229 @@
+"""Incrementally maintained stats rollups.
+
+``category_stats`` holds one row per category with question/progress
+counters. Write paths add deltas with an atomic upsert so concurrent
+workers never lose updates; ``rebuild_category_stats`` recomputes the whole
+table with a single GROUP BY when it is missing or suspected stale.
+
+``study_summary`` is a single row of streaks and running totals updated
+in the same transaction as each progress write. ``check_*`` functions
+compare the stored rollups against a fresh recomputation.
+"""
+
+from datetime import date, timedelta
+
+from sqlalchemy.dialects.sqlite import insert
+
+from models import (CategoryStats, DailyActivity, Question, StudyProgress,
+                    StudySummary, db)
+
+SUMMARY_ID = 1
+
+_COUNTERS = ('total', 'studied', 'times_seen', 'times_correct',
+             'mastery_count')
+
+
+def bump_category(category, **deltas):
+    """Add counter deltas (e.g. ``total=1``) to one category's rollup row."""
+    deltas = {k: v for k, v in deltas.items() if v}
+    if not deltas:
+        return
+    unknown = set(deltas) - set(_COUNTERS)
+    if unknown:
+        raise ValueError(f'Unknown rollup counters: {sorted(unknown)}')
+
+    values = {c: deltas.get(c, 0) for c in _COUNTERS}
+    stmt = insert(CategoryStats).values(category=category, **values)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[CategoryStats.category],
+        set_={c: getattr(CategoryStats, c) + getattr(stmt.excluded, c)
+              for c in deltas},
+    )
+    db.session.execute(stmt)
+
+
+def record_attempt_rollup(category, progress, was_seen, was_mastered, correct):
+    """Apply one StudyProgress.record_attempt to the category rollup.
+
+    ``was_seen``/``was_mastered`` describe the progress row before the
+    attempt; ``progress`` is the row after it.
+    """
+    bump_category(
+        category,
+        studied=0 if was_seen else 1,
+        times_seen=1,
+        times_correct=1 if correct else 0,
+        mastery_count=int(progress.is_mastered) - int(was_mastered),
+    )
+
+
+def category_rollup_select():
+    """One-pass GROUP BY producing the category_stats columns."""
+    seen = db.case((StudyProgress.times_seen > 0, 1), else_=0)
+    mastered = db.case(
+        (db.and_(StudyProgress.confidence >= 3,
+                 StudyProgress.interval_days >= 7), 1),
+        else_=0,
+    )
+    return (db.select(
+        Question.category,
+        db.func.count(Question.id),
+        db.func.coalesce(db.func.sum(seen), 0),
+        db.func.coalesce(db.func.sum(StudyProgress.times_seen), 0),
+        db.func.coalesce(db.func.sum(StudyProgress.times_correct), 0),
+        db.func.coalesce(db.func.sum(mastered), 0),
+    )
+        .select_from(Question)
+        .outerjoin(StudyProgress, StudyProgress.question_id == Question.id)
+        .group_by(Question.category))
+
+
+def rebuild_category_stats():
+    """Recompute category_stats from scratch. Caller commits."""
+    db.session.execute(db.delete(CategoryStats))
+    db.session.execute(
+        db.insert(CategoryStats).from_select(
+            ['category', *_COUNTERS], category_rollup_select()))
+
+
+def reset_category_progress():
+    """Zero the progress counters, keeping question totals. Caller commits."""
+    db.session.execute(db.update(CategoryStats).values(
+        studied=0, times_seen=0, times_correct=0, mastery_count=0))
+
+
+def check_category_stats():
+    """Return {category: (stored, expected)} for every drifted rollup row."""
+    expected = {row[0]: dict(zip(_COUNTERS, row[1:]))
+                for row in db.session.execute(category_rollup_select())}
+    stored = {row.category: {c: getattr(row, c) for c in _COUNTERS}
+              for row in CategoryStats.query.all()}
+    return {cat: (stored.get(cat), expected.get(cat))
+            for cat in set(expected) | set(stored)
+            if stored.get(cat) != expected.get(cat)}
+
+
+# ---------------------------------------------------------------------------
+# Study summary (streaks + running totals)
+# ---------------------------------------------------------------------------
+
+def _empty_summary_values():
+    return {
+        'current_streak': 0, 'longest_streak': 0, 'last_active_date': None,
+        'total_seen': 0, 'total_correct': 0, 'total_studied': 0,
+        'total_tracked': 0,
+    }
+
+
+def get_study_summary():
+    """Return the summary row, rebuilding it if it does not exist yet."""
+    summary = db.session.get(StudySummary, SUMMARY_ID)
+    if summary is None:
+        summary = rebuild_study_summary()
+        db.session.commit()
+    return summary
+
+
+def record_attempt_summary(day, was_tracked, was_seen, correct):
+    """Apply one progress write on ``day`` (a date) to the summary row.
+
+    ``was_tracked``/``was_seen`` describe the question's progress row before
+    the attempt (existed / had times_seen > 0). Caller commits.
+    """
+    summary = db.session.get(StudySummary, SUMMARY_ID)
+    if summary is None:
+        summary = rebuild_study_summary()
+        # The rebuild already counts this attempt if it has been flushed
+        db.session.flush()
+        return summary
+
+    summary.total_seen += 1
+    if correct:
+        summary.total_correct += 1
+    if not was_seen:
+        summary.total_studied += 1
+    if not was_tracked:
+        summary.total_tracked += 1
+
+    day_str = day.isoformat()
+    last = summary.last_active_date
+    if last != day_str:
+        if last and date.fromisoformat(last) == day - timedelta(days=1):
+            summary.current_streak += 1
+        else:
+            summary.current_streak = 1
+        summary.last_active_date = day_str
+        summary.longest_streak = max(summary.longest_streak,
+                                     summary.current_streak)
+    return summary
+
+
+def current_streak(summary, today):
+    """Streak as of ``today``; a streak survives until a full day is missed."""
+    if not summary.last_active_date:
+        return 0
+    last = date.fromisoformat(summary.last_active_date)
+    if last >= today - timedelta(days=1):
+        return summary.current_streak
+    return 0
+
+
+def compute_study_summary():
+    """Recompute the summary values from daily_activity and study_progress."""
+    values = _empty_summary_values()
+
+    days = (db.session.query(DailyActivity.date)
+            .filter(DailyActivity.questions_studied > 0)
+            .order_by(DailyActivity.date.asc()))
+    run = 0
+    prev = None
+    for (day_str,) in days:
+        day = date.fromisoformat(day_str)
+        run = run + 1 if prev and (day - prev).days == 1 else 1
+        values['longest_streak'] = max(values['longest_streak'], run)
+        prev = day
+    if prev:
+        values['current_streak'] = run
+        values['last_active_date'] = prev.isoformat()
+
+    seen = db.case((StudyProgress.times_seen > 0, 1), else_=0)
+    totals = db.session.query(
+        db.func.coalesce(db.func.sum(StudyProgress.times_seen), 0),
+        db.func.coalesce(db.func.sum(StudyProgress.times_correct), 0),
+        db.func.coalesce(db.func.sum(seen), 0),
+        db.func.count(StudyProgress.id),
+    ).one()
+    (values['total_seen'], values['total_correct'],
+     values['total_studied'], values['total_tracked']) = totals
+    return values
+
+
+def rebuild_study_summary():
+    """Recompute and store the summary row. Caller commits."""
+    values = compute_study_summary()
+    summary = db.session.get(StudySummary, SUMMARY_ID)
+    if summary is None:
+        summary = StudySummary(id=SUMMARY_ID)
+        db.session.add(summary)
+    for key, value in values.items():
+        setattr(summary, key, value)
+    return summary
+
+
+def check_study_summary():
+    """Return {field: (stored, expected)} for every drifted summary field."""
+    expected = compute_study_summary()
+    summary = db.session.get(StudySummary, SUMMARY_ID)
+    stored = summary.to_dict() if summary else {}
+    return {k: (stored.get(k), v) for k, v in expected.items()
+            if stored.get(k) != v}
+
+
+def reset_study_summary():
+    """Zero the summary after a progress reset. Caller commits."""
+    summary = db.session.get(StudySummary, SUMMARY_ID)
+    if summary is None:
+        summary = StudySummary(id=SUMMARY_ID)
+        db.session.add(summary)
+    for key, value in _empty_summary_values().items():
+        setattr(summary, key, value)
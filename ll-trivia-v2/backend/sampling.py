@@ -0,0 +1,130 @@
+"""Random question sampling without ``ORDER BY random()``.
+
+Each question's ``shuffle_rank`` is its position in a random permutation of
+its category (0..n-1, assigned by ``assign_ranks`` as questions are
+inserted), indexed as ``(category, shuffle_rank)``. That makes every
+question addressable by a uniformly drawn (category, rank) slot.
+
+``sample`` draws slots and looks each one up with the caller's filters
+applied (one index seek); a slot that misses the filters, was already
+picked, or is a hole left by a deleted question is rejected and redrawn.
+Rejection keeps the sample exactly uniform over the matching questions,
+and for any filter that matches a reasonable share of the bank the cost
+depends on k, not on the bank size. When the probe budget runs out (very
+selective filters, or fewer than k matches) the remainder is drawn by
+reservoir sampling over the matching ids, which is cheap precisely because
+there are few of them.
+
+Draws come from ``random.Random(seed)``: the same seed over the same data
+yields the same questions in the same order, so quizzes are reproducible.
+"""
+
+import bisect
+import random
+
+from models import CategoryStats, Question, db
+
+MAX_SAMPLE = 100
+SEED_RANGE = 2 ** 31
+# Rejected probes tolerated per requested question before falling back to
+# reservoir sampling
+PROBES_PER_PICK = 10
+
+
+def new_seed():
+    """A fresh seed for callers that did not supply one."""
+    return random.SystemRandom().randrange(SEED_RANGE)
+
+
+def assign_ranks():
+    """Rank questions inserted since the last call. Caller commits.
+
+    New questions take the next free ranks of their category in random
+    order, so each category stays a random permutation.
+    """
+    table = Question.__table__
+    ranked = table.alias('ranked')
+    next_rank = db.func.coalesce(
+        db.select(db.func.max(ranked.c.shuffle_rank))
+        .where(ranked.c.category == table.c.category)
+        .scalar_subquery(), -1)
+    new = (db.select(
+        table.c.id,
+        (next_rank + db.func.row_number().over(
+            partition_by=table.c.category, order_by=db.func.random())
+         ).label('rank'))
+        .where(table.c.shuffle_rank.is_(None))
+        .subquery())
+    db.session.execute(db.update(table)
+                       .where(table.c.id == new.c.id)
+                       .values(shuffle_rank=new.c.rank))
+
+
+def _rank_bounds(category=None):
+    """[(category, max rank + 1)] for one or every category."""
+    if category is not None:
+        categories = [category]
+    else:
+        categories = [c for (c,) in db.session.query(CategoryStats.category)
+                      .order_by(CategoryStats.category)]
+    bounds = []
+    for cat in categories:
+        top = (db.session.query(db.func.max(Question.shuffle_rank))
+               .filter(Question.category == cat).scalar())
+        if top is not None:
+            bounds.append((cat, top + 1))
+    return bounds
+
+
+def _reservoir(query, k, exclude, rng):
+    """Uniform sample of ``k`` ids from ``query`` not in ``exclude``."""
+    reservoir = []
+    seen = 0
+    for (qid,) in query.with_entities(Question.id).order_by(Question.id):
+        if qid in exclude:
+            continue
+        seen += 1
+        if len(reservoir) < k:
+            reservoir.append(qid)
+        else:
+            j = rng.randrange(seen)
+            if j < k:
+                reservoir[j] = qid
+    rng.shuffle(reservoir)
+    return reservoir
+
+
+def sample(query, k, seed=None, category=None):
+    """Up to ``k`` distinct questions drawn uniformly from ``query``.
+
+    ``query`` is a filtered Question query; pass ``category`` when it
+    filters on one so probes stay inside that category. Fewer than ``k``
+    are returned only if fewer match.
+    """
+    rng = random.Random(seed)
+    bounds = _rank_bounds(category)
+    cumulative = []
+    total = 0
+    for _, size in bounds:
+        total += size
+        cumulative.append(total)
+
+    picked = {}
+    probes = 0
+    while total and len(picked) < k and probes < k * PROBES_PER_PICK:
+        probes += 1
+        slot = rng.randrange(total)
+        i = bisect.bisect_right(cumulative, slot)
+        rank = slot - (cumulative[i - 1] if i else 0)
+        question = (query.filter(Question.category == bounds[i][0],
+                                 Question.shuffle_rank == rank)
+                    .first())
+        if question is not None and question.id not in picked:
+            picked[question.id] = question
+
+    questions = list(picked.values())
+    if len(questions) < k:
+        ids = _reservoir(query, k - len(questions), picked, rng)
+        by_id = {q.id: q for q in query.filter(Question.id.in_(ids))}
+        questions += [by_id[qid] for qid in ids]
+    return questions
@@ -7,19 +7,41 @@ Can be used as a library (imported by app.py for background scrapes)
 or via the standalone script in scripts/scrape_seasons.py.
 """
 
+import os
 import re
 import time
 import logging
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime
 
+import lxml.html
 import requests
 from bs4 import BeautifulSoup
+from lxml import etree
+from requests.adapters import HTTPAdapter
 
 logger = logging.getLogger(__name__)
 
 LOGIN_URL = "https://learnedleague.com/ucp.php"
 MATCH_URL = "https://learnedleague.com/match.php"
 
+# Politeness budget: never more than DEFAULT_RATE requests/sec in total,
+# however many match days are in flight at once
+DEFAULT_CONCURRENCY = 4
+DEFAULT_RATE = 2.0
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# Lean parser lookups, compiled once
+_HAS_CLASS = "contains(concat(' ', normalize-space(@class), ' '), ' {} ')"
+_MATCHDAY_H1 = etree.XPath("//h1[" + _HAS_CLASS.format("matchday") + "]")
+_QUESTION_DIVS = etree.XPath("//div[" + _HAS_CLASS.format("ind-Q20") + "]")
+_ANSWER_DIVS = etree.XPath("//div[contains(@id, 'ANS')]")
+_STD_TABLE = etree.XPath("(//table[" + _HAS_CLASS.format("std") + "])[1]")
+_TEXT = etree.XPath(".//text()[not(ancestor::script or ancestor::style)]")
+_META_CHARSET = re.compile(rb"<meta[^>]+charset=[\"']?([\w-]+)", re.IGNORECASE)
+
 LL_CATEGORIES = [
     'AMER HIST', 'WORLD HIST', 'SCIENCE', 'LITERATURE', 'ART',
     'GEOGRAPHY', 'ENTERTAINMENT', 'POP MUSIC', 'CLASS MUSIC',
@@ -28,12 +50,82 @@ LL_CATEGORIES = [
 ]
 
 
-def create_session(username, password):
-    """Create an authenticated requests session for LearnedLeague."""
+class RateLimiter:
+    """Thread-safe token bucket shared by every request of a scrape.
+
+    ``acquire`` blocks until a token is available. ``penalize`` (after a 429
+    or 5xx) halves the rate and pauses everyone; ``reward`` (after a success)
+    creeps the rate back up, never above the configured maximum.
+    """
+
+    def __init__(self, rate=DEFAULT_RATE, burst=1, min_rate=None):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.max_rate = rate
+        self.rate = rate
+        self.min_rate = min_rate or rate / 8
+        self.capacity = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                if now < self.paused_until:
+                    wait = self.paused_until - now
+                else:
+                    elapsed = max(0.0, now - self.updated)
+                    self.tokens = min(self.capacity,
+                                      self.tokens + elapsed * self.rate)
+                    self.updated = now
+                    if self.tokens >= 1:
+                        self.tokens -= 1
+                        return
+                    wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+    def penalize(self, pause=None):
+        """Slow down after a throttled/failed request."""
+        with self._lock:
+            self.rate = max(self.min_rate, self.rate / 2)
+            pause = pause if pause is not None else 1 / self.rate
+            self.paused_until = max(self.paused_until, time.monotonic() + pause)
+            # No tokens accrue while paused
+            self.tokens = 0
+            self.updated = self.paused_until
+
+    def reward(self):
+        """Recover towards the configured rate after a success."""
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.max_rate / 10)
+
+
+def _mount_pool(session, pool_size):
+    """Size the session's connection pool for ``pool_size`` threads."""
+    adapter = HTTPAdapter(pool_connections=2, pool_maxsize=max(pool_size, 1))
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+
+
+def _retry_after(resp):
+    """Seconds from a Retry-After header, or None."""
+    value = resp.headers.get("Retry-After", "")
+    return float(value) if value.strip().isdigit() else None
+
+
+def create_session(username, password, pool_size=DEFAULT_CONCURRENCY):
+    """Create an authenticated requests session for LearnedLeague.
+
+    The session is safe to share between ``pool_size`` scraping threads.
+    """
     if not username or not password:
         raise ValueError("LL_USERNAME and LL_PASSWORD are required")
 
     session = requests.Session()
+    _mount_pool(session, pool_size)
     session.headers.update({
         "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
     })
@@ -87,34 +179,222 @@ def _find_field_name(soup, candidates):
     return candidates[0]
 
 
-def scrape_match_day(session, season_num, match_day, max_retries=3):
-    """Scrape all 6 questions from a match day results page.
+def fetch_match_day(session, season_num, match_day, max_retries=3,
+                    limiter=None, archive=None):
+    """Download a match day results page and return its body as bytes.
 
-    Returns a list of question dicts, or empty list on failure.
-    Retries with exponential backoff on transient errors.
+    Returns None on failure. Retries with exponential backoff on connection
+    errors, 429 and 5xx (honouring Retry-After). With a shared ``limiter``
+    every attempt takes a token and a throttled response slows down the
+    whole scrape. With an ``archive`` (a PageArchive) the page is fetched
+    conditionally, answered from the archive on 304 and archived otherwise.
     """
     url = f"{MATCH_URL}?{season_num}&{match_day}"
+    headers = archive.conditional_headers(season_num, match_day) if archive else {}
 
     for attempt in range(max_retries):
+        if limiter:
+            limiter.acquire()
+        retry_after = None
         try:
             logger.info(f"Scraping {url} (attempt {attempt + 1})")
-            resp = session.get(url, timeout=30)
+            resp = session.get(url, timeout=30, headers=headers)
+            if resp.status_code in RETRY_STATUSES:
+                retry_after = _retry_after(resp)
             resp.raise_for_status()
+            if limiter:
+                limiter.reward()
             break
-        except (requests.RequestException, requests.Timeout) as e:
+        except requests.RequestException as e:
+            status = getattr(e.response, "status_code", None)
+            if status is not None and status not in RETRY_STATUSES:
+                logger.error(f"HTTP {status} for {url}, giving up")
+                return None
             if attempt < max_retries - 1:
-                wait = 3 * (2 ** attempt)
+                wait = retry_after if retry_after is not None else 3 * (2 ** attempt)
                 logger.warning(f"Retry {attempt + 1} for {url}: {e}, waiting {wait}s")
-                time.sleep(wait)
+                if limiter:
+                    limiter.penalize(wait)
+                else:
+                    time.sleep(wait)
             else:
+                if limiter:
+                    limiter.penalize()
                 logger.error(f"Failed after {max_retries} attempts: {url}")
-                return []
+                return None
+
+    if resp.status_code == 304 and headers:
+        logger.info(f"LL{season_num} MD{match_day} unchanged, using archived copy")
+        return archive.read(season_num, match_day)
+
+    if archive:
+        archive.put(season_num, match_day, resp.content, url=url,
+                    etag=resp.headers.get("ETag"),
+                    last_modified=resp.headers.get("Last-Modified"))
+    return resp.content
+
+
+def scrape_match_day(session, season_num, match_day, max_retries=3,
+                     limiter=None, archive=None):
+    """Scrape all 6 questions from a match day results page.
+
+    Returns a list of question dicts, or empty list on failure.
+    See ``fetch_match_day`` for retries, rate limiting and archiving.
+    """
+    html = fetch_match_day(session, season_num, match_day,
+                           max_retries=max_retries, limiter=limiter,
+                           archive=archive)
+    if html is None:
+        return []
+    return parse_match_day(html, season_num, match_day)
+
+
+def parse_match_day(html, season_num, match_day):
+    """Extract the question dicts from a match day page.
 
-    if "not a valid" in resp.text.lower():
+    A pure function of the page (bytes, or str): one lxml parse plus
+    precompiled XPath lookups, returning the same records as
+    ``parse_match_day_soup``. lxml releases the GIL while parsing, and the
+    function pickles cleanly for ``parse_pages``' process pool.
+    """
+    if isinstance(html, str):
+        html = html.encode("utf-8")
+        encoding = "utf-8"
+    else:
+        m = _META_CHARSET.search(html[:4096])
+        encoding = m.group(1).decode("ascii").lower() if m else "utf-8"
+
+    if b"not a valid" in html.lower():
         logger.warning(f"No data for season {season_num} MD {match_day}")
         return []
 
-    soup = BeautifulSoup(resp.text, "lxml")
+    try:
+        parser = lxml.html.HTMLParser(encoding=encoding)
+    except LookupError:
+        parser = lxml.html.HTMLParser(encoding="utf-8")
+    try:
+        doc = lxml.html.document_fromstring(html, parser=parser)
+    except (etree.ParserError, ValueError):
+        logger.warning(f"Unparseable page for LL{season_num} MD{match_day}")
+        return []
+
+    if not _MATCHDAY_H1(doc):
+        logger.warning(f"No matchday heading for LL{season_num} MD{match_day}")
+        return []
+
+    question_divs = _QUESTION_DIVS(doc)
+    if not question_divs:
+        logger.warning(f"No question divs found for LL{season_num} MD{match_day}")
+        return []
+
+    # One pass over the answer divs instead of two lookups per question
+    answer_divs = [(div.get("id"), div) for div in _ANSWER_DIVS(doc)]
+    by_id = {}
+    for div_id, div in answer_divs:
+        by_id.setdefault(div_id, div)
+    answers = {}
+    for qnum in range(1, 7):
+        ans_div = by_id.get(f"Q{qnum}{match_day}ANS")
+        if ans_div is None:
+            pattern = re.compile(rf"Q{qnum}\d*ANS")
+            ans_div = next((div for div_id, div in answer_divs
+                            if pattern.search(div_id)), None)
+        if ans_div is not None:
+            answers[qnum] = _text(ans_div)
+
+    tables = _STD_TABLE(doc)
+    percentages = _metrics_percentages(tables[0]) if tables else {}
+
+    questions = []
+    for i, div in enumerate(question_divs):
+        qnum = i + 1
+        full_text = _text(div, " ")
+        full_text = re.sub(r"^Q\d+\s*\.\s*", "", full_text)
+        category, question_text = _split_category_question(full_text)
+
+        questions.append({
+            "season": f"LL{season_num}",
+            "match_day": match_day,
+            "question_number": qnum,
+            "category": category or "UNKNOWN",
+            "question_text": question_text,
+            "answer": answers.get(qnum, "Unknown"),
+            "percent_correct": percentages.get(qnum),
+        })
+
+    return questions
+
+
+def _text(el, separator=""):
+    """Element text like BeautifulSoup's ``get_text(separator, strip=True)``."""
+    return separator.join(s.strip() for s in _TEXT(el) if s.strip())
+
+
+def _metrics_percentages(table):
+    """``_parse_metrics_table`` for the lean parser's lxml table element."""
+    percentages = {}
+    target_row = None
+
+    tfoot = table.find(".//tfoot")
+    if tfoot is not None:
+        rows = tfoot.findall(".//tr")
+        for row in rows:
+            text = _text(row).lower()
+            if "leaguewide" in text or "league" in text:
+                target_row = row
+                break
+        if target_row is None and rows:
+            target_row = rows[0]
+
+    if target_row is None:
+        for row in reversed(table.findall(".//tr")):
+            text = _text(row).lower()
+            if "leaguewide" in text or "league" in text:
+                target_row = row
+                break
+
+    if target_row is None:
+        return percentages
+
+    cells = target_row.findall(".//td")
+    for i in range(1, 7):
+        col_index = i + 1
+        if col_index < len(cells):
+            m = re.search(r"(\d{1,3})%?", _text(cells[col_index]))
+            if m:
+                percentages[i] = float(m.group(1))
+
+    return percentages
+
+
+def parse_pages(pages, processes=None):
+    """Parse ``(html, season, match_day)`` tuples across a process pool.
+
+    Returns one question list per page, in input order. ``processes=1``
+    (or a single page) parses in this process.
+    """
+    pages = list(pages)
+    processes = processes or os.cpu_count() or 1
+    if processes == 1 or len(pages) < 2:
+        return [parse_match_day(*page) for page in pages]
+    chunksize = max(1, len(pages) // (processes * 4))
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        return list(pool.map(parse_match_day, *zip(*pages), chunksize=chunksize))
+
+
+def parse_match_day_soup(html, season_num, match_day):
+    """Reference BeautifulSoup parser for a match day page (bytes or str).
+
+    Slower than ``parse_match_day`` but walks the page the way the scraper
+    originally did; kept to cross-check the lean parser
+    (``scripts/bench_parse.py``).
+    """
+    marker = b"not a valid" if isinstance(html, bytes) else "not a valid"
+    if marker in html.lower():
+        logger.warning(f"No data for season {season_num} MD {match_day}")
+        return []
+
+    soup = BeautifulSoup(html, "lxml")
 
     h1 = soup.find("h1", class_="matchday")
     if not h1:
@@ -216,9 +496,18 @@ def _parse_metrics_table(soup):
 
 
 def scrape_season_range(start_season, end_season, username, password,
-                        progress_callback=None, save_callback=None):
+                        progress_callback=None, save_callback=None,
+                        resume_after=None, match_day_callback=None,
+                        should_cancel=None, concurrency=DEFAULT_CONCURRENCY,
+                        rate=DEFAULT_RATE, session=None, archive=None,
+                        skip=None):
     """Scrape questions for a range of seasons.
 
+    Up to ``concurrency`` match days are fetched at once through one pooled
+    session, with all requests sharing a ``rate`` requests/sec token bucket.
+    Results are still handled strictly in (season, match_day) order, so
+    callbacks and checkpoints behave as in a sequential scrape.
+
     Args:
         start_season: Starting season number (e.g. 60)
         end_season: Ending season number (e.g. 102)
@@ -227,32 +516,92 @@ def scrape_season_range(start_season, end_season, username, password,
         progress_callback: Optional callable(message) for status updates
         save_callback: Optional callable(questions_list) to persist questions.
                        If None, returns all questions in the result dict.
+        resume_after: Optional (season, match_day); that match day and all
+                      earlier ones are skipped
+        match_day_callback: Optional callable(season, match_day, completed,
+                            total) invoked after each match day is handled
+        should_cancel: Optional callable() -> bool checked before each
+                       match day; a True result stops the scrape
+        concurrency: Number of match days fetched in parallel
+        rate: Maximum requests per second across all fetches
+        session: Optional already-authenticated session (skips login)
+        archive: Optional PageArchive; fetched pages are archived and
+                 re-fetched conditionally
+        skip: Optional collection of (season, match_day) pairs that are
+              already complete; they are never fetched (and if nothing is
+              left to fetch, no login happens either)
 
     Returns:
-        dict with total_saved, total_skipped, errors, and optionally questions
+        dict with total_saved, total_skipped, errors, cancelled, and
+        optionally questions
     """
     def report(msg):
         logger.info(msg)
         if progress_callback:
             progress_callback(msg)
 
-    ll_session = create_session(username, password)
-    report("Logged in to LearnedLeague")
-
     total_saved = 0
     total_skipped = 0
     errors = []
     all_questions = []
 
     total_match_days = (end_season - start_season + 1) * 25
-    completed = 0
-
-    for season in range(start_season, end_season + 1):
-        report(f"Starting season LL{season}")
-        for md in range(1, 26):
+    skip = set(skip or ())
+    plan = [(season, md)
+            for season in range(start_season, end_season + 1)
+            for md in range(1, 26)
+            if not (resume_after and (season, md) <= tuple(resume_after))
+            and (season, md) not in skip]
+    completed = total_match_days - len(plan)
+    cancelled = False
+    if completed:
+        report(f"Planned {len(plan)} of {total_match_days} match days "
+               f"({completed} already done)")
+
+    concurrency = max(1, int(concurrency))
+    if not plan:
+        ll_session = None
+    elif session is None:
+        ll_session = create_session(username, password, pool_size=concurrency)
+        report("Logged in to LearnedLeague")
+    else:
+        ll_session = session
+        _mount_pool(ll_session, concurrency)
+    limiter = RateLimiter(rate)
+
+    todo = iter(plan)
+    in_flight = deque()
+
+    with ThreadPoolExecutor(max_workers=concurrency,
+                            thread_name_prefix="scrape") as pool:
+        def submit_next():
+            for season, md in todo:
+                in_flight.append((season, md, pool.submit(
+                    scrape_match_day, ll_session, season, md,
+                    limiter=limiter, archive=archive)))
+                return
+
+        # Keep a small window ahead of the match day being handled so
+        # workers never idle, without queueing the whole backfill
+        for _ in range(concurrency * 2):
+            submit_next()
+
+        last_season = None
+        while in_flight:
+            season, md, future = in_flight.popleft()
+            if should_cancel and should_cancel():
+                report("Cancelled")
+                cancelled = True
+                future.cancel()
+                for _, _, pending in in_flight:
+                    pending.cancel()
+                break
+            if season != last_season:
+                report(f"Starting season LL{season}")
+                last_season = season
             try:
                 report(f"Scraping LL{season} Match Day {md}... ({completed}/{total_match_days})")
-                questions = scrape_match_day(ll_session, season, md)
+                questions = future.result()
                 if questions:
                     if save_callback:
                         saved, skipped = save_callback(questions)
@@ -265,16 +614,16 @@ def scrape_season_range(start_season, end_season, username, password,
                         report(f"  LL{season} MD{md}: {len(questions)} questions")
                 else:
                     report(f"  LL{season} MD{md}: no questions found")
-
-                time.sleep(1.5)
             except Exception as e:
                 error_msg = f"Error scraping LL{season} MD{md}: {e}"
                 logger.error(error_msg)
                 errors.append(error_msg)
                 report(error_msg)
-                time.sleep(3)
 
             completed += 1
+            if match_day_callback:
+                match_day_callback(season, md, completed, total_match_days)
+            submit_next()
 
     report(
         f"Done. Saved {total_saved}, skipped {total_skipped}, "
@@ -284,7 +633,37 @@ def scrape_season_range(start_season, end_season, username, password,
         "total_saved": total_saved,
         "total_skipped": total_skipped,
         "errors": errors,
+        "cancelled": cancelled,
     }
     if not save_callback:
         result["questions"] = all_questions
     return result
+
+
+def reparse_archive(archive, start_season=None, end_season=None,
+                    progress_callback=None, processes=None, batch_size=200):
+    """Re-parse archived match-day pages without any network access.
+
+    Pages are decompressed ``batch_size`` at a time and parsed across
+    ``processes`` worker processes (default: one per CPU).
+
+    Returns ``(questions, pages)``: all question dicts in (season,
+    match_day, question_number) order and the number of pages parsed.
+    """
+    questions = []
+    entries = archive.entries(start_season, end_season)
+    for i in range(0, len(entries), batch_size):
+        batch = []
+        for entry in entries[i:i + batch_size]:
+            html = archive.read_blob(entry["sha256"])
+            if html is None:
+                logger.warning(f"Archived page missing for LL{entry['season']} "
+                               f"MD{entry['match_day']}")
+                continue
+            batch.append((html, entry["season"], entry["match_day"]))
+        for page_questions in parse_pages(batch, processes=processes):
+            questions.extend(page_questions)
+        if progress_callback:
+            progress_callback(f"Parsed {min(i + batch_size, len(entries))}/"
+                              f"{len(entries)} pages")
+    return questions, len(entries)
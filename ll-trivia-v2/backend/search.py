@@ -0,0 +1,202 @@
+"""SQLite FTS5 full-text index over questions, answers, notes and AI text.
+
+The index is a standalone FTS5 table keyed by question id (its rowid), so a
+match joins straight back to ``questions`` for filtering. Triggers on
+``questions``, ``question_notes`` and ``ai_responses`` keep it in sync; the
+table and triggers are created on app startup and can be rebuilt from
+scratch with ``rebuild_search_index`` (or ``scripts/rebuild_search_index.py``).
+"""
+
+import html
+import re
+
+from sqlalchemy import column, func, literal_column, table, text
+
+SEARCH_TABLE = 'search_index'
+
+# Match markers for snippet(); control characters never occur in question
+# text, so they survive html.escape and can be swapped for <mark> tags
+_OPEN_MARK = '\x02'
+_CLOSE_MARK = '\x03'
+
+# Column weights for bm25(): question text > answer > notes > AI explanations
+BM25_WEIGHTS = (10.0, 5.0, 2.0, 1.0)
+
+search_index = table(
+    SEARCH_TABLE,
+    column('rowid'),
+    column('question_text'),
+    column('answer'),
+    column('note_text'),
+    column('ai_text'),
+)
+
+_CREATE_TABLE = f"""
+CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5(
+    question_text, answer, note_text, ai_text,
+    tokenize = 'unicode61 remove_diacritics 2',
+    prefix = '2 3'
+)
+"""
+
+_AI_TEXT_FOR = """(SELECT coalesce(group_concat(response_text, ' '), '')
+     FROM ai_responses WHERE question_id = {ref}.question_id)"""
+
+_TRIGGERS = [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {SEARCH_TABLE}_questions_ai
+    AFTER INSERT ON questions BEGIN
+        INSERT INTO {SEARCH_TABLE}(rowid, question_text, answer, note_text, ai_text)
+        VALUES (new.id, new.question_text, new.answer, '', '');
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {SEARCH_TABLE}_questions_au
+    AFTER UPDATE OF question_text, answer ON questions BEGIN
+        UPDATE {SEARCH_TABLE}
+        SET question_text = new.question_text, answer = new.answer
+        WHERE rowid = new.id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {SEARCH_TABLE}_questions_ad
+    AFTER DELETE ON questions BEGIN
+        DELETE FROM {SEARCH_TABLE} WHERE rowid = old.id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {SEARCH_TABLE}_notes_ai
+    AFTER INSERT ON question_notes BEGIN
+        UPDATE {SEARCH_TABLE} SET note_text = new.note_text
+        WHERE rowid = new.question_id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {SEARCH_TABLE}_notes_au
+    AFTER UPDATE OF note_text ON question_notes BEGIN
+        UPDATE {SEARCH_TABLE} SET note_text = new.note_text
+        WHERE rowid = new.question_id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {SEARCH_TABLE}_notes_ad
+    AFTER DELETE ON question_notes BEGIN
+        UPDATE {SEARCH_TABLE} SET note_text = ''
+        WHERE rowid = old.question_id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {SEARCH_TABLE}_ai_ai
+    AFTER INSERT ON ai_responses BEGIN
+        UPDATE {SEARCH_TABLE} SET ai_text = {_AI_TEXT_FOR.format(ref='new')}
+        WHERE rowid = new.question_id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {SEARCH_TABLE}_ai_au
+    AFTER UPDATE OF response_text ON ai_responses BEGIN
+        UPDATE {SEARCH_TABLE} SET ai_text = {_AI_TEXT_FOR.format(ref='new')}
+        WHERE rowid = new.question_id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {SEARCH_TABLE}_ai_ad
+    AFTER DELETE ON ai_responses BEGIN
+        UPDATE {SEARCH_TABLE} SET ai_text = {_AI_TEXT_FOR.format(ref='old')}
+        WHERE rowid = old.question_id;
+    END
+    """,
+]
+
+_REBUILD = [
+    f"DELETE FROM {SEARCH_TABLE}",
+    f"""
+    INSERT INTO {SEARCH_TABLE}(rowid, question_text, answer, note_text, ai_text)
+    SELECT q.id, q.question_text, q.answer,
+           coalesce(n.note_text, ''),
+           coalesce((SELECT group_concat(a.response_text, ' ')
+                     FROM ai_responses a WHERE a.question_id = q.id), '')
+    FROM questions q
+    LEFT JOIN question_notes n ON n.question_id = q.id
+    """,
+    f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}) VALUES ('optimize')",
+]
+
+
+def ensure_search_index(db):
+    """Create the FTS table and sync triggers if missing.
+
+    A freshly created index is populated from the existing rows, so older
+    databases pick up search on their first boot.
+    """
+    exists = db.session.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+        {'name': SEARCH_TABLE},
+    ).first()
+
+    db.session.execute(text(_CREATE_TABLE))
+    for ddl in _TRIGGERS:
+        db.session.execute(text(ddl))
+    db.session.commit()
+
+    if not exists:
+        rebuild_search_index(db)
+
+
+def rebuild_search_index(db):
+    """Repopulate the FTS index from questions, notes and AI responses.
+
+    Returns the number of indexed questions.
+    """
+    for stmt in _REBUILD:
+        db.session.execute(text(stmt))
+    db.session.commit()
+    return db.session.execute(
+        text(f'SELECT count(*) FROM {SEARCH_TABLE}')).scalar()
+
+
+def build_match_query(raw):
+    """Turn free text into a safe FTS5 MATCH expression.
+
+    Each word becomes a quoted term (so FTS5 operators in user input are
+    inert) and the last word is a prefix match for search-as-you-type.
+    Returns None when the input has no searchable words.
+    """
+    terms = re.findall(r'\w+', raw or '')
+    if not terms:
+        return None
+    quoted = [f'"{t}"' for t in terms]
+    quoted[-1] += '*'
+    return ' '.join(quoted)
+
+
+def match(expr):
+    """WHERE clause matching ``expr`` against the whole index."""
+    return literal_column(SEARCH_TABLE).op('MATCH')(expr)
+
+
+def rank():
+    """bm25 rank expression (lower is better)."""
+    return func.bm25(literal_column(SEARCH_TABLE), *BM25_WEIGHTS)
+
+
+def snippet(tokens=16):
+    """Excerpt from whichever column matched best, with raw match markers.
+
+    Pass the result through ``highlight`` before returning it to a client.
+    """
+    return func.snippet(literal_column(SEARCH_TABLE), -1,
+                        _OPEN_MARK, _CLOSE_MARK, '…', tokens)
+
+
+def highlight(raw_snippet):
+    """HTML-escape a ``snippet`` and wrap its matches in ``<mark>`` tags.
+
+    Question, answer and AI text come from scraped pages and model output,
+    so the excerpt is escaped before any markup is added; the result is
+    safe to render as HTML.
+    """
+    if raw_snippet is None:
+        return None
+    escaped = html.escape(raw_snippet)
+    return escaped.replace(_OPEN_MARK, '<mark>').replace(_CLOSE_MARK, '</mark>')
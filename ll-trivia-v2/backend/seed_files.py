@@ -0,0 +1,155 @@
+"""Seed question files: the bundled JSON and the scraper's NDJSON shards.
+
+``scripts/scrape_seasons.py`` appends each scraped match day to a
+per-season shard (``LL60.ndjson``, one question per line) and then records
+it in ``manifest.ndjson``, so a checkpoint costs O(new questions) and
+resuming reads only the manifest. ``scripts/merge_shards.py`` folds the
+shards into the bundled ``questions_seed.json``.
+"""
+
+import glob
+import json
+import os
+import re
+from datetime import datetime
+
+MANIFEST_FILE = 'manifest.ndjson'
+QUESTIONS_PER_MATCH_DAY = 6
+
+_SHARD_NAME = re.compile(r'LL(\d+)\.ndjson$')
+
+
+def normalize_question(q):
+    """Copy of ``q`` with its season as an int ('LL60' -> 60)."""
+    season = q['season']
+    if isinstance(season, str):
+        season = season.replace('LL', '')
+    return {**q, 'season': int(season)}
+
+
+def question_key(q):
+    return (q['season'], q['match_day'], q['question_number'])
+
+
+def _read_ndjson(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError:
+                # Torn final line from an interrupted append
+                continue
+
+
+def read_seed(path):
+    """All questions in a seed JSON file (or NDJSON, by extension)."""
+    return list(iter_seed(path))
+
+
+def iter_seed(path):
+    """Stream questions from a seed file.
+
+    NDJSON (``.ndjson``/``.jsonl``) is read line by line; a JSON array has
+    to be parsed whole first.
+    """
+    if path.endswith(('.ndjson', '.jsonl')):
+        yield from _read_ndjson(path)
+        return
+    with open(path, 'r', encoding='utf-8') as f:
+        yield from json.load(f)
+
+
+def write_seed(questions, path):
+    """Atomically write questions as the bundled seed JSON, in key order."""
+    ordered = sorted((normalize_question(q) for q in questions), key=question_key)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(ordered, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, path)
+    return len(ordered)
+
+
+def merge_seed(questions, path, replace=False):
+    """Write ``questions`` into the seed at ``path``; returns the total.
+
+    Existing seed questions are kept (``questions`` win on key conflicts)
+    unless ``replace``.
+    """
+    merged = {}
+    if not replace and os.path.exists(path):
+        for q in read_seed(path):
+            q = normalize_question(q)
+            merged[question_key(q)] = q
+    for q in questions:
+        q = normalize_question(q)
+        merged[question_key(q)] = q
+    return write_seed(merged.values(), path)
+
+
+def shard_paths(shards_dir):
+    """Shard files in season order."""
+    paths = [p for p in glob.glob(os.path.join(shards_dir, 'LL*.ndjson'))
+             if _SHARD_NAME.search(p)]
+    return sorted(paths, key=lambda p: int(_SHARD_NAME.search(p).group(1)))
+
+
+def iter_shards(shards_dir):
+    """Every question line in the shards (may repeat keys after a retry)."""
+    for path in shard_paths(shards_dir):
+        yield from _read_ndjson(path)
+
+
+class ShardWriter:
+    """Append-only writer for scraped match days.
+
+    Usable directly as ``scrape_season_range``'s ``save_callback``.
+    """
+
+    def __init__(self, shards_dir):
+        self.shards_dir = shards_dir
+        self.done = {}
+        manifest = os.path.join(shards_dir, MANIFEST_FILE)
+        if os.path.exists(manifest):
+            for entry in _read_ndjson(manifest):
+                self.done[(entry['season'], entry['match_day'])] = entry['questions']
+
+    def complete_match_days(self):
+        """(season, match_day) pairs already written with all questions."""
+        return {pair for pair, n in self.done.items()
+                if n >= QUESTIONS_PER_MATCH_DAY}
+
+    def _append(self, path, lines):
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write(''.join(lines))
+            f.flush()
+            os.fsync(f.fileno())
+
+    def __call__(self, questions):
+        """Append one match day's questions; returns (saved, skipped)."""
+        if not os.path.exists(self.shards_dir):
+            os.makedirs(self.shards_dir, exist_ok=True)
+            # Intermediate output; the merged seed file is what gets committed
+            with open(os.path.join(self.shards_dir, '.gitignore'), 'w') as f:
+                f.write('*\n')
+
+        questions = [normalize_question(q) for q in questions]
+        by_day = {}
+        for q in questions:
+            by_day.setdefault((q['season'], q['match_day']), []).append(q)
+
+        for (season, match_day), day_questions in sorted(by_day.items()):
+            self._append(
+                os.path.join(self.shards_dir, f'LL{season}.ndjson'),
+                [json.dumps(q, ensure_ascii=False) + '\n' for q in day_questions])
+            # The manifest line goes last, so it only lists durable match days
+            self._append(os.path.join(self.shards_dir, MANIFEST_FILE), [json.dumps({
+                'season': season,
+                'match_day': match_day,
+                'questions': len(day_questions),
+                'at': datetime.utcnow().isoformat(timespec='seconds'),
+            }) + '\n'])
+            self.done[(season, match_day)] = len(day_questions)
+        return len(questions), 0
@@ -0,0 +1,101 @@
+"""Prebuilt SQLite snapshot of the seed questions.
+
+``build_snapshot`` (run at build time by ``scripts/build_snapshot.py``)
+compiles the seed JSON into a complete database file: schema, indexes,
+rollups and the FTS index. On first boot ``install_snapshot`` copies it into
+place instead of seeding row by row. ``startup_lock`` is an exclusive file
+lock held around app initialisation, so when several gunicorn workers boot
+together only one of them ever installs or seeds the database.
+"""
+
+import os
+import shutil
+import sqlite3
+import time
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: single-process dev server, no locking needed
+    fcntl = None
+
+
+@contextmanager
+def startup_lock(db_path):
+    """Hold an exclusive lock on ``<db_path>.lock`` for the block."""
+    if fcntl is None:
+        yield
+        return
+    os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+    with open(f'{db_path}.lock', 'a') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def install_snapshot(db_path, snapshot_path):
+    """Copy the snapshot to ``db_path`` if there is no database yet.
+
+    Call with ``startup_lock`` held. Returns True if the snapshot was
+    installed.
+    """
+    if not snapshot_path or not os.path.exists(snapshot_path):
+        return False
+    if os.path.exists(db_path) and os.path.getsize(db_path) > 0:
+        return False
+    tmp_path = f'{db_path}.snapshot.tmp'
+    shutil.copyfile(snapshot_path, tmp_path)
+    os.replace(tmp_path, db_path)
+    return True
+
+
+def build_snapshot(seed_path, output_path, log=print):
+    """Compile ``seed_path`` into a ready-to-copy database at ``output_path``.
+
+    Returns the number of questions in the snapshot.
+    """
+    from flask import Flask
+
+    import bulk_load
+    import rollups
+    import search
+    from models import db
+    from seed_files import iter_seed
+
+    start = time.time()
+    tmp_path = f'{output_path}.tmp'
+    for path in (tmp_path, f'{tmp_path}-journal'):
+        if os.path.exists(path):
+            os.remove(path)
+
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{tmp_path}'
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    db.init_app(app)
+
+    with app.app_context():
+        db.session.execute(db.text('PRAGMA journal_mode = OFF'))
+        db.session.execute(db.text('PRAGMA synchronous = OFF'))
+        db.create_all()
+
+        stats = bulk_load.load_questions(iter_seed(seed_path), log=None)
+        rollups.rebuild_study_summary()
+        db.session.commit()
+
+        # Created after the bulk insert so it is populated in one pass
+        search.ensure_search_index(db)
+        db.session.remove()
+        db.engine.dispose()
+
+    conn = sqlite3.connect(tmp_path)
+    conn.execute('ANALYZE')
+    conn.execute('VACUUM')
+    conn.close()
+    os.replace(tmp_path, output_path)
+
+    log(f"Built snapshot with {stats['rows']} questions at {output_path} "
+        f"({os.path.getsize(output_path) / 1024 / 1024:.1f} MiB, "
+        f"{time.time() - start:.1f}s, {stats['rows_per_sec']} rows/sec loaded)")
+    return stats['rows']
@@ -0,0 +1,154 @@
+"""Per-connection SQLite tuning.
+
+Every new DBAPI connection gets the PRAGMAs of the engine's profile:
+``journal_mode=WAL`` so readers never block on the writer,
+``synchronous=NORMAL`` (durable with WAL, no fsync per commit), a
+``busy_timeout`` so concurrent writers wait their turn instead of failing
+with "database is locked", a larger page cache, memory-mapped reads and
+in-memory temp tables.
+
+The profile starts from ``config.SQLITE_PRAGMAS`` (defaults, overridable
+with ``SQLITE_<PRAGMA>`` env vars). ``sqlite.<pragma>`` rows in
+``app_settings`` override it at startup, and ``sync_settings`` re-reads
+them whenever the data generation moves (see read_cache.py), so a change
+made through the settings API reaches every gunicorn worker within about
+``SYNC_INTERVAL`` seconds. The check reuses the generation a request has
+already read for the read cache and otherwise reads it at most once per
+``SYNC_INTERVAL``.
+
+Settings rows only accept crash-safe values: ``journal_mode`` ``off`` or
+``memory`` and ``synchronous=off`` can corrupt the database if the process
+or machine dies mid-write, so they can only be set by the operator through
+the environment.
+"""
+
+import logging
+import time
+import weakref
+
+from sqlalchemy import event, text
+
+SETTINGS_PREFIX = 'sqlite.'
+
+_CHOICES = {
+    'journal_mode': {'wal', 'delete', 'truncate', 'persist', 'memory', 'off'},
+    'synchronous': {'off', 'normal', 'full', 'extra'},
+    'temp_store': {'default', 'file', 'memory'},
+}
+# Values that risk corruption on a crash; never accepted from app_settings
+_UNSAFE = {
+    'journal_mode': {'memory', 'off'},
+    'synchronous': {'off'},
+}
+_INTEGERS = {'busy_timeout', 'cache_size', 'mmap_size'}
+PRAGMAS = tuple(_CHOICES) + tuple(sorted(_INTEGERS))
+SYNC_INTERVAL = 1.0
+
+logger = logging.getLogger(__name__)
+
+_profiles = weakref.WeakKeyDictionary()
+_synced_generation = weakref.WeakKeyDictionary()
+_last_sync_check = weakref.WeakKeyDictionary()
+
+
+def validate(name, value, runtime=False):
+    """Normalised PRAGMA value, or ValueError for unknown/unsafe input.
+
+    ``runtime`` values come from app_settings and must be crash-safe.
+    """
+    value = str(value).strip().lower()
+    if name in _CHOICES:
+        choices = _CHOICES[name]
+        if runtime:
+            choices = choices - _UNSAFE.get(name, set())
+        if value not in choices:
+            raise ValueError(f'{name} must be one of {sorted(choices)}')
+        return value
+    if name in _INTEGERS:
+        try:
+            return str(int(value))
+        except ValueError:
+            raise ValueError(f'{name} must be an integer') from None
+    raise ValueError(f'Unknown SQLite pragma: {name}')
+
+
+def configure_engine(engine, pragmas):
+    """Apply ``pragmas`` ({name: value}) to every new connection of ``engine``."""
+    if engine.dialect.name != 'sqlite':
+        return
+    validated = {name: validate(name, value) for name, value in pragmas.items()}
+    profile = _profiles.get(engine)
+    if profile is None:
+        profile = _profiles[engine] = {}
+
+        @event.listens_for(engine, 'connect')
+        def _apply_pragmas(dbapi_conn, connection_record):
+            cursor = dbapi_conn.cursor()
+            try:
+                # busy_timeout first: switching journal_mode may need a lock
+                for name, value in sorted(profile.items(),
+                                          key=lambda item: item[0] != 'busy_timeout'):
+                    cursor.execute(f'PRAGMA {name} = {value}')
+            finally:
+                cursor.close()
+
+    profile.clear()
+    profile.update(validated)
+    engine.dispose()
+
+
+def apply_settings(engine, settings):
+    """Merge ``sqlite.*`` entries of an app_settings mapping into the profile.
+
+    If any value changed, idle pooled connections are dropped so the new
+    values take effect on the next checkout. Returns the changed values;
+    raises ValueError for an unknown or unsafe one.
+    """
+    overrides = {key[len(SETTINGS_PREFIX):]: value
+                 for key, value in settings.items()
+                 if key.startswith(SETTINGS_PREFIX)}
+    if not overrides or engine not in _profiles:
+        return {}
+    overrides = {name: validate(name, value, runtime=True)
+                 for name, value in overrides.items()}
+    profile = _profiles[engine]
+    changed = {name: value for name, value in overrides.items()
+               if profile.get(name) != value}
+    if changed:
+        profile.update(changed)
+        engine.dispose()
+    return changed
+
+
+def sync_settings(engine, load_generation, load_settings, generation=None):
+    """Re-apply the ``sqlite.*`` settings if the data generation moved.
+
+    ``generation`` is the value the caller already has, if any; without
+    it ``load_generation()`` is called, but at most once per
+    ``SYNC_INTERVAL``. ``load_settings`` returns the current app_settings
+    mapping and is only called once per generation.
+    """
+    if engine not in _profiles:
+        return
+    now = time.monotonic()
+    if generation is None:
+        if now - _last_sync_check.get(engine, float('-inf')) < SYNC_INTERVAL:
+            return
+        generation = load_generation()
+    _last_sync_check[engine] = now
+    if _synced_generation.get(engine) == generation:
+        return
+    _synced_generation[engine] = generation
+    try:
+        changed = apply_settings(engine, load_settings())
+    except ValueError as e:
+        logger.warning('Ignoring invalid SQLite setting: %s', e)
+        return
+    if changed:
+        logger.info('SQLite settings changed: %s', changed)
+
+
+def current_pragmas(connection):
+    """Effective PRAGMA values on a SQLAlchemy connection."""
+    return {name: connection.execute(text(f'PRAGMA {name}')).scalar()
+            for name in PRAGMAS}
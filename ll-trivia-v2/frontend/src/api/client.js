@@ -17,6 +17,53 @@ async function request(path, options = {}) {
   return res.json();
 }
 
+// Read a Server-Sent Events response from a POST, calling onEvent(event, data)
+// for each message; resolves when the stream ends
+async function streamEvents(path, body, onEvent) {
+  const res = await fetch(`${API_BASE}${path}`, {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json' },
+    body: JSON.stringify(body),
+  });
+  if (!res.ok) {
+    const err = await res.json().catch(() => ({ error: res.statusText }));
+    throw new Error(err.error || `Request failed: ${res.status}`);
+  }
+  const reader = res.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = '';
+  for (;;) {
+    const { done, value } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+    let end;
+    while ((end = buffer.indexOf('\n\n')) !== -1) {
+      const message = buffer.slice(0, end);
+      buffer = buffer.slice(end + 2);
+      let event = 'message';
+      let data = '';
+      for (const line of message.split('\n')) {
+        if (line.startsWith('event: ')) event = line.slice(7);
+        else if (line.startsWith('data: ')) data += line.slice(6);
+      }
+      if (data) onEvent(event, JSON.parse(data));
+    }
+  }
+}
+
+// Run an SSE endpoint that ends in a `done` or `error` event; resolves with
+// the `done` payload
+async function streamUntilDone(path, body, onEvent) {
+  let result = null;
+  await streamEvents(path, body, (event, data) => {
+    if (event === 'error') throw new Error(data.error);
+    if (event === 'done') result = data;
+    else onEvent(event, data);
+  });
+  if (!result) throw new Error('Stream ended early');
+  return result;
+}
+
 // Questions
 export const getQuestions = (params = {}) => {
   const qs = new URLSearchParams(params).toString();
@@ -24,12 +71,22 @@ export const getQuestions = (params = {}) => {
 };
 export const getQuestion = (id) => request(`/questions/${id}`);
 
+// Search. Each result's `snippet` is HTML-escaped server-side with the
+// matched terms wrapped in <mark>, so it can be rendered as HTML as is.
+export const searchQuestions = (q, params = {}) => {
+  const qs = new URLSearchParams({ q, ...params }).toString();
+  return request(`/search?${qs}`);
+};
+
 // Subcategories
 export const getSubcategories = (category) => request(`/subcategories?category=${encodeURIComponent(category)}`);
 
 // Progress
 export const recordProgress = (questionId, confidence) =>
   request('/progress', { method: 'POST', body: { question_id: questionId, confidence } });
+// events: [{ question_id, confidence, answered_at, client_event_id }]
+export const recordProgressBatch = (events) =>
+  request('/progress/batch', { method: 'POST', body: { events } });
 
 // Sessions
 export const createSession = (mode, settings = {}) =>
@@ -65,14 +122,48 @@ export const getStatsHeatmap = () => request('/stats/heatmap');
 export const getStatsWeakest = () => request('/stats/weakest');
 
 // AI
-export const learnMore = (questionId, mode = 'quick') =>
-  request('/learn-more', { method: 'POST', body: { question_id: questionId, mode } });
+// Uncached explanations come back as a job to poll; resolve with the
+// explanation either way
+export const learnMore = async (questionId, mode = 'quick') => {
+  const data = await request('/learn-more', {
+    method: 'POST',
+    body: { question_id: questionId, mode },
+  });
+  if (!data.job) return data;
+  const job = await waitForJob(data.job.id);
+  return job.result.ai_response;
+};
+// Streamed variant: onText(chunk) as the explanation is written; resolves
+// with the stored explanation
+export const streamLearnMore = (questionId, mode, onText) =>
+  streamUntilDone('/learn-more/stream', { question_id: questionId, mode },
+    (event, data) => { if (event === 'text') onText(data.text); });
 
 // Import
 export const startScrape = (data) =>
   request('/import/scrape', { method: 'POST', body: data });
 export const getScrapeStatus = () => request('/import/status');
 
+// Background jobs
+export const getJobs = (params = {}) => {
+  const qs = new URLSearchParams(params).toString();
+  return request(`/jobs?${qs}`);
+};
+export const getJob = (id) => request(`/jobs/${id}`);
+export const cancelJob = (id) => request(`/jobs/${id}/cancel`, { method: 'POST' });
+
+// Poll a job until it finishes; rejects if it fails or is cancelled
+export async function waitForJob(id, intervalMs = 1000) {
+  for (;;) {
+    const job = await getJob(id);
+    if (job.status === 'succeeded') return job;
+    if (job.status === 'failed' || job.status === 'cancelled') {
+      throw new Error(job.error || `Job ${job.status}`);
+    }
+    await new Promise((resolve) => setTimeout(resolve, intervalMs));
+  }
+}
+
 // Export
 export const getExportJsonUrl = () => `${API_BASE}/export/json`;
 export const getExportCsvUrl = () => `${API_BASE}/export/csv`;
@@ -83,11 +174,21 @@ export const updateSettings = (settings) =>
   request('/settings', { method: 'PUT', body: settings });
 
 // AI Question Forge
-export const generateQuestions = (category, count = 5, difficultyHint = 'mixed') =>
-  request('/ai/generate-questions', {
+// Runs as a job; resolves with { questions, count } once they are saved
+export const generateQuestions = async (category, count = 5, difficultyHint = 'mixed') => {
+  const data = await request('/ai/generate-questions', {
     method: 'POST',
     body: { category, count, difficulty_hint: difficultyHint },
   });
+  const job = await waitForJob(data.job.id);
+  return job.result;
+};
+// Streamed variant: onQuestion(question) as each one is generated; resolves
+// with { questions, count } once they are saved
+export const streamGeneratedQuestions = (category, count, difficultyHint, onQuestion) =>
+  streamUntilDone('/ai/generate-questions/stream',
+    { category, count, difficulty_hint: difficultyHint },
+    (event, data) => { if (event === 'question') onQuestion(data); });
 
 // Data management
 export const resetProgress = () =>
@@ -1,5 +1,5 @@
 import { useState, useEffect, useCallback, useRef } from 'react';
-import { learnMore } from '../api/client';
+import { streamLearnMore } from '../api/client';
 
 const MODES = [
   { key: 'quick', label: 'Quick Explain' },
@@ -130,6 +130,8 @@ export default function LearnMore({ questionId, isVisible }) {
   const [activeMode, setActiveMode] = useState(null);
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState(null);
+  // Bumped as streamed text arrives so the partial explanation re-renders
+  const [, setStreamedLength] = useState(0);
   // Cache: { "questionId:mode": responseText }
   const cacheRef = useRef({});
 
@@ -171,9 +173,15 @@ export default function LearnMore({ questionId, isVisible }) {
     setLoading(true);
     setError(null);
     try {
-      const result = await learnMore(questionId, mode);
+      let text = '';
+      const result = await streamLearnMore(questionId, mode, (chunk) => {
+        text += chunk;
+        cacheRef.current[cacheKey] = text;
+        setStreamedLength(text.length);
+      });
       cacheRef.current[cacheKey] = result.response_text;
     } catch (err) {
+      delete cacheRef.current[cacheKey]; // drop any partial text
       console.error('Failed to fetch learn more content:', err);
       setError(err.message || 'Failed to load content');
     } finally {
@@ -1,7 +1,7 @@
 import { useState, useEffect } from 'react';
 import { useNavigate } from 'react-router-dom';
 import { CATEGORY_COLORS, getCategoryColor } from '../styles/categories';
-import { generateQuestions, getStatsCategories } from '../api/client';
+import { getStatsCategories, streamGeneratedQuestions } from '../api/client';
 
 const DIFFICULTIES = [
   { value: 'easy', label: 'Easy' },
@@ -83,9 +83,15 @@ export default function QuestionForge({ onStudyGenerated }) {
     setPhase('loading');
     setDotCount(0);
     try {
-      const data = await generateQuestions(selectedCategory, count, difficulty);
-      setGeneratedQuestions(data.questions || []);
+      setGeneratedQuestions([]);
       setRevealedAnswers({});
+      // Show each question as soon as it is written, then swap in the
+      // saved rows (with ids) once the batch is stored
+      const data = await streamGeneratedQuestions(selectedCategory, count, difficulty, (q) => {
+        setGeneratedQuestions((prev) => [...prev, q]);
+        setPhase('results');
+      });
+      setGeneratedQuestions(data.questions || []);
       setPhase('results');
     } catch (err) {
       setError(err.message || 'Failed to generate questions. Please try again.');
@@ -469,6 +475,7 @@ export default function QuestionForge({ onStudyGenerated }) {
           <button
             className="btn btn--primary"
             onClick={handleStudyGenerated}
+            disabled={generatedQuestions.some((q) => q.id == null)}
             style={{
               background: 'linear-gradient(135deg, var(--warning), var(--success))',
               border: '1px solid rgba(255, 186, 8, 0.4)',
@@ -492,11 +499,12 @@ export default function QuestionForge({ onStudyGenerated }) {
       }}>
         {generatedQuestions.map((q, idx) => {
           const diff = getDifficultyBadge(q.percent_correct);
-          const isRevealed = revealedAnswers[q.id];
+          const cardKey = q.id ?? `pending-${q.index}`;
+          const isRevealed = revealedAnswers[idx];
 
           return (
             <div
-              key={q.id}
+              key={cardKey}
               style={{
                 background: 'var(--surface)',
                 border: '1px solid var(--border)',
@@ -617,7 +625,7 @@ export default function QuestionForge({ onStudyGenerated }) {
                   </div>
                 ) : (
                   <button
-                    onClick={() => toggleReveal(q.id)}
+                    onClick={() => toggleReveal(idx)}
                     style={{
                       width: '100%',
                       padding: 'var(--space-sm) var(--space-md)',
@@ -159,6 +159,8 @@ function ScrapeSection() {
           setScraping(true);
           setMessages(data.messages || []);
           startPolling();
+        } else if (data.awaiting_credentials) {
+          showInterrupted(data);
         }
       })
       .catch(() => {});
@@ -166,6 +168,17 @@ function ScrapeSection() {
     // eslint-disable-next-line react-hooks/exhaustive-deps
   }, []);
 
+  // The server keeps the password in memory only, so a scrape cut off by
+  // a restart waits for it to be entered again and then resumes
+  function showInterrupted(data) {
+    const params = data.job?.params || {};
+    setMessages(data.messages || []);
+    if (params.username) setUsername(params.username);
+    if (params.start_season) setStartSeason(String(params.start_season));
+    if (params.end_season) setEndSeason(String(params.end_season));
+    setError('A scrape was interrupted. Enter your password and start again to resume it.');
+  }
+
   function startPolling() {
     stopPolling();
     pollRef.current = setInterval(async () => {
@@ -175,7 +188,8 @@ function ScrapeSection() {
         if (!data.running) {
           setScraping(false);
           stopPolling();
-          if (data.result) setResult(data.result);
+          if (data.awaiting_credentials) showInterrupted(data);
+          else if (data.result) setResult(data.result);
         }
       } catch {
         // keep polling
@@ -244,7 +244,7 @@ export default function Study() {
       const session = await createSession(isQuizMode ? 'quiz' : mode, settings);
       setSessionId(session.id);
 
-      const params = { limit };
+      const params = { limit, include_total: false };
       if (isDeepDiveMode) {
         params.category = deepDiveCategory;
       } else if (isRevengeMode && revengeFocus !== 'all') {
@@ -0,0 +1,331 @@
+#!/usr/bin/env python3
+"""Run the AI pipeline against a local stand-in for the Anthropic API.
+
+The stand-in answers ``POST /v1/messages`` after a configurable delay with a
+canned reply (a JSON array of questions for Question Forge prompts, filler
+text otherwise), spreading the delay over the chunks of a streamed reply
+when the request asks for ``stream``, and records how many calls it received and how many were
+in flight at once. The check boots the app on a throwaway database with
+``ANTHROPIC_BASE_URL`` pointed at the stand-in, then:
+
+- fires concurrent Learn More requests for one (question, mode) and checks
+  they share one job and cost one upstream call;
+- requests many distinct explanations and checks that no more than
+  ``AI_MAX_CONCURRENCY`` calls were ever in flight, reporting throughput;
+- streams an explanation and a Question Forge batch over SSE, reporting
+  time to first event against total time, and checks that the cached
+  explanation replays over the same protocol;
+- opens concurrent streams (and a polled request) for one explanation and
+  checks they share one job and cost one upstream call.
+
+Usage:
+    python scripts/ai_standin.py [--latency 0.5] [--requests 24] [--concurrency 4]
+    python scripts/ai_standin.py --serve [--port 8765]   # stand-in only
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+STREAM_CHUNK = 16
+FILLER = ('Stand-in explanation text that is long enough to look like a real '
+          'reply from the model. ')
+
+
+def canned_reply(prompt):
+    """Reply text for a prompt: forge prompts get a JSON question array."""
+    match = re.search(r'Generate exactly (\d+) trivia questions', prompt)
+    if match:
+        return json.dumps([
+            {'question_text': f'Stand-in generated question {i}?',
+             'answer': f'Answer {i}', 'difficulty_estimate': 50}
+            for i in range(1, int(match.group(1)) + 1)])
+    return FILLER * 8
+
+
+class FakeAnthropic(BaseHTTPRequestHandler):
+    latency = 0.5
+    calls = 0
+    in_flight = 0
+    peak_in_flight = 0
+    prompts = []
+    lock = threading.Lock()
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        prompt = body['messages'][-1]['content']
+        cls = FakeAnthropic
+        with cls.lock:
+            cls.calls += 1
+            cls.in_flight += 1
+            cls.peak_in_flight = max(cls.peak_in_flight, cls.in_flight)
+            cls.prompts.append(prompt)
+        text = canned_reply(prompt)
+        if body.get('stream'):
+            self._stream(body, prompt, text)
+            return
+        time.sleep(self.latency)
+        # The call is over once the reply is ready; count it out before
+        # sending so the next call the client makes is not seen overlapping
+        with cls.lock:
+            cls.in_flight -= 1
+        payload = json.dumps({
+            'id': f'msg_standin_{cls.calls}',
+            'type': 'message',
+            'role': 'assistant',
+            'model': body.get('model', 'stand-in'),
+            'content': [{'type': 'text', 'text': text}],
+            'stop_reason': 'end_turn',
+            'stop_sequence': None,
+            'usage': {'input_tokens': len(prompt) // 4,
+                      'output_tokens': len(text) // 4},
+        }).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _stream(self, body, prompt, text):
+        """Send ``text`` as Messages API stream events over ``latency``."""
+        cls = FakeAnthropic
+        chunks = [text[i:i + STREAM_CHUNK] for i in range(0, len(text), STREAM_CHUNK)]
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.end_headers()
+
+        def send(event, data):
+            self.wfile.write(f'event: {event}\ndata: {json.dumps(data)}\n\n'.encode())
+            self.wfile.flush()
+
+        send('message_start', {'type': 'message_start', 'message': {
+            'id': f'msg_standin_{cls.calls}', 'type': 'message',
+            'role': 'assistant', 'model': body.get('model', 'stand-in'),
+            'content': [], 'stop_reason': None, 'stop_sequence': None,
+            'usage': {'input_tokens': len(prompt) // 4, 'output_tokens': 0}}})
+        send('content_block_start', {'type': 'content_block_start', 'index': 0,
+                                     'content_block': {'type': 'text', 'text': ''}})
+        for chunk in chunks:
+            time.sleep(self.latency / len(chunks))
+            send('content_block_delta', {'type': 'content_block_delta', 'index': 0,
+                                         'delta': {'type': 'text_delta', 'text': chunk}})
+        send('content_block_stop', {'type': 'content_block_stop', 'index': 0})
+        with cls.lock:
+            cls.in_flight -= 1
+        send('message_delta', {'type': 'message_delta',
+                               'delta': {'stop_reason': 'end_turn', 'stop_sequence': None},
+                               'usage': {'output_tokens': len(text) // 4}})
+        send('message_stop', {'type': 'message_stop'})
+
+    def log_message(self, *args):
+        pass
+
+
+def start_server(latency, port=0):
+    """Start the stand-in in a daemon thread; returns the server."""
+    FakeAnthropic.latency = latency
+    server = ThreadingHTTPServer(('127.0.0.1', port), FakeAnthropic)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def boot_app(server, concurrency):
+    """Import the app against a throwaway database and the stand-in."""
+    os.environ['ANTHROPIC_BASE_URL'] = f'http://127.0.0.1:{server.server_port}'
+    os.environ.setdefault('ANTHROPIC_API_KEY', 'standin')
+    os.environ['AI_MAX_CONCURRENCY'] = str(concurrency)
+
+    import config
+    workdir = tempfile.mkdtemp(prefix='ai_standin_')
+    config.DATABASE_PATH = os.path.join(workdir, 'trivia.db')
+    config.SQLALCHEMY_DATABASE_URI = f'sqlite:///{config.DATABASE_PATH}'
+    config.SEED_SNAPSHOT_PATH = ''
+
+    from app import app
+    return app
+
+
+def wait_for_jobs(client, job_ids, timeout=120):
+    """Poll until every job has finished; returns {id: job dict}."""
+    deadline = time.time() + timeout
+    pending = set(job_ids)
+    done = {}
+    while pending and time.time() < deadline:
+        for job_id in list(pending):
+            job = client.get(f'/api/v1/jobs/{job_id}').get_json()
+            if job['status'] not in ('queued', 'running'):
+                done[job_id] = job
+                pending.discard(job_id)
+        time.sleep(0.1)
+    return done
+
+
+def read_events(response, start):
+    """[(seconds since ``start``, event, data)] from an SSE response."""
+    events = []
+    event = None
+    for line in response.response:
+        for row in line.decode().splitlines():
+            if row.startswith('event: '):
+                event = row[len('event: '):]
+            elif row.startswith('data: '):
+                events.append((time.time() - start, event, json.loads(row[len('data: '):])))
+    return events
+
+
+def check_streaming(client, latency):
+    """Stream an explanation, replay it, and stream a forge batch."""
+    ok = True
+    start = time.time()
+    response = client.post('/api/v1/learn-more/stream', json={
+        'question_id': 500, 'mode': 'deep_dive'})
+    events = read_events(response, start)
+    total = time.time() - start
+    texts = [data['text'] for _, event, data in events if event == 'text']
+    done = [data for _, event, data in events if event == 'done']
+    print(f'Streamed explanation: {len(texts)} text events, first after '
+          f'{events[0][0]:.2f}s of {total:.2f}s')
+    ok = ok and bool(done) and done[0]['response_text'] == ''.join(texts)
+    ok = ok and events[0][0] < total / 2
+
+    replay = read_events(client.post('/api/v1/learn-more/stream', json={
+        'question_id': 500, 'mode': 'deep_dive'}), time.time())
+    print(f'Replayed explanation: {[event for _, event, _ in replay]}')
+    ok = ok and [event for _, event, _ in replay] == ['text', 'done']
+    ok = ok and replay[0][2]['text'] == ''.join(texts)
+
+    start = time.time()
+    events = read_events(client.post('/api/v1/ai/generate-questions/stream', json={
+        'category': 'SCIENCE', 'count': 5}), start)
+    total = time.time() - start
+    questions = [at for at, event, _ in events if event == 'question']
+    done = [data for _, event, data in events if event == 'done']
+    print(f'Streamed forge: {len(questions)} question events, first after '
+          f'{questions[0]:.2f}s of {total:.2f}s; '
+          f"saved {done[0]['count'] if done else 0}")
+    ok = ok and len(questions) == 5 and bool(done) and done[0]['count'] == 5
+    ok = ok and all(q['id'] for q in done[0]['questions'])
+    ok = ok and questions[0] < total / 2
+    return ok
+
+
+def check_stream_coalescing(app):
+    """Concurrent streams and a polled request for one explanation."""
+    FakeAnthropic.calls = FakeAnthropic.peak_in_flight = 0
+    results = []
+    lock = threading.Lock()
+
+    def stream():
+        events = read_events(app.test_client().post('/api/v1/learn-more/stream', json={
+            'question_id': 600, 'mode': 'quick'}), time.time())
+        with lock:
+            results.append([data for _, event, data in events if event == 'done'])
+
+    def poll():
+        response = app.test_client().post('/api/v1/learn-more', json={
+            'question_id': 600, 'mode': 'quick'})
+        body = response.get_json()
+        if 'job' in body:
+            body = wait_for_jobs(app.test_client(), [body['job']['id']])[body['job']['id']]
+            body = body['result']['ai_response']
+        with lock:
+            results.append([body])
+
+    threads = [threading.Thread(target=stream) for _ in range(4)]
+    threads.append(threading.Thread(target=poll))
+    for thread in threads:
+        thread.start()
+        time.sleep(0.02)
+    for thread in threads:
+        thread.join()
+    texts = {done[0]['response_text'] for done in results if done}
+    print(f'Stream coalescing: 4 streams + 1 polled request -> '
+          f'{FakeAnthropic.calls} upstream call(s), {len(texts)} distinct text(s)')
+    return FakeAnthropic.calls == 1 and len(results) == 5 and len(texts) == 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Exercise the AI pipeline against a local stand-in')
+    parser.add_argument('--latency', type=float, default=0.5, help='Seconds per upstream call')
+    parser.add_argument('--requests', type=int, default=24,
+                        help='Distinct explanations to generate')
+    parser.add_argument('--concurrency', type=int, default=4, help='AI_MAX_CONCURRENCY')
+    parser.add_argument('--serve', action='store_true', help='Only run the stand-in')
+    parser.add_argument('--port', type=int, default=8765, help='Port for --serve')
+    args = parser.parse_args()
+
+    if args.serve:
+        server = start_server(args.latency, args.port)
+        print(f'Anthropic stand-in on http://127.0.0.1:{server.server_port}')
+        print(f'Set ANTHROPIC_BASE_URL=http://127.0.0.1:{server.server_port}')
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            server.shutdown()
+        return
+
+    server = start_server(args.latency)
+    app = boot_app(server, args.concurrency)
+    ok = True
+
+    # Coalescing: many tabs asking for the same explanation at once
+    job_ids = []
+    lock = threading.Lock()
+
+    def ask(question_id, mode):
+        response = app.test_client().post('/api/v1/learn-more', json={
+            'question_id': question_id, 'mode': mode})
+        with lock:
+            job_ids.append(response.get_json()['job']['id'])
+
+    threads = [threading.Thread(target=ask, args=(1, 'deep_dive')) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    client = app.test_client()
+    wait_for_jobs(client, job_ids)
+    coalesced = len(set(job_ids)) == 1 and FakeAnthropic.calls == 1
+    print(f'Coalescing: 8 requests -> {len(set(job_ids))} job(s), '
+          f'{FakeAnthropic.calls} upstream call(s)')
+    cached = client.post('/api/v1/learn-more', json={'question_id': 1, 'mode': 'deep_dive'})
+    print(f'Repeat request: HTTP {cached.status_code} (cached)')
+    ok = ok and coalesced and cached.status_code == 200
+
+    # Concurrency cap and throughput over distinct explanations
+    FakeAnthropic.calls = FakeAnthropic.peak_in_flight = 0
+    job_ids = []
+    start = time.time()
+    for i in range(args.requests):
+        response = client.post('/api/v1/learn-more', json={
+            'question_id': 2 + i // 3, 'mode': ('quick', 'deep_dive', 'quiz_bowl')[i % 3]})
+        job_ids.append(response.get_json()['job']['id'])
+    finished = wait_for_jobs(client, job_ids)
+    elapsed = time.time() - start
+    succeeded = sum(1 for job in finished.values() if job['status'] == 'succeeded')
+    print(f'Generated {succeeded}/{args.requests} explanations in {elapsed:.1f}s '
+          f'({succeeded / elapsed:.1f}/s at {args.latency:g}s per call)')
+    print(f'Peak upstream calls in flight: {FakeAnthropic.peak_in_flight} '
+          f'(limit {args.concurrency})')
+    ok = (ok and succeeded == args.requests
+          and FakeAnthropic.peak_in_flight <= args.concurrency)
+
+    ok = check_streaming(client, args.latency) and ok
+    ok = check_stream_coalescing(app) and ok
+
+    server.shutdown()
+    print('OK' if ok else 'FAILED')
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""Benchmark match-day page parsing: BeautifulSoup reference vs lean lxml.
+
+Parses the same pages with ``parse_match_day_soup`` (the original
+BeautifulSoup walk), ``parse_match_day`` in-process, and ``parse_pages``
+across a process pool, and checks all three produce identical records.
+Uses archived pages when --archive is given, otherwise generated fixtures.
+
+Usage:
+    python scripts/bench_parse.py [--archive DIR] [--pages 300] [--rows 150]
+                                  [--processes N]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from page_archive import PageArchive
+from scrape_standin import fixture_page
+from scraper import parse_match_day, parse_match_day_soup, parse_pages
+
+
+def load_pages(args):
+    if args.archive:
+        archive = PageArchive(args.archive)
+        entries = archive.entries()[:args.pages]
+        return [(archive.read_blob(e['sha256']), e['season'], e['match_day'])
+                for e in entries]
+    return [(fixture_page(60 + i // 25, i % 25 + 1, args.rows),
+             60 + i // 25, i % 25 + 1)
+            for i in range(args.pages)]
+
+
+def timed(label, fn, pages):
+    start = time.perf_counter()
+    results = fn()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} {elapsed:7.2f}s  {len(pages) / elapsed:8.0f} pages/s")
+    return results, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark match-day parsing')
+    parser.add_argument('--archive', type=str, help='Parse pages from this page archive')
+    parser.add_argument('--pages', type=int, default=300, help='Number of pages')
+    parser.add_argument('--rows', type=int, default=150,
+                        help='Player rows per generated page')
+    parser.add_argument('--processes', type=int, default=os.cpu_count(),
+                        help='Processes for the pooled run')
+    args = parser.parse_args()
+
+    pages = load_pages(args)
+    size = sum(len(p[0]) for p in pages)
+    print(f"{len(pages)} pages, {size / 1024 / 1024:.1f} MiB\n")
+
+    soup, soup_time = timed('BeautifulSoup (reference)',
+                            lambda: [parse_match_day_soup(*p) for p in pages], pages)
+    lean, lean_time = timed('lxml/XPath',
+                            lambda: [parse_match_day(*p) for p in pages], pages)
+    pooled, pool_time = timed(f'lxml/XPath, {args.processes} processes',
+                              lambda: parse_pages(pages, args.processes), pages)
+
+    print(f"\nSpeedup: {soup_time / lean_time:.1f}x in-process, "
+          f"{soup_time / pool_time:.1f}x pooled")
+    mismatches = [p[1:] for p, a, b, c in zip(pages, soup, lean, pooled)
+                  if not a == b == c]
+    if mismatches:
+        print(f"FAILED: output differs for {len(mismatches)} pages, e.g. {mismatches[:3]}")
+        sys.exit(1)
+    print("Outputs identical.")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""Concurrency benchmark for the SQLite tuning profile.
+
+Builds a database from the seed file, copies it twice and runs the same
+workload against each copy: N reader threads issuing the app's typical
+question queries and one writer committing small transactions, for a fixed
+duration. The "baseline" copy uses SQLite defaults (rollback journal, no
+tuning); the "tuned" copy uses ``config.SQLITE_PRAGMAS`` through
+``sqlite_tuning.configure_engine``.
+
+Usage:
+    python scripts/bench_sqlite.py [--readers 8] [--seconds 10] [--seed PATH]
+"""
+
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+
+import sqlite_tuning
+from config import SEED_FILE, SQLITE_PRAGMAS
+from snapshot import build_snapshot
+
+READ_QUERIES = (
+    'SELECT * FROM questions WHERE category = :category '
+    'ORDER BY percent_correct LIMIT 20',
+    'SELECT category, COUNT(*), AVG(percent_correct) FROM questions GROUP BY category',
+    'SELECT q.* FROM questions q LEFT JOIN study_progress p ON p.question_id = q.id '
+    'WHERE q.category = :category AND p.id IS NULL LIMIT 10',
+)
+
+
+def _percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct))]
+
+
+def run_workload(engine, readers, seconds):
+    """Run readers + one writer against ``engine``; returns a stats dict."""
+    with engine.begin() as conn:
+        conn.execute(text('CREATE TABLE IF NOT EXISTS bench_writes '
+                          '(id INTEGER PRIMARY KEY, payload TEXT, created REAL)'))
+        categories = [row[0] for row in conn.execute(
+            text('SELECT DISTINCT category FROM questions'))]
+
+    stop = threading.Event()
+    lock = threading.Lock()
+    stats = {'reads': 0, 'writes': 0, 'locked': 0,
+             'read_latency': [], 'write_latency': []}
+
+    def record(kind, latency):
+        with lock:
+            stats[f'{kind}s'] += 1
+            stats[f'{kind}_latency'].append(latency)
+
+    def reader():
+        rng = random.Random()
+        while not stop.is_set():
+            sql = rng.choice(READ_QUERIES)
+            started = time.perf_counter()
+            try:
+                with engine.connect() as conn:
+                    conn.execute(text(sql), {'category': rng.choice(categories)}).fetchall()
+            except OperationalError as e:
+                if 'locked' not in str(e):
+                    raise
+                with lock:
+                    stats['locked'] += 1
+                continue
+            record('read', time.perf_counter() - started)
+
+    def writer():
+        while not stop.is_set():
+            started = time.perf_counter()
+            try:
+                with engine.begin() as conn:
+                    conn.execute(text('INSERT INTO bench_writes (payload, created) '
+                                      'VALUES (:payload, :created)'),
+                                 {'payload': 'x' * 200, 'created': time.time()})
+            except OperationalError as e:
+                if 'locked' not in str(e):
+                    raise
+                with lock:
+                    stats['locked'] += 1
+                continue
+            record('write', time.perf_counter() - started)
+
+    threads = [threading.Thread(target=reader) for _ in range(readers)]
+    threads.append(threading.Thread(target=writer))
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    engine.dispose()
+
+    return {
+        'reads/s': stats['reads'] / seconds,
+        'writes/s': stats['writes'] / seconds,
+        'read p95 ms': _percentile(stats['read_latency'], 0.95) * 1000,
+        'write p95 ms': _percentile(stats['write_latency'], 0.95) * 1000,
+        'locked errors': stats['locked'],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark SQLite tuning under concurrency')
+    parser.add_argument('--readers', type=int, default=8, help='Reader threads (default 8)')
+    parser.add_argument('--seconds', type=float, default=10.0,
+                        help='Duration of each run in seconds (default 10)')
+    parser.add_argument('--seed', type=str, default=SEED_FILE, help='Seed JSON to load')
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='bench_sqlite_')
+    try:
+        source = os.path.join(workdir, 'source.db')
+        build_snapshot(args.seed, source)
+
+        results = {}
+        for label in ('baseline', 'tuned'):
+            path = os.path.join(workdir, f'{label}.db')
+            shutil.copyfile(source, path)
+            engine = create_engine(f'sqlite:///{path}', pool_size=args.readers + 1)
+            if label == 'tuned':
+                sqlite_tuning.configure_engine(engine, SQLITE_PRAGMAS)
+            else:
+                with engine.connect() as conn:
+                    conn.execute(text('PRAGMA journal_mode = DELETE'))
+            with engine.connect() as conn:
+                profile = sqlite_tuning.current_pragmas(conn)
+            print(f"\n{label}: " + ', '.join(f'{k}={v}' for k, v in profile.items()))
+            results[label] = run_workload(engine, args.readers, args.seconds)
+
+        print(f"\n{args.readers} readers + 1 writer, {args.seconds:g}s per run\n")
+        print(f"{'':16}{'baseline':>12}{'tuned':>12}")
+        for metric in results['baseline']:
+            print(f"{metric:16}{results['baseline'][metric]:>12.1f}"
+                  f"{results['tuned'][metric]:>12.1f}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""Compile the seed JSON into a prebuilt SQLite snapshot.
+
+Run at build time; on first boot the app copies the snapshot into place
+instead of seeding the questions table row by row.
+
+Usage:
+    python scripts/build_snapshot.py [--seed backend/data/questions_seed.json]
+                                     [--output backend/data/seed_snapshot.db]
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from config import SEED_FILE, SEED_SNAPSHOT_PATH
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build the seed database snapshot')
+    parser.add_argument('--seed', type=str, default=SEED_FILE,
+                        help='Seed questions JSON (or NDJSON)')
+    parser.add_argument('--output', type=str, default=SEED_SNAPSHOT_PATH,
+                        help='Snapshot database to write')
+    args = parser.parse_args()
+
+    if not os.path.exists(args.seed):
+        print(f"Error: {args.seed} not found.")
+        sys.exit(1)
+
+    # Deliberately not importing app: that would create and seed trivia.db
+    from snapshot import build_snapshot
+
+    build_snapshot(os.path.abspath(args.seed), os.path.abspath(args.output))
+
+
+if __name__ == '__main__':
+    main()
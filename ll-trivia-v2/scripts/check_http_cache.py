@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""Check ETags, 304s and compression on the JSON API.
+
+Boots the app against a throwaway database and checks that:
+
+- large responses are brotli or gzip compressed as negotiated (and decode
+  to the identity body), small ones and clients without Accept-Encoding
+  are sent as is;
+- a repeat GET with If-None-Match gets an empty 304, both for views
+  tagged with the data generation and for body-hashed ones (dashboard,
+  import status), and a write changes the tag;
+- streamed exports are left alone.
+
+Prints response sizes per encoding and 200 vs 304 latency. Exits 1 on any
+failure.
+
+Usage:
+    python scripts/check_http_cache.py [--repeat 50]
+"""
+
+import argparse
+import gzip
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+SIZE_URLS = ['/api/v1/stats/heatmap', '/api/v1/questions?limit=100']
+CONDITIONAL_URLS = [
+    '/api/v1/stats/heatmap',          # data generation
+    '/api/v1/questions/1',            # data generation
+    '/api/v1/stats/overview',         # body hash (clock-dependent)
+    '/api/v1/import/status',          # body hash (jobs table)
+    '/api/v1/questions?limit=100',    # body hash
+]
+
+
+def decode(response):
+    data = response.get_data()
+    encoding = response.headers.get('Content-Encoding')
+    if encoding == 'br':
+        return brotli.decompress(data)
+    if encoding == 'gzip':
+        return gzip.decompress(data)
+    return data
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Check ETags and compression')
+    parser.add_argument('--repeat', type=int, default=50,
+                        help='Requests per URL for the latency numbers')
+    args = parser.parse_args()
+
+    import config
+    workdir = tempfile.mkdtemp(prefix='http_cache_')
+    config.DATABASE_PATH = os.path.join(workdir, 'trivia.db')
+    config.SQLALCHEMY_DATABASE_URI = f'sqlite:///{config.DATABASE_PATH}'
+    config.SEED_SNAPSHOT_PATH = ''
+
+    from app import app
+
+    client = app.test_client()
+    failures = []
+
+    # Compression
+    print(f'{"url":32} {"identity":>9} {"gzip":>7} {"br":>7}')
+    for url in SIZE_URLS:
+        plain = client.get(url)
+        gz = client.get(url, headers={'Accept-Encoding': 'gzip'})
+        br = client.get(url, headers={'Accept-Encoding': 'gzip, br'})
+        if 'Content-Encoding' in plain.headers:
+            failures.append(f'{url}: compressed without Accept-Encoding')
+        if gz.headers.get('Content-Encoding') != 'gzip':
+            failures.append(f'{url}: gzip not applied')
+        expected_br = 'br' if brotli is not None else 'gzip'
+        if br.headers.get('Content-Encoding') != expected_br:
+            failures.append(f'{url}: expected {expected_br}, got '
+                            f'{br.headers.get("Content-Encoding")}')
+        for response in (gz, br):
+            if decode(response) != plain.get_data():
+                failures.append(f'{url}: {response.headers.get("Content-Encoding")} '
+                                f'body differs after decoding')
+        if 'Accept-Encoding' not in plain.headers.get('Vary', ''):
+            failures.append(f'{url}: no Vary: Accept-Encoding')
+        print(f'{url:32} {len(plain.get_data()):9} {len(gz.get_data()):7} '
+              f'{len(br.get_data()):7}')
+
+    small = client.get('/api/v1/settings', headers={'Accept-Encoding': 'gzip'})
+    if 'Content-Encoding' in small.headers:
+        failures.append('/api/v1/settings: small response was compressed')
+    export = client.get('/api/v1/export/json', headers={'Accept-Encoding': 'gzip'})
+    export.get_data()
+    if 'Content-Encoding' in export.headers or 'ETag' in export.headers:
+        failures.append('/api/v1/export/json: streamed export was modified')
+
+    # Conditional GETs
+    print(f'\n{"url":32} {"etag":26} {"200 ms":>7} {"304 ms":>7}')
+    for url in CONDITIONAL_URLS:
+        first = client.get(url)
+        etag = first.headers.get('ETag')
+        if not etag:
+            failures.append(f'{url}: no ETag')
+            continue
+        again = client.get(url, headers={'If-None-Match': etag})
+        if again.status_code != 304 or again.get_data():
+            failures.append(f'{url}: repeat was HTTP {again.status_code}, expected empty 304')
+
+        t = time.perf_counter()
+        for _ in range(args.repeat):
+            client.get(url)
+        full = (time.perf_counter() - t) / args.repeat
+        t = time.perf_counter()
+        for _ in range(args.repeat):
+            client.get(url, headers={'If-None-Match': etag})
+        revalidated = (time.perf_counter() - t) / args.repeat
+        print(f'{url:32} {etag[:26]:26} {full * 1000:7.2f} {revalidated * 1000:7.2f}')
+
+    # A write changes the tag
+    etag = client.get('/api/v1/stats/heatmap').headers['ETag']
+    client.post('/api/v1/progress', json={'question_id': 1, 'confidence': 3})
+    after = client.get('/api/v1/stats/heatmap', headers={'If-None-Match': etag})
+    if after.status_code != 200 or after.headers['ETag'] == etag:
+        failures.append('/api/v1/stats/heatmap: ETag unchanged after a progress write')
+
+    shutil.rmtree(workdir, ignore_errors=True)
+    if failures:
+        for failure in failures:
+            print(f'FAIL {failure}')
+        sys.exit(1)
+    print('OK')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""Fail if any filtered API query falls back to a full table scan.
+
+Boots the app against a throwaway database (seeded as on first boot, plus
+some study progress and sessions, then ANALYZEd as the snapshot build and
+the index migration leave it), calls each read endpoint with the
+filters the frontend uses, captures every SELECT the endpoint issues and
+runs ``EXPLAIN QUERY PLAN`` on it. A plan step that scans a table outright
+("SCAN questions", not "SEARCH ... USING INDEX") is reported unless that
+endpoint is expected to read the whole table; the script exits 1 if any
+are found.
+
+Usage:
+    python scripts/check_query_plans.py [--verbose]
+"""
+
+import argparse
+import os
+import re
+import shutil
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+# Endpoint calls to check: (method, url, json body, tables it may scan).
+# Small tables (rollups, settings, jobs) are scanned by design.
+SMALL_TABLES = {'category_stats', 'study_summary', 'app_settings', 'jobs'}
+CASES = [
+    ('GET', '/api/v1/questions?category=SCIENCE', None, set()),
+    ('GET', '/api/v1/questions?category=SCIENCE&difficulty=hard', None, set()),
+    ('GET', '/api/v1/questions?category=SCIENCE&difficulty=medium', None, set()),
+    ('GET', '/api/v1/questions?category=SCIENCE&subcategory=Physics', None, set()),
+    ('GET', '/api/v1/questions?category=SCIENCE&mode=unseen', None, set()),
+    ('GET', '/api/v1/questions?category=SCIENCE&mode=review', None, set()),
+    ('GET', '/api/v1/questions?category=SCIENCE&mode=bookmarked', None, {'bookmarks'}),
+    ('GET', '/api/v1/questions?category=SCIENCE&cursor=100', None, set()),
+    ('GET', '/api/v1/questions?mode=review', None, set()),
+    ('GET', '/api/v1/questions/1', None, set()),
+    ('GET', '/api/v1/review/next?n=20', None, set()),
+    ('GET', '/api/v1/review/next?n=20&category=SCIENCE', None, set()),
+    ('GET', '/api/v1/questions/random?k=10', None, set()),
+    ('GET', '/api/v1/questions/random?k=10&category=SCIENCE&difficulty=hard',
+     None, set()),
+    ('GET', '/api/v1/subcategories?category=SCIENCE', None, set()),
+    ('GET', '/api/v1/search?q=river&category=GEOGRAPHY', None, set()),
+    ('GET', '/api/v1/sessions', None, set()),
+    ('GET', '/api/v1/sessions/1/answers', None, set()),
+    ('GET', '/api/v1/stats/overview', None, set()),
+    ('GET', '/api/v1/stats/categories', None, set()),
+    ('GET', '/api/v1/stats/trends?days=30', None, set()),
+    ('GET', '/api/v1/stats/heatmap', None, set()),
+    ('GET', '/api/v1/stats/weakest', None, set()),
+    ('GET', '/api/v1/export/json?category=SCIENCE&season_min=80&season_max=90',
+     None, set()),
+    ('GET', '/api/v1/export/json?studied_only=true', None, set()),
+]
+
+SCAN_RE = re.compile(r'^SCAN (\w+)(.*)$')
+
+
+def _full_scans(conn, statement, params, tables):
+    """Tables the plan of ``statement`` scans without using an index."""
+    plan = conn.exec_driver_sql(f'EXPLAIN QUERY PLAN {statement}', params).fetchall()
+    scans = []
+    for row in plan:
+        match = SCAN_RE.match(row[-1])
+        # Subquery co-routines and the FTS virtual table are not table scans
+        if match and match.group(1) in tables and 'INDEX' not in match.group(2):
+            scans.append(match.group(1))
+    return scans, [row[-1] for row in plan]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Check API queries for full table scans')
+    parser.add_argument('--verbose', action='store_true', help='Print every query plan')
+    args = parser.parse_args()
+
+    import config
+    workdir = tempfile.mkdtemp(prefix='query_plans_')
+    config.DATABASE_PATH = os.path.join(workdir, 'trivia.db')
+    config.SQLALCHEMY_DATABASE_URI = f'sqlite:///{config.DATABASE_PATH}'
+    config.SEED_SNAPSHOT_PATH = ''
+
+    from sqlalchemy import event
+
+    from app import app
+    from models import db
+
+    client = app.test_client()
+    # Two years of daily progress, a bookmark and a session so every join
+    # and date range has realistic rows
+    today = datetime.utcnow()
+    for day in range(0, 730, 100):
+        client.post('/api/v1/progress/batch', json={'events': [
+            {'question_id': (day + offset) * 7 % 5000 + 1,
+             'confidence': offset % 4 + 1,
+             'answered_at': (today - timedelta(days=day + offset)).isoformat()}
+            for offset in range(100)]})
+    client.post('/api/v1/bookmarks/5')
+    session_id = client.post('/api/v1/sessions', json={'mode': 'quiz'}).get_json()['id']
+    client.put(f'/api/v1/sessions/{session_id}', json={'answers': [
+        {'question_id': question_id, 'was_correct': question_id % 2 == 0}
+        for question_id in range(1, 20)]})
+
+    captured = []
+    failures = 0
+    with app.app_context():
+        engine = db.engine
+        tables = set(db.metadata.tables)
+        with engine.begin() as conn:
+            conn.exec_driver_sql('ANALYZE')
+
+        @event.listens_for(engine, 'before_cursor_execute')
+        def _capture(conn, cursor, statement, parameters, context, executemany):
+            if statement.lstrip().upper().startswith('SELECT'):
+                captured.append((statement, parameters))
+
+        for method, url, body, allowed in CASES:
+            url = url.replace('/sessions/1/', f'/sessions/{session_id}/')
+            captured.clear()
+            response = client.open(url, method=method, json=body)
+            response.get_data()  # drain streamed responses
+            response.close()
+            queries = list(captured)
+            if response.status_code >= 400:
+                print(f'ERROR {method} {url}: HTTP {response.status_code}')
+                failures += 1
+                continue
+
+            with engine.connect() as conn:
+                for statement, params in queries:
+                    scans, plan = _full_scans(conn, statement, params, tables)
+                    bad = [t for t in scans if t not in allowed | SMALL_TABLES]
+                    if bad or args.verbose:
+                        status = 'SCAN' if bad else 'ok'
+                        print(f'{status:4} {method} {url}')
+                        print('     ' + ' '.join(statement.split())[:200])
+                        for step in plan:
+                            print(f'       {step}')
+                    failures += bool(bad)
+        event.remove(engine, 'before_cursor_execute', _capture)
+        db.session.remove()
+        engine.dispose()
+    shutil.rmtree(workdir, ignore_errors=True)
+
+    if failures:
+        print(f'\n{failures} queries with full table scans')
+        sys.exit(1)
+    print(f'All queries for {len(CASES)} endpoint calls use indexes')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""Check that the read cache serves repeat requests and never stale data.
+
+Boots the app against a throwaway database, then for each cached endpoint:
+a first call misses and a second hits with the same body. It then writes
+through the API (progress, settings) and through a separate engine and
+session standing in for another gunicorn worker, and checks every
+endpoint misses again and returns the new data, while job bookkeeping
+leaves the cache alone. Reports miss and hit latency and the /cache/stats
+counters. Exits 1 on any failure.
+
+Usage:
+    python scripts/check_read_cache.py [--repeat 50]
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+ENDPOINTS = [
+    '/api/v1/subcategories?category=SCIENCE',
+    '/api/v1/stats/categories',
+    '/api/v1/stats/trends?days=30',
+    '/api/v1/stats/heatmap',
+    '/api/v1/settings',
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Check the read cache')
+    parser.add_argument('--repeat', type=int, default=50,
+                        help='Requests per endpoint for the latency numbers')
+    args = parser.parse_args()
+
+    import config
+    workdir = tempfile.mkdtemp(prefix='read_cache_')
+    config.DATABASE_PATH = os.path.join(workdir, 'trivia.db')
+    config.SQLALCHEMY_DATABASE_URI = f'sqlite:///{config.DATABASE_PATH}'
+    config.SEED_SNAPSHOT_PATH = ''
+
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import Session
+
+    from app import app
+    from models import AppSettings
+    import jobs
+
+    client = app.test_client()
+    failures = []
+
+    def get_all():
+        return {url: client.get(url) for url in ENDPOINTS}
+
+    def expect(label, responses, cache_status):
+        for url, response in responses.items():
+            if response.headers.get('X-Cache') != cache_status:
+                failures.append(f'{label}: {url} was {response.headers.get("X-Cache")}, '
+                                f'expected {cache_status}')
+
+    first = get_all()
+    expect('first call', first, 'MISS')
+    second = get_all()
+    expect('repeat call', second, 'HIT')
+    for url in ENDPOINTS:
+        if first[url].get_data() != second[url].get_data():
+            failures.append(f'repeat call: {url} body changed')
+
+    # Latency, miss vs hit
+    print(f'{"endpoint":45} {"miss ms":>8} {"hit ms":>8}')
+    for url in ENDPOINTS:
+        miss_total = 0.0
+        for i in range(args.repeat):
+            client.put('/api/v1/settings', json={'check_read_cache': str(i)})
+            t = time.perf_counter()
+            client.get(url)
+            miss_total += time.perf_counter() - t
+        t = time.perf_counter()
+        for _ in range(args.repeat):
+            client.get(url)
+        hit_total = time.perf_counter() - t
+        print(f'{url:45} {miss_total / args.repeat * 1000:8.2f} '
+              f'{hit_total / args.repeat * 1000:8.2f}')
+
+    # A progress write changes the stats endpoints
+    get_all()
+    before = client.get('/api/v1/stats/heatmap').get_json()[-1]['count']
+    client.post('/api/v1/progress', json={'question_id': 1, 'confidence': 3})
+    after_write = get_all()
+    expect('after progress write', after_write, 'MISS')
+    after = after_write['/api/v1/stats/heatmap'].get_json()[-1]['count']
+    if after != before + 1:
+        failures.append(f'after progress write: heatmap today {before} -> {after}')
+
+    # A write from another worker (its own engine and session) is seen too
+    get_all()
+    other_worker = create_engine(config.SQLALCHEMY_DATABASE_URI)
+    with Session(other_worker) as session:
+        session.merge(AppSettings(key='check_read_cache', value='other worker'))
+        session.commit()
+    other_worker.dispose()
+    after_other = get_all()
+    expect('after another worker wrote', after_other, 'MISS')
+    if after_other['/api/v1/settings'].get_json().get('check_read_cache') != 'other worker':
+        failures.append('after another worker wrote: settings still stale')
+
+    # Job bookkeeping does not invalidate
+    get_all()
+    with app.app_context():
+        job = jobs.enqueue('learn_more', {'question_id': 1, 'mode': 'quick'})
+        jobs.request_cancel(job)
+    expect('after a job write', get_all(), 'HIT')
+
+    stats = client.get('/api/v1/cache/stats').get_json()
+    print(f"cache: {stats['hits']} hits, {stats['misses']} misses "
+          f"(hit rate {stats['hit_rate']}), {stats['stale']} stale, "
+          f"generation {stats['generation']}, {stats['size']}/{stats['max_size']} entries")
+
+    shutil.rmtree(workdir, ignore_errors=True)
+    if failures:
+        for failure in failures:
+            print(f'FAIL {failure}')
+        sys.exit(1)
+    print('OK')
+
+
+if __name__ == '__main__':
+    main()
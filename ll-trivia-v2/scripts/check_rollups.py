@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""Verify the stats rollups (category_stats, study_summary) against the raw
+progress tables, and optionally rebuild them.
+
+Usage:
+    python scripts/check_rollups.py [--rebuild]
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Check/rebuild stats rollups')
+    parser.add_argument('--rebuild', action='store_true',
+                        help='Rebuild the rollups from scratch if they drifted')
+    args = parser.parse_args()
+
+    from app import create_app
+    from models import db
+    import rollups
+
+    app = create_app()
+    with app.app_context():
+        drift = {
+            'category_stats': rollups.check_category_stats(),
+            'study_summary': rollups.check_study_summary(),
+        }
+
+        for name, diffs in drift.items():
+            if not diffs:
+                print(f"{name}: OK")
+                continue
+            print(f"{name}: {len(diffs)} mismatch(es)")
+            for key, (stored, expected) in sorted(diffs.items()):
+                print(f"  {key}: stored={stored} expected={expected}")
+
+        if args.rebuild and any(drift.values()):
+            rollups.rebuild_category_stats()
+            rollups.rebuild_study_summary()
+            db.session.commit()
+            print("Rebuilt rollups.")
+        elif any(drift.values()):
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -117,8 +117,12 @@ class TriviaQPDF(FPDF):
         self.ln(3)
 
 
-def main():
-    conn = sqlite3.connect(os.path.abspath(DB_PATH))
+def build_pdf(db_path=DB_PATH, output_path=OUTPUT_PATH, log=print):
+    """Render every non-AI question to ``output_path``. Returns the page count.
+
+    ``log`` receives progress lines (the job system passes its logger).
+    """
+    conn = sqlite3.connect(os.path.abspath(db_path))
     c = conn.cursor()
 
     # Get all non-AI questions ordered by category, season, match_day, question_number
@@ -143,7 +147,7 @@ def main():
     # Sort categories alphabetically
     sorted_categories = sorted(data.keys())
 
-    print(f"Generating PDF for {len(rows)} questions across {len(sorted_categories)} categories...")
+    log(f"Generating PDF for {len(rows)} questions across {len(sorted_categories)} categories...")
 
     pdf = TriviaQPDF()
     pdf.set_title('LearnedLeague Trivia - Seasons 60-107')
@@ -179,7 +183,7 @@ def main():
 
     # Generate pages per category
     for cat in sorted_categories:
-        print(f"  {cat} ({cat_counts[cat]} questions)...")
+        log(f"  {cat} ({cat_counts[cat]} questions)...")
         pdf.category_title(cat, cat_counts[cat])
 
         seasons = sorted(data[cat].keys())
@@ -191,10 +195,15 @@ def main():
                 for qnum, qtext, answer, pct in data[cat][season][md]:
                     pdf.question_entry(qnum, qtext, answer, pct)
 
-    output_path = os.path.abspath(OUTPUT_PATH)
+    output_path = os.path.abspath(output_path)
     pdf.output(output_path)
-    print(f"\nPDF saved to: {output_path}")
-    print(f"Pages: {pdf.page_no()}")
+    log(f"PDF saved to: {output_path}")
+    log(f"Pages: {pdf.page_no()}")
+    return pdf.page_no()
+
+
+def main():
+    build_pdf()
 
 
 if __name__ == '__main__':
@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""Merge the scraper's per-season NDJSON shards into the bundled seed JSON.
+
+Questions already in the seed file are kept (shards win on conflicts) unless
+--replace is given, so seasons scraped before sharding are not lost.
+
+Usage:
+    python scripts/merge_shards.py [--shards DIR] [--output backend/data/questions_seed.json]
+                                   [--replace]
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from config import SCRAPE_SHARDS_DIR, SEED_FILE
+from seed_files import iter_shards, merge_seed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Merge scrape shards into the seed JSON')
+    parser.add_argument('--shards', type=str, default=SCRAPE_SHARDS_DIR,
+                        help='Directory holding LL<season>.ndjson shards')
+    parser.add_argument('--output', type=str, default=SEED_FILE,
+                        help='Seed JSON to write')
+    parser.add_argument('--replace', action='store_true',
+                        help='Build the seed from the shards alone')
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.shards):
+        print(f"Error: no shards at {args.shards}")
+        sys.exit(1)
+
+    output_path = os.path.abspath(args.output)
+    total = merge_seed(iter_shards(args.shards), output_path, args.replace)
+    print(f"Wrote {total} questions to {output_path}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""Generate Learn More explanations ahead of a study block.
+
+Queues a ``prewarm_explanations`` job for the questions matching the
+filters, waits for it while printing progress, and reports throughput,
+tokens and cost. Explanations that are already cached are skipped, so
+rerunning after an interruption or a budget stop picks up where it left
+off.
+
+With --fake the job runs against a throwaway database and the local
+Anthropic stand-in from scripts/ai_standin.py instead, then runs again to
+check that everything is skipped and once more with a token budget to
+check it is respected; use it to benchmark without network access.
+
+Usage:
+    python scripts/prewarm_explanations.py --category SCIENCE --modes quick,deep_dive
+    python scripts/prewarm_explanations.py --mode review --limit 100 --max-cost 0.50
+    python scripts/prewarm_explanations.py --fake [--limit 40] [--latency 0.5] [--concurrency 4]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+sys.path.insert(0, os.path.dirname(__file__))
+
+
+def run_prewarm(client, body, quiet=False):
+    """Queue a prewarm job and wait for it; returns the finished job."""
+    response = client.post('/api/v1/ai/prewarm', json=body)
+    if response.status_code != 202:
+        raise SystemExit(f"Prewarm rejected: {response.get_json()['error']}")
+    job_id = response.get_json()['job']['id']
+    last_print = 0
+    while True:
+        job = client.get(f'/api/v1/jobs/{job_id}').get_json()
+        if job['status'] not in ('queued', 'running'):
+            return job
+        if not quiet and job['progress_total'] and time.time() - last_print >= 5:
+            print(f"  {job['progress_done']}/{job['progress_total']}")
+            last_print = time.time()
+        time.sleep(0.2)
+
+
+def report(job):
+    result = job['result'] or {}
+    print(f"{job['status']}: generated {result.get('generated', 0)}, "
+          f"skipped {result.get('skipped', 0)}, cached meanwhile {result.get('cached', 0)}, "
+          f"failed {result.get('failed', 0)}"
+          + (f", stopped by {result['stopped']}" if result.get('stopped') else ''))
+    if result:
+        print(f"  {result['elapsed']:.1f}s, {result['per_second']:.2f} explanations/s, "
+              f"{result['input_tokens']} in + {result['output_tokens']} out tokens, "
+              f"${result['cost_usd']:.4f}")
+    if job['error']:
+        print(f"  error: {job['error']}")
+
+
+def fake_benchmark(args, body):
+    """Prewarm against the stand-in; returns True if every check passed."""
+    import ai_standin
+    from ai_standin import FakeAnthropic
+
+    server = ai_standin.start_server(args.latency)
+    app = ai_standin.boot_app(server, args.concurrency)
+    client = app.test_client()
+    ok = True
+
+    # An interactive request for one of the pairs, queued as if by another
+    # worker; the prewarm must join its job, not generate the pair again
+    import app as app_module
+    import ai
+    import jobs
+    with app.app_context():
+        question_id = app_module._prewarm_question_ids(body)[0]
+        mode = body['modes'][0]
+        interactive = jobs.enqueue('learn_more', {'question_id': question_id, 'mode': mode},
+                                   dedupe_key=ai.explanation_key(question_id, mode)).id
+
+    print(f"Prewarm {body['limit']} {body.get('category') or 'mixed'} questions x "
+          f"{len(body['modes'])} modes at {args.latency:g}s per call:")
+    job = run_prewarm(client, body)
+    report(job)
+    expected = body['limit'] * len(body['modes'])
+    # One slot of the ai pool stays free for interactive requests
+    limit = max(1, args.concurrency - 1)
+    print(f'  peak upstream calls in flight: {FakeAnthropic.peak_in_flight} '
+          f'(prewarm limit {limit}), {FakeAnthropic.calls} calls for {expected} '
+          f'explanations')
+    interactive = client.get(f'/api/v1/jobs/{interactive}').get_json()
+    result = job['result']
+    ok = ok and result['generated'] + result['skipped'] + result['cached'] == expected
+    ok = ok and FakeAnthropic.peak_in_flight <= limit
+    ok = ok and FakeAnthropic.calls == expected
+    ok = ok and interactive['status'] == 'succeeded'
+
+    calls = FakeAnthropic.calls
+    print('Same prewarm again:')
+    job = run_prewarm(client, body, quiet=True)
+    report(job)
+    ok = ok and job['result']['skipped'] == expected
+    ok = ok and FakeAnthropic.calls == calls
+
+    budget = 5000
+    print(f'Different questions with a {budget}-token budget:')
+    job = run_prewarm(client, dict(body, category='GEOGRAPHY', max_tokens=budget),
+                      quiet=True)
+    report(job)
+    result = job['result']
+    ok = ok and result['stopped'] == 'budget'
+    ok = ok and result['input_tokens'] + result['output_tokens'] <= budget
+
+    server.shutdown()
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate Learn More explanations ahead of time')
+    parser.add_argument('--category', type=str, help='Only this category')
+    parser.add_argument('--subcategory', type=str, help='Only this subcategory')
+    parser.add_argument('--difficulty', choices=('easy', 'medium', 'hard'))
+    parser.add_argument('--mode', choices=('review', 'unseen', 'bookmarked'),
+                        help='Study mode filter; review takes the review queue in due order')
+    parser.add_argument('--limit', type=int, default=200, help='Most questions to cover')
+    parser.add_argument('--modes', type=str, default='quick,deep_dive,quiz_bowl',
+                        help='Comma-separated explanation modes')
+    parser.add_argument('--concurrency', type=int, default=4,
+                        help='Generations at once (capped one below AI_MAX_CONCURRENCY)')
+    parser.add_argument('--max-tokens', type=int, help='Token budget (input + output)')
+    parser.add_argument('--max-cost', type=float, help='Budget in dollars')
+    parser.add_argument('--fake', action='store_true',
+                        help='Benchmark against a local stand-in and a throwaway database')
+    parser.add_argument('--latency', type=float, default=0.5,
+                        help='Seconds per stand-in call (--fake)')
+    args = parser.parse_args()
+
+    body = {
+        'category': args.category,
+        'subcategory': args.subcategory,
+        'difficulty': args.difficulty,
+        'mode': args.mode,
+        'limit': args.limit,
+        'modes': args.modes.split(','),
+        'concurrency': args.concurrency,
+        'max_tokens': args.max_tokens,
+        'max_cost_usd': args.max_cost,
+    }
+
+    if args.fake:
+        if not args.category and not args.mode:
+            body['category'] = 'SCIENCE'
+        if args.limit == parser.get_default('limit'):
+            body['limit'] = 40
+        ok = fake_benchmark(args, body)
+        print('OK' if ok else 'FAILED')
+        sys.exit(0 if ok else 1)
+
+    from app import app
+    job = run_prewarm(app.test_client(), body)
+    report(job)
+    sys.exit(0 if job['status'] == 'succeeded' else 1)
+
+
+if __name__ == '__main__':
+    main()
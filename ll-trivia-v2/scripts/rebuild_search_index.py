@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+"""Rebuild the FTS5 search index from the questions, notes and AI responses.
+
+Only needed if the index drifts (e.g. rows edited with sync triggers
+disabled); existing databases get the index built automatically on the
+first app start.
+
+Usage:
+    python scripts/rebuild_search_index.py
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+
+def main():
+    from app import create_app
+    from models import db
+    from search import rebuild_search_index
+
+    app = create_app()
+    with app.app_context():
+        start = time.time()
+        indexed = rebuild_search_index(db)
+        elapsed = time.time() - start
+
+        print(f"Indexed {indexed} questions ({elapsed:.2f}s)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""Re-parse archived match-day pages into the seed JSON and/or the database.
+
+Uses only the page archive written by the scraper (no network), so parser
+fixes can be applied to every season already fetched.
+
+Usage:
+    python scripts/reparse_archive.py [--archive DIR] [--start 60 --end 107]
+                                      [--output backend/data/questions_seed.json]
+                                      [--replace] [--db] [--processes N]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from config import SCRAPE_ARCHIVE_DIR
+from page_archive import PageArchive
+from scraper import reparse_archive
+from seed_files import merge_seed, normalize_question
+
+# Columns refreshed from the archive; ids, subcategories and study data stay
+PARSED_COLUMNS = ('question_text', 'answer', 'category', 'percent_correct')
+
+
+def write_db(questions):
+    """Upsert questions into the app database, refreshing parsed columns."""
+    from app import create_app
+    from bulk_load import load_questions
+
+    app = create_app()
+    with app.app_context():
+        return load_questions(questions, update_columns=PARSED_COLUMNS)['rows']
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Re-parse archived LearnedLeague pages')
+    parser.add_argument('--archive', type=str, default=SCRAPE_ARCHIVE_DIR,
+                        help='Page archive directory')
+    parser.add_argument('--start', type=int, help='First season to re-parse')
+    parser.add_argument('--end', type=int, help='Last season to re-parse')
+    parser.add_argument('--output', type=str,
+                        help='Seed JSON to write (e.g. backend/data/questions_seed.json)')
+    parser.add_argument('--replace', action='store_true',
+                        help='Overwrite --output instead of merging into it')
+    parser.add_argument('--db', action='store_true',
+                        help='Upsert the re-parsed questions into the app database')
+    parser.add_argument('--processes', type=int, default=None,
+                        help='Parser processes (default: one per CPU)')
+    args = parser.parse_args()
+
+    if not args.output and not args.db:
+        parser.error('nothing to do: pass --output and/or --db')
+    if not os.path.isdir(args.archive):
+        print(f"Error: no archive at {args.archive}")
+        sys.exit(1)
+
+    start = time.time()
+    questions, pages = reparse_archive(PageArchive(args.archive),
+                                       args.start, args.end, progress_callback=print,
+                                       processes=args.processes)
+    questions = [normalize_question(q) for q in questions]
+    elapsed = time.time() - start
+    print(f"Parsed {pages} pages into {len(questions)} questions in {elapsed:.1f}s")
+
+    if args.output:
+        output_path = os.path.abspath(args.output)
+        total = merge_seed(questions, output_path, args.replace)
+        print(f"Wrote {total} questions to {output_path}")
+    if args.db:
+        print(f"Upserted {write_db(questions)} questions into the database")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""Run the background job worker in the foreground.
+
+Useful when web workers are started with JOBS_WORKER=0, or to drain the
+queue from a shell.
+
+Usage:
+    python scripts/run_jobs.py [--poll 2.0]
+"""
+
+import argparse
+import logging
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run the background job worker')
+    parser.add_argument('--poll', type=float, default=2.0,
+                        help='Seconds to wait between queue polls when idle')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO,
+                        format='%(asctime)s %(levelname)s %(message)s')
+
+    from app import create_app
+    from jobs import worker_loop
+
+    app = create_app()
+    try:
+        worker_loop(app, poll_interval=args.poll)
+    except KeyboardInterrupt:
+        print("Stopped.")
+
+
+if __name__ == '__main__':
+    main()
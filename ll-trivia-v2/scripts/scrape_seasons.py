@@ -1,15 +1,19 @@
 #!/usr/bin/env python3
-"""Standalone script to scrape LearnedLeague questions and save to JSON.
+"""Standalone script to scrape LearnedLeague questions into NDJSON shards.
 
-Saves incrementally after each season so progress is not lost on interruption.
-Supports resuming from a partial JSON file.
+Each match day is appended to a per-season shard (LL60.ndjson) and recorded
+in the shard manifest as soon as it is scraped, so progress is never lost
+and a rerun resumes by skipping match days the manifest lists as complete.
+Build the bundled seed file from the shards with scripts/merge_shards.py
+(or pass --merge).
 
 Usage:
     python scripts/scrape_seasons.py --start 60 --end 107 --username USER --password PASS
+    python scripts/scrape_seasons.py --start 108 --end 108 --merge backend/data/questions_seed.json
 """
 
 import argparse
-import json
+import logging
 import os
 import sys
 import time
@@ -17,30 +21,30 @@ import time
 # Add backend to path so we can import the scraper
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
 
-from scraper import create_session, scrape_match_day
-
-
-def save_json(questions, output_path):
-    """Atomically save questions to JSON file."""
-    tmp_path = output_path + '.tmp'
-    with open(tmp_path, 'w', encoding='utf-8') as f:
-        json.dump(questions, f, indent=2, ensure_ascii=False)
-    # Atomic rename (on Windows this may need to remove target first)
-    if os.path.exists(output_path):
-        os.remove(output_path)
-    os.rename(tmp_path, output_path)
+from config import SCRAPE_ARCHIVE_DIR, SCRAPE_SHARDS_DIR
+from page_archive import PageArchive
+from scraper import DEFAULT_CONCURRENCY, DEFAULT_RATE, scrape_season_range
+from seed_files import ShardWriter, iter_shards, merge_seed
 
 
 def main():
-    parser = argparse.ArgumentParser(description='Scrape LearnedLeague questions to JSON')
+    parser = argparse.ArgumentParser(description='Scrape LearnedLeague questions to NDJSON shards')
     parser.add_argument('--start', type=int, required=True, help='Start season number (e.g. 60)')
     parser.add_argument('--end', type=int, required=True, help='End season number (e.g. 107)')
-    parser.add_argument('--output', type=str, default='backend/data/questions_seed.json',
-                        help='Output JSON file path')
+    parser.add_argument('--shards', type=str, default=SCRAPE_SHARDS_DIR,
+                        help='Directory for per-season shards and the manifest')
+    parser.add_argument('--merge', type=str, metavar='SEED_JSON',
+                        help='Merge the shards into this seed file when done')
     parser.add_argument('--username', type=str, default=os.environ.get('LL_USERNAME', ''),
                         help='LL username (or set LL_USERNAME env var)')
     parser.add_argument('--password', type=str, default=os.environ.get('LL_PASSWORD', ''),
                         help='LL password (or set LL_PASSWORD env var)')
+    parser.add_argument('--rate', type=float, default=DEFAULT_RATE,
+                        help=f'Max requests per second (default {DEFAULT_RATE})')
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY,
+                        help=f'Match days fetched in parallel (default {DEFAULT_CONCURRENCY})')
+    parser.add_argument('--archive', type=str, default=SCRAPE_ARCHIVE_DIR,
+                        help='Directory to archive raw pages in ("" to disable)')
     args = parser.parse_args()
 
     if not args.username or not args.password:
@@ -48,126 +52,51 @@ def main():
         print("Pass --username/--password or set LL_USERNAME/LL_PASSWORD env vars.")
         sys.exit(1)
 
-    output_path = os.path.abspath(args.output)
-    os.makedirs(os.path.dirname(output_path), exist_ok=True)
-
-    # Load existing data to resume from
-    all_questions = []
-    scraped_keys = set()
-    if os.path.exists(output_path):
-        with open(output_path, 'r', encoding='utf-8') as f:
-            all_questions = json.load(f)
-        for q in all_questions:
-            scraped_keys.add((q['season'], q['match_day'], q['question_number']))
-        print(f"Resuming: loaded {len(all_questions)} existing questions from {output_path}")
-
-    # Figure out which seasons are already fully scraped (all 150 questions present)
-    season_question_counts = {}
-    for q in all_questions:
-        s = q['season']
-        if isinstance(s, str):
-            s = s.replace('LL', '')
-        s = int(s)
-        season_question_counts[s] = season_question_counts.get(s, 0) + 1
+    logging.basicConfig(level=logging.WARNING, format='%(levelname)s %(message)s')
 
-    total_seasons = args.end - args.start + 1
-    total_match_days = total_seasons * 25
-    completed_md = 0
+    shards_dir = os.path.abspath(args.shards)
+    writer = ShardWriter(shards_dir)
+    complete = writer.complete_match_days()
+    if complete:
+        print(f"Resuming: manifest lists {len(complete)} complete match days in {shards_dir}")
 
+    total_seasons = args.end - args.start + 1
     print(f"Scraping seasons {args.start} through {args.end} ({total_seasons} seasons)")
-    print(f"Estimated match days: {total_match_days}")
-    print(f"Estimated time: ~{total_match_days * 2 / 60:.0f} minutes")
+    print(f"Estimated time: ~{total_seasons * 25 / args.rate / 60:.0f} minutes (at most)")
     print()
 
-    # Login once
-    print("Logging in to LearnedLeague...")
-    session = create_session(args.username, args.password)
-    print("Login successful!\n")
-
-    errors = []
-    total_new = 0
     start_time = time.time()
-
-    for season in range(args.start, args.end + 1):
-        # Skip seasons that are already fully scraped (150 questions = 25 days * 6 questions)
-        existing_count = season_question_counts.get(season, 0)
-        if existing_count >= 150:
-            print(f"Season LL{season}: already scraped ({existing_count} questions), skipping")
-            completed_md += 25
-            continue
-
-        season_new = 0
-        season_errors = 0
-        print(f"--- Season LL{season} ---")
-
-        for md in range(1, 26):
-            completed_md += 1
-            elapsed = time.time() - start_time
-            rate = completed_md / elapsed if elapsed > 0 else 0
-            remaining = (total_match_days - completed_md) / rate if rate > 0 else 0
-
-            print(f"  MD{md:2d}  [{completed_md}/{total_match_days}]  ", end='', flush=True)
-
-            try:
-                questions = scrape_match_day(session, season, md)
-                if questions:
-                    new_count = 0
-                    for q in questions:
-                        # Normalize season to int for storage
-                        season_val = q['season']
-                        if isinstance(season_val, str):
-                            season_val = season_val.replace('LL', '')
-                        season_int = int(season_val)
-                        q['season'] = season_int
-
-                        key = (season_int, q['match_day'], q['question_number'])
-                        if key not in scraped_keys:
-                            all_questions.append(q)
-                            scraped_keys.add(key)
-                            new_count += 1
-
-                    print(f"{len(questions)} found, {new_count} new")
-                    season_new += new_count
-                    total_new += new_count
-                else:
-                    print("no data")
-
-                time.sleep(1.5)
-
-            except Exception as e:
-                error_msg = f"LL{season} MD{md}: {e}"
-                print(f"ERROR: {e}")
-                errors.append(error_msg)
-                season_errors += 1
-                time.sleep(3)
-
-        # Save after each season completes
-        all_questions.sort(key=lambda q: (
-            int(str(q['season']).replace('LL', '')),
-            q['match_day'],
-            q['question_number']
-        ))
-        save_json(all_questions, output_path)
-
-        elapsed_min = (time.time() - start_time) / 60
-        print(f"  Season LL{season} done: {season_new} new questions, "
-              f"{season_errors} errors. Total: {len(all_questions)} questions. "
-              f"Saved. [{elapsed_min:.1f}m elapsed]\n")
+    result = scrape_season_range(
+        args.start, args.end, args.username, args.password,
+        progress_callback=print,
+        save_callback=writer,
+        concurrency=args.concurrency,
+        rate=args.rate,
+        archive=PageArchive(args.archive) if args.archive else None,
+        skip=complete,
+    )
 
     elapsed_total = (time.time() - start_time) / 60
+    errors = result['errors']
     print(f"{'=' * 60}")
     print(f"COMPLETE!")
-    print(f"Total questions in file: {len(all_questions)}")
-    print(f"New questions this run: {total_new}")
+    print(f"New questions this run: {result['total_saved']}")
     print(f"Errors: {len(errors)}")
     print(f"Time: {elapsed_total:.1f} minutes")
-    print(f"Output: {output_path}")
+    print(f"Shards: {shards_dir}")
 
     if errors:
         print(f"\nErrors encountered:")
         for err in errors:
             print(f"  - {err}")
 
+    if args.merge:
+        output_path = os.path.abspath(args.merge)
+        total = merge_seed(iter_shards(shards_dir), output_path)
+        print(f"Merged {total} questions into {output_path}")
+    else:
+        print("Run scripts/merge_shards.py to build the seed file.")
+
 
 if __name__ == '__main__':
     main()
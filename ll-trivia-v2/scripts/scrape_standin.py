@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""Run the scraper against a local stand-in for LearnedLeague.
+
+Serves generated match-day pages from a local HTTP server (optionally slow,
+and answering some requests with 429) and scrapes them with the real
+engine. Reports throughput and checks that the request rate never went over
+the limit and that every question was parsed. Pages carry ETags, so with
+--archive a second run is answered with 304s from the page archive.
+
+Usage:
+    python scripts/scrape_standin.py [--seasons 2] [--concurrency 4] [--rate 10]
+                                     [--latency 0.2] [--throttle-every 0]
+                                     [--archive DIR]
+"""
+
+import argparse
+import hashlib
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+import scraper
+from page_archive import PageArchive
+
+
+def fixture_page(season, match_day, player_rows=0):
+    """A match-day page shaped like the real one, with 6 questions.
+
+    ``player_rows`` pads the results table to the size of a real page.
+    """
+    questions = ''.join(
+        f'<div class="ind-Q20 qtext">Q{n}. SCIENCE - Stand-in <b>question</b> '
+        f'{n} of LL{season} MD{match_day}?<!-- note --></div>'
+        f'<div id="Q{n}{match_day}ANS"> Answer <i>{n}</i> </div>'
+        for n in range(1, 7))
+    players = ''.join(
+        f'<tr><td><a href="/profiles.php?{i}">Player{i}</a></td><td>{i % 7}</td>'
+        + ''.join(f'<td class="c{n}">{(i + n) % 2}</td>' for n in range(1, 7))
+        + '</tr>'
+        for i in range(player_rows))
+    cells = ''.join(f'<td>{10 * n}%</td>' for n in range(1, 7))
+    return (f'<html><head><meta charset="utf-8"><script>var x = 1;</script>'
+            f'</head><body><h1 class="matchday">LL{season} Match Day '
+            f'{match_day}</h1>{questions}<table class="std"><tbody>{players}'
+            f'</tbody><tfoot><tr><td>Leaguewide</td><td></td>{cells}</tr>'
+            f'</tfoot></table></body></html>').encode()
+
+
+class StandIn(BaseHTTPRequestHandler):
+    latency = 0.0
+    throttle_every = 0
+    hits = []
+    throttled = 0
+    not_modified = 0
+    lock = threading.Lock()
+
+    def do_GET(self):
+        with self.lock:
+            StandIn.hits.append(time.monotonic())
+            n = len(StandIn.hits)
+        time.sleep(self.latency)
+        if self.throttle_every and n % self.throttle_every == 0:
+            with self.lock:
+                StandIn.throttled += 1
+            self.send_response(429)
+            self.send_header('Retry-After', '1')
+            self.end_headers()
+            return
+        season, match_day = self.path.split('?', 1)[1].split('&')
+        body = fixture_page(int(season), int(match_day))
+        etag = '"%s"' % hashlib.sha1(body).hexdigest()
+        if self.headers.get('If-None-Match') == etag:
+            with self.lock:
+                StandIn.not_modified += 1
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('ETag', etag)
+        self.send_header('Content-Type', 'text/html')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def peak_rate(hits, window=1.0):
+    """Most requests seen in any ``window``-second span."""
+    peak = 0
+    start = 0
+    for end in range(len(hits)):
+        while hits[end] - hits[start] >= window:
+            start += 1
+        peak = max(peak, end - start + 1)
+    return peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Scrape a local LearnedLeague stand-in')
+    parser.add_argument('--seasons', type=int, default=2, help='Seasons to scrape (25 pages each)')
+    parser.add_argument('--concurrency', type=int, default=scraper.DEFAULT_CONCURRENCY)
+    parser.add_argument('--rate', type=float, default=10.0, help='Max requests per second')
+    parser.add_argument('--latency', type=float, default=0.2, help='Seconds per response')
+    parser.add_argument('--throttle-every', type=int, default=0,
+                        help='Answer every Nth request with 429 (0 = never)')
+    parser.add_argument('--archive', type=str, default='',
+                        help='Page archive directory (enables conditional GETs)')
+    args = parser.parse_args()
+
+    StandIn.latency = args.latency
+    StandIn.throttle_every = args.throttle_every
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StandIn)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    scraper.MATCH_URL = f'http://127.0.0.1:{server.server_port}/match.php'
+
+    start = time.time()
+    result = scraper.scrape_season_range(
+        1, args.seasons, None, None,
+        session=requests.Session(),
+        concurrency=args.concurrency,
+        rate=args.rate,
+        archive=PageArchive(args.archive) if args.archive else None,
+    )
+    elapsed = time.time() - start
+    server.shutdown()
+
+    expected = args.seasons * 25 * 6
+    got = len(result['questions'])
+    peak = peak_rate(StandIn.hits)
+    print(f"Pages: {len(StandIn.hits)} requests ({StandIn.throttled} throttled, "
+          f"{StandIn.not_modified} not modified) in {elapsed:.1f}s")
+    print(f"Questions: {got}/{expected}, errors: {len(result['errors'])}")
+    # A burst of one token allows at most rate + 1 starts in any 1s window
+    print(f"Peak requests in any 1s window: {peak} (limit {args.rate:g})")
+
+    ok = got == expected and peak <= args.rate + 1
+    print("OK" if ok else "FAILED")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -86,37 +86,47 @@ def init_db():
 
 
 def _preload_questions():
-    """Load bundled questions from questions_data.json if the DB is empty."""
+    """Load bundled questions from questions_data.json if the DB is empty.
+
+    Rows go in with one executemany of INSERT ... ON CONFLICT DO UPDATE
+    inside a single transaction, rather than one ORM object per row.
+    """
     import json
     import os
+    from sqlalchemy import func, select
+    from sqlalchemy.dialects.sqlite import insert
 
-    db = Session()
     try:
-        if db.query(Question).count() > 0:
-            return
-
-        data_file = os.path.join(config.BASE_DIR, "questions_data.json")
-        if not os.path.exists(data_file):
-            return
-
-        with open(data_file, "r", encoding="utf-8") as f:
-            questions = json.load(f)
-
-        for q in questions:
-            db.add(Question(
-                season=q["season"],
-                match_day=q["match_day"],
-                question_number=q["question_number"],
-                category=q["category"],
-                question_text=q["question_text"],
-                answer=q["answer"],
-                percent_correct=q.get("percent_correct"),
-                created_at=datetime.utcnow(),
-            ))
-        db.commit()
+        with engine.begin() as conn:
+            if conn.execute(select(func.count(Question.id))).scalar() > 0:
+                return
+
+            data_file = os.path.join(config.BASE_DIR, "questions_data.json")
+            if not os.path.exists(data_file):
+                return
+
+            with open(data_file, "r", encoding="utf-8") as f:
+                questions = json.load(f)
+
+            now = datetime.utcnow()
+            rows = [{
+                "season": q["season"],
+                "match_day": q["match_day"],
+                "question_number": q["question_number"],
+                "category": q["category"],
+                "question_text": q["question_text"],
+                "answer": q["answer"],
+                "percent_correct": q.get("percent_correct"),
+                "created_at": now,
+            } for q in questions]
+
+            stmt = insert(Question.__table__)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["season", "match_day", "question_number"],
+                set_={"percent_correct": stmt.excluded.percent_correct},
+            )
+            if rows:
+                conn.execute(stmt, rows)
         print(f"Pre-loaded {len(questions)} questions from questions_data.json")
     except Exception as e:
-        db.rollback()
         print(f"Warning: failed to pre-load questions: {e}")
-    finally:
-        db.close()